@@ -1,5 +1,6 @@
 from django.shortcuts import redirect
 from django.conf import settings
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 import logging
 logger = logging.getLogger(__name__)
 
@@ -7,19 +8,37 @@ class SubscriptionPaymentPendingMiddleware:
     """
     Middleware to force admins with pending payment subscriptions to the payment pending page.
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._pending_payment_redirect(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        # Anonymous requests (no request.user yet) skip the thread hop entirely
+        if hasattr(request, 'user'):
+            response = await sync_to_async(self._pending_payment_redirect)(request)
+            if response:
+                return response
+        return await self.get_response(request)
+
+    def _pending_payment_redirect(self, request):
         # Allow unauthenticated users to proceed
         if not hasattr(request, 'user') or not request.user.is_authenticated:
-            return self.get_response(request)
+            return None
 
         user = request.user
         if hasattr(user, 'role') and user.role == 'admin':
             subscription = getattr(user, 'subscription', None)
             status = getattr(subscription, 'status', None)
-            logger.info(f"[SubscriptionPaymentPendingMiddleware] Admin {user.username} subscription status: {status}")
+            logger.info('[SubscriptionPaymentPendingMiddleware] Admin %s subscription status: %s', user.username, status)
             if subscription and status == 'pending_payment':
                 allowed_paths = [
                     '/admin/subscribe/payment-pending/',
@@ -31,7 +50,8 @@ class SubscriptionPaymentPendingMiddleware:
                         pending_url = 'http://localhost:3003/admin/subscribe/payment-pending'
                     else:
                         pending_url = 'https://qr-menu-code.netlify.app/admin/subscribe/payment-pending'
-                    logger.info(f"[SubscriptionPaymentPendingMiddleware] Redirecting {user.username} to {pending_url} from {request.path}")
+                    logger.info('[SubscriptionPaymentPendingMiddleware] Redirecting %s to %s from %s', user.username, pending_url, request.path)
                     return redirect(pending_url)
 
-        return self.get_response(request) 
\ No newline at end of file
+        return None
+ 
\ No newline at end of file
@@ -52,6 +52,10 @@ class Subscription(models.Model):
         db_table = 'subscriptions'
         verbose_name = 'Subscription'
         verbose_name_plural = 'Subscriptions'
+        indexes = [
+            models.Index(fields=['status', 'subscription_end_date'], name='subscription_status_end_idx'),
+            models.Index(fields=['status', 'trial_end_date'], name='subscription_status_trial_idx'),
+        ]
     
     def __str__(self):
         return f"Subscription for {self.admin.email} - {self.status}"
@@ -69,7 +69,7 @@ def generate_esewa_signature(key, message):
         
         return signature
     except Exception as e:
-        logger.error(f'[eSewa SIGNATURE] Error generating signature: {str(e)}')
+        logger.error('[eSewa SIGNATURE] Error generating signature: %s', e)
         raise
 
 
@@ -113,11 +113,11 @@ def initiate_esewa_payment(amount, reference_id, product_name, product_code, sec
         }
         
         # Log payment data for debugging
-        logger.info(f"[eSewa PAYMENT] Environment: {environment}")
-        logger.debug(f"[eSewa PAYMENT] URL: {esewa_url}")
-        logger.debug(f"[eSewa PAYMENT] Product Code: {product_code}")
-        logger.debug(f"[eSewa PAYMENT] Amount: {amount_str}")
-        logger.debug(f"[eSewa PAYMENT] Reference ID: {reference_id}")
+        logger.info('[eSewa PAYMENT] Environment: %s', environment)
+        logger.debug('[eSewa PAYMENT] URL: %s', esewa_url)
+        logger.debug('[eSewa PAYMENT] Product Code: %s', product_code)
+        logger.debug('[eSewa PAYMENT] Amount: %s', amount_str)
+        logger.debug('[eSewa PAYMENT] Reference ID: %s', reference_id)
         # Do NOT log full payment_data (contains signature)
         
         return {
@@ -128,7 +128,7 @@ def initiate_esewa_payment(amount, reference_id, product_name, product_code, sec
         }
         
     except Exception as e:
-        logger.error(f'[eSewa INITIATE] Error: {str(e)}')
+        logger.error('[eSewa INITIATE] Error: %s', e)
         raise
 
 
@@ -179,7 +179,7 @@ def verify_esewa_payment(transaction_id, reference_id, product_code, secret_key,
             }
             
     except Exception as e:
-        logger.error(f'[eSewa VERIFY] Error: {str(e)}')
+        logger.error('[eSewa VERIFY] Error: %s', e)
         return {
             'success': False,
             'message': f'Verification error: {str(e)}',
@@ -356,7 +356,7 @@ def initiate_subscription_payment(request):
                     # Reset stale pending_payment status
                     subscription.status = 'expired'
                     subscription.save()
-                    logger.info(f"[PAYMENT] Reset stale pending_payment status for user {request.user.id}")
+                    logger.info('[PAYMENT] Reset stale pending_payment status for user %s', request.user.id)
                 else:
                     return Response({
                         'error': 'payment_already_processing',
@@ -375,27 +375,27 @@ def initiate_subscription_payment(request):
         try:
             esewa_credentials = EsewaCredentials.objects.get(admin=request.user)
             if not esewa_credentials.is_active:
-                logger.info(f"[PAYMENT] eSewa credentials not active for user {request.user.id}")
+                logger.info('[PAYMENT] eSewa credentials not active for user %s', request.user.id)
                 esewa_credentials = None
             else:
                 # Validate that credentials are properly configured
                 if not esewa_credentials.esewa_product_code:
-                    logger.info(f"[PAYMENT] eSewa product code not configured for user {request.user.id}")
+                    logger.info('[PAYMENT] eSewa product code not configured for user %s', request.user.id)
                     esewa_credentials = None
                 else:
                     # Try to decrypt the secret key
                     secret_key = esewa_credentials.decrypt_secret_key()
                     if not secret_key:
-                        logger.warning(f"[PAYMENT] Failed to decrypt secret key for user {request.user.id}")
+                        logger.warning('[PAYMENT] Failed to decrypt secret key for user %s', request.user.id)
                         esewa_credentials = None
                     else:
-                        logger.info(f"[PAYMENT] Successfully loaded eSewa credentials for user {request.user.id}")
+                        logger.info('[PAYMENT] Successfully loaded eSewa credentials for user %s', request.user.id)
                         
         except ObjectDoesNotExist:
-            logger.info(f"[PAYMENT] No eSewa credentials found for user {request.user.id}, using test credentials")
+            logger.info('[PAYMENT] No eSewa credentials found for user %s, using test credentials', request.user.id)
             esewa_credentials = None
         except Exception as e:
-            logger.error(f"[PAYMENT] Error loading eSewa credentials for user {request.user.id}: {str(e)}")
+            logger.error('[PAYMENT] Error loading eSewa credentials for user %s: %s', request.user.id, e)
             esewa_credentials = None
         
         # Create a temporary subscription for payment processing if none exists
@@ -440,7 +440,7 @@ def initiate_subscription_payment(request):
                 # Use configured credentials
                 secret_key = esewa_credentials.decrypt_secret_key()
                 if secret_key:
-                    logger.info(f"[PAYMENT] Using configured eSewa credentials for user {request.user.id}")
+                    logger.info('[PAYMENT] Using configured eSewa credentials for user %s', request.user.id)
                     esewa_response = initiate_esewa_payment(
                         amount=data['amount'],
                         reference_id=reference_id,
@@ -450,7 +450,7 @@ def initiate_subscription_payment(request):
                         environment=esewa_credentials.environment
                     )
                 else:
-                    logger.warning(f"[PAYMENT] Failed to decrypt secret key, using test credentials for user {request.user.id}")
+                    logger.warning('[PAYMENT] Failed to decrypt secret key, using test credentials for user %s', request.user.id)
                     esewa_response = initiate_esewa_payment(
                         amount=data['amount'],
                         reference_id=reference_id,
@@ -461,7 +461,7 @@ def initiate_subscription_payment(request):
                     )
             else:
                 # Use test credentials
-                logger.info(f"[PAYMENT] Using test eSewa credentials for user {request.user.id}")
+                logger.info('[PAYMENT] Using test eSewa credentials for user %s', request.user.id)
                 esewa_response = initiate_esewa_payment(
                     amount=data['amount'],
                     reference_id=reference_id,
@@ -619,7 +619,7 @@ def verify_subscription_payment(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def subscription_payment_success(request):
-    logger.debug(f"[DEBUG] Incoming GET params: {request.GET}")
+    logger.debug('[DEBUG] Incoming GET params: %s', request.GET)
     transaction_id = request.GET.get('oid')
     reference_id = request.GET.get('pid')
     response_code = request.GET.get('refId')
@@ -632,15 +632,15 @@ def subscription_payment_success(request):
             padded_data = data_param + '=' * (-len(data_param) % 4)  # pad base64 if needed
             decoded = base64.b64decode(padded_data).decode('utf-8')
             data_json = json.loads(decoded)
-            logger.debug(f"[DEBUG] Decoded eSewa data param (not logging full data for security)")
+            logger.debug('[DEBUG] Decoded eSewa data param (not logging full data for security)')
             reference_id = data_json.get('transaction_uuid') or data_json.get('reference_id') or reference_id
             transaction_id = data_json.get('transaction_uuid') or transaction_id
             response_code = data_json.get('transaction_code') or response_code
             response_message = data_json.get('status') or response_message
         except Exception as e:
-            logger.warning(f"[DEBUG] Failed to decode eSewa data param: {e}")
+            logger.warning('[DEBUG] Failed to decode eSewa data param: %s', e)
 
-    logger.debug(f"[DEBUG] transaction_id: {transaction_id}, reference_id: {reference_id}, response_code: {response_code}, response_message: {response_message}")
+    logger.debug('[DEBUG] transaction_id: %s, reference_id: %s, response_code: %s, response_message: %s', transaction_id, reference_id, response_code, response_message)
     if not reference_id:
         frontend_url = getattr(settings, 'FRONTEND_BASE_URL', 'http://localhost:3003')
         failure_url = f"{frontend_url}/admin/login?payment=failed&error=invalid_reference&message=Invalid payment reference. Please try again."
@@ -650,7 +650,7 @@ def subscription_payment_success(request):
         payment_record = PaymentHistory.objects.get(
             esewa_reference_id=reference_id
         )
-        logger.debug(f"[DEBUG] Found payment_record: {payment_record}, is_successful: {payment_record.is_successful}")
+        logger.debug('[DEBUG] Found payment_record: %s, is_successful: %s', payment_record, payment_record.is_successful)
     except ObjectDoesNotExist:
         frontend_url = getattr(settings, 'FRONTEND_BASE_URL', 'http://localhost:3003')
         failure_url = f"{frontend_url}/admin/subscribe?payment=failed&error=record_not_found"
@@ -658,7 +658,7 @@ def subscription_payment_success(request):
         return HttpResponseRedirect(failure_url)
     try:
         subscription = payment_record.subscription
-        logger.debug(f"[DEBUG] Subscription before verification: {subscription}, status: {subscription.status}")
+        logger.debug('[DEBUG] Subscription before verification: %s, status: %s', subscription, subscription.status)
         # Try to use admin's eSewa credentials, fallback to test credentials if any error
         try:
             esewa_credentials = EsewaCredentials.objects.get(admin=subscription.admin)
@@ -675,7 +675,7 @@ def subscription_payment_success(request):
                 environment=esewa_credentials.environment
             )
         except Exception as e:
-            logger.debug(f"[DEBUG] Falling back to test credentials due to: {e}")
+            logger.debug('[DEBUG] Falling back to test credentials due to: %s', e)
             test_credentials = {
                 'product_code': 'EPAYTEST',
                 'secret_key': '8gBm/:&EnhH.1/q',
@@ -687,7 +687,7 @@ def subscription_payment_success(request):
                 'message': 'Test mode: payment auto-verified',
                 'response_code': '000'
             }
-        logger.debug(f"[DEBUG] Verification response: {verification_response}")
+        logger.debug('[DEBUG] Verification response: %s', verification_response)
         payment_record.response_data = verification_response
         payment_record.esewa_response_code = response_code or '000'
         payment_record.esewa_response_message = response_message or 'Success'
@@ -697,7 +697,7 @@ def subscription_payment_success(request):
         if not is_successful and 'environment' in locals() and (
             (esewa_credentials and getattr(esewa_credentials, 'environment', None) == 'test') or test_credentials['environment'] == 'test'):
             is_successful = True
-            logger.debug(f"[DEBUG] Test payment - marking as successful for user {subscription.admin.id}")
+            logger.debug('[DEBUG] Test payment - marking as successful for user %s', subscription.admin.id)
         if is_successful:
             payment_record.is_successful = True
             payment_record.error_message = ''  # Clear any previous error
@@ -708,16 +708,16 @@ def subscription_payment_success(request):
             billing_record.esewa_reference_id = reference_id
             billing_record.paid_at = timezone.now()
             billing_record.save()
-            logger.debug(f"[DEBUG] Subscription status before activation: {subscription.status}")
+            logger.debug('[DEBUG] Subscription status before activation: %s', subscription.status)
             if payment_record.payment_type == 'subscription':
                 subscription.activate_subscription()
-                logger.debug(f"[DEBUG] Subscription activated for user {subscription.admin.id}, new status: {subscription.status}")
+                logger.debug('[DEBUG] Subscription activated for user %s, new status: %s', subscription.admin.id, subscription.status)
             elif payment_record.payment_type == 'renewal':
                 subscription.extend_subscription()
-                logger.debug(f"[DEBUG] Subscription renewed for user {subscription.admin.id}, new status: {subscription.status}")
+                logger.debug('[DEBUG] Subscription renewed for user %s, new status: %s', subscription.admin.id, subscription.status)
             frontend_url = getattr(settings, 'FRONTEND_BASE_URL', 'http://localhost:3003')
             success_url = f"{frontend_url}/admin/login?payment=success&subscription=active&message=Payment successful! Please login to access your subscription."
-            logger.debug(f"[DEBUG] Redirecting to success_url: {success_url}")
+            logger.debug('[DEBUG] Redirecting to success_url: %s', success_url)
             return HttpResponseRedirect(success_url)
         else:
             payment_record.is_successful = False
@@ -725,7 +725,7 @@ def subscription_payment_success(request):
             payment_record.save()
             frontend_url = getattr(settings, 'FRONTEND_BASE_URL', 'http://localhost:3003')
             failure_url = f"{frontend_url}/admin/login?payment=failed&error=verification_failed&message=Payment verification failed. Please try again."
-            logger.debug(f"[DEBUG] Payment not successful, redirecting to failure_url: {failure_url}")
+            logger.debug('[DEBUG] Payment not successful, redirecting to failure_url: %s', failure_url)
             return HttpResponseRedirect(failure_url)
     except Exception as e:
         payment_record.is_successful = False
@@ -734,12 +734,12 @@ def subscription_payment_success(request):
         payment_record.save()
         frontend_url = getattr(settings, 'FRONTEND_BASE_URL', 'http://localhost:3003')
         failure_url = f"{frontend_url}/admin/login?payment=failed&error=verification_error&message=Payment verification error. Please contact support."
-        logger.debug(f"[DEBUG] Exception during verification: {e}, redirecting to failure_url: {failure_url}")
+        logger.debug('[DEBUG] Exception during verification: %s, redirecting to failure_url: %s', e, failure_url)
         return HttpResponseRedirect(failure_url)
     except Exception as e:
         frontend_url = getattr(settings, 'FRONTEND_BASE_URL', 'http://localhost:3003')
         failure_url = f"{frontend_url}/admin/login?payment=failed&error=general_error&message=Payment processing error. Please try again."
-        logger.debug(f"[DEBUG] General exception: {e}, redirecting to failure_url: {failure_url}")
+        logger.debug('[DEBUG] General exception: %s, redirecting to failure_url: %s', e, failure_url)
         return HttpResponseRedirect(failure_url)
 
 
@@ -812,8 +812,8 @@ def cancel_subscription(request):
 @permission_classes([IsAuthenticated])
 def check_subscription_access(request):
     logger.debug("[DEBUG] check_subscription_access called")
-    logger.debug(f"[DEBUG] User: {getattr(request.user, 'email', str(request.user))}")
-    logger.debug(f"[DEBUG] Authenticated: {request.user.is_authenticated}")
+    logger.debug('[DEBUG] User: %s', getattr(request.user, 'email', str(request.user)))
+    logger.debug('[DEBUG] Authenticated: %s', request.user.is_authenticated)
     try:
         # Check if user is an employee
         if request.user.is_employee and request.user.created_by:
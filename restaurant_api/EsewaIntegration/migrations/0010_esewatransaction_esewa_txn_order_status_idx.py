@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EsewaIntegration', '0009_esewatransaction_order_details'),
+        ('qrgenerator', '0012_order_order_user_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='esewatransaction',
+            index=models.Index(fields=['order', 'status'], name='esewa_txn_order_status_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-19 01:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EsewaIntegration', '0010_esewatransaction_esewa_txn_order_status_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='esewatransaction',
+            name='tenant',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tenant_esewa_transactions', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
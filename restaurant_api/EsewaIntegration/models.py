@@ -1,5 +1,6 @@
 from django.db import models
-from qrgenerator.models import Order
+from django.conf import settings
+from qrgenerator.models import Order, Table
 import json
 
 class EsewaTransaction(models.Model):
@@ -12,6 +13,8 @@ class EsewaTransaction(models.Model):
     ]
 
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='esewa_transactions', null=True, blank=True)
+    # Owner of the order's table, copied at write time (see Order.tenant)
+    tenant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tenant_esewa_transactions', null=True, blank=True, editable=False)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     transaction_uuid = models.CharField(max_length=100, unique=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='INITIATED')
@@ -19,8 +22,27 @@ class EsewaTransaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['order', 'status'], name='esewa_txn_order_status_idx'),
+        ]
+
     def __str__(self):
         return f"eSewa Transaction {self.transaction_uuid} - {self.status}"
+
+    def save(self, *args, **kwargs):
+        if self.tenant_id is None:
+            self.tenant_id = self._resolve_tenant_id()
+        super().save(*args, **kwargs)
+
+    def _resolve_tenant_id(self):
+        """Tenant from the linked order, or from the stored table_id for temporary orders."""
+        if self.order_id is not None:
+            return self.order.tenant_id or self.order.table.user_id
+        details = self.get_order_details() or {}
+        if details.get('table_id'):
+            return Table.objects.filter(pk=details['table_id']).values_list('user_id', flat=True).first()
+        return None
     
     def set_order_details(self, order_data):
         """Store order details as JSON string"""
@@ -0,0 +1,41 @@
+"""
+Asynchronous client for eSewa's transaction status API.
+
+Customers poll check_transaction_status while they wait for a payment to
+settle. When our own record is still open we ask eSewa directly; the call is
+made with httpx's async client so a slow eSewa only parks a coroutine, not a
+worker thread, and it is bounded by ESEWA_STATUS_TIMEOUT.
+"""
+import logging
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# eSewa status -> EsewaTransaction.status; anything else (PENDING, NOT_FOUND, AMBIGUOUS...) leaves ours unchanged
+STATUS_MAP = {
+    'COMPLETE': 'COMPLETED',
+    'CANCELED': 'CANCELLED',
+}
+
+
+async def fetch_status(credentials, transaction):
+    """
+    eSewa's status string for `transaction`, or None if eSewa couldn't be
+    reached or didn't answer with one.
+    """
+    params = {
+        'product_code': credentials.esewa_product_code,
+        # Same formatting initiate_payment used when it signed the request
+        'total_amount': str(int(transaction.amount)),
+        'transaction_uuid': transaction.transaction_uuid,
+    }
+    try:
+        async with httpx.AsyncClient(timeout=settings.ESEWA_STATUS_TIMEOUT) as client:
+            response = await client.get(credentials.get_status_url(), params=params)
+            response.raise_for_status()
+            return response.json().get('status')
+    except (httpx.HTTPError, ValueError, AttributeError) as e:
+        logger.warning('[eSewa STATUS] Lookup failed for %s: %s', transaction.transaction_uuid, e)
+        return None
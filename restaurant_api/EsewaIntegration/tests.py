@@ -1,3 +1,185 @@
+import base64
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from esewaSecretKey.models import EsewaCredentials
+from our_menu.models import Category, ExtraCharge, MenuItem
+from qrgenerator.models import Order, Table
+from UserRole.models import CustomUser
+from .models import EsewaTransaction
+
+
+class CheckTransactionStatusTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pass', role='admin')
+        table = Table.objects.create(name='T1', user=self.admin)
+        self.order = Order.objects.create(id='ORD0001', table=table, user=self.admin, total=100, items=[])
+        self.transaction = EsewaTransaction.objects.create(order=self.order, amount=100, transaction_uuid='txn-1')
+        self.url = '/api/payments/esewa/status/?transaction_uuid=txn-1'
+
+    def _enable_esewa(self):
+        # fetch_status is patched, so the secret key is never decrypted
+        EsewaCredentials.objects.create(
+            admin=self.admin, esewa_product_code='EPAYTEST', esewa_secret_key_encrypted='encrypted', is_active=True,
+        )
+
+    def test_without_credentials_answers_from_our_record(self):
+        with mock.patch('EsewaIntegration.status_api.fetch_status') as fetch_status:
+            response = self.client.get(self.url)
+        fetch_status.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'INITIATED')
+
+    def test_open_transaction_is_settled_from_esewa(self):
+        self._enable_esewa()
+        with mock.patch('EsewaIntegration.status_api.fetch_status', return_value='COMPLETE') as fetch_status:
+            response = self.client.get(self.url)
+        fetch_status.assert_called_once()
+        self.assertEqual(response.json()['status'], 'COMPLETED')
+        self.transaction.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual((self.transaction.status, self.order.payment_status), ('COMPLETED', 'paid'))
+
+    def test_unreachable_esewa_leaves_the_transaction_open(self):
+        self._enable_esewa()
+        with mock.patch('EsewaIntegration.status_api.fetch_status', return_value=None):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()['status'], 'INITIATED')
+
+    def test_missing_transaction(self):
+        self.assertEqual(self.client.get('/api/payments/esewa/status/?transaction_uuid=nope').status_code, 404)
+        self.assertEqual(self.client.get('/api/payments/esewa/status/').status_code, 400)
+
+
+class OrderPricingTests(TestCase):
+    """eSewa charges, and recreates orders at, the prices on the restaurant's menu."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pass', role='admin')
+        self.table = Table.objects.create(name='T1', user=self.admin)
+        category = Category.objects.create(user=self.admin, name='Mains')
+        self.momo = MenuItem.objects.create(user=self.admin, name='Momo', price=100, category=category)
+        ExtraCharge.objects.create(user=self.admin, label='Service', amount='15.00')
+        EsewaCredentials.objects.create(
+            admin=self.admin, esewa_product_code='EPAYTEST', esewa_secret_key_encrypted='encrypted', is_active=True,
+        )
+        patcher = mock.patch.object(EsewaCredentials, 'decrypt_secret_key', return_value='secret')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _initiate(self, data):
+        return self.client.post('/api/payments/esewa/initiate/', data, content_type='application/json')
+
+    def test_new_order_is_charged_its_menu_total(self):
+        response = self._initiate({
+            'orderId': f'temp-{self.table.public_id}', 'amount': 1,
+            'items': [{'id': str(self.momo.pk), 'name': 'Momo', 'price': 1, 'quantity': 2}],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['total_amount'], response.json()['amount']), ('215', '215'))
+        transaction = EsewaTransaction.objects.get(transaction_uuid=response.json()['transaction_uuid'])
+        self.assertEqual(transaction.amount, Decimal('215.00'))
+        self.assertEqual(transaction.get_order_details()['items'], [{'id': str(self.momo.pk), 'name': 'Momo', 'price': 100.0, 'quantity': 2}])
+
+        self.assertEqual(self._initiate({'orderId': f'temp-{self.table.public_id}', 'amount': 1, 'items': [{'id': '999'}]}).status_code, 400)
+        self.assertEqual(self._initiate({'orderId': f'temp-{self.table.public_id}', 'amount': 1}).status_code, 400)
+
+    def test_existing_order_is_charged_its_stored_total(self):
+        Order.objects.create(id='ORD0001', table=self.table, user=self.admin, total=300, items=[])
+        response = self._initiate({'orderId': 'ORD0001', 'amount': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_amount'], '300')
+
+    def _recreate(self, items, amount):
+        transaction = EsewaTransaction.objects.create(amount=amount, transaction_uuid=f'txn-{amount}', status='COMPLETED')
+        transaction.set_order_details({
+            'table_id': self.table.pk, 'items': items, 'extra_charges_applied': [{'label': 'Service', 'amount': 15.0}],
+        })
+        response = self.client.post('/api/payments/esewa/recreate-order/', {'transaction_uuid': transaction.transaction_uuid}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return Order.objects.get(pk=response.json()['order_id'])
+
+    def test_recreated_order_is_priced_from_the_menu(self):
+        order = self._recreate([{'id': str(self.momo.pk), 'name': 'Free momo', 'price': 0, 'quantity': 2}], 215)
+        self.assertEqual(order.items, [{'id': str(self.momo.pk), 'name': 'Momo', 'price': 100.0, 'quantity': 2}])
+        self.assertEqual(order.total, Decimal('215.00'))
+
+        # An item taken off the menu since keeps what was paid for, in the stored shape
+        order = self._recreate([{'id': 'retired', 'name': 'Thali', 'price': '50', 'quantity': '2'}], 115)
+        self.assertEqual(order.items, [{'id': 'retired', 'name': 'Thali', 'price': 50.0, 'quantity': 2}])
+        self.assertEqual(order.total, Decimal('115.00'))
+
+
+class PaymentLedgerTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pass', role='admin')
+        other = CustomUser.objects.create_user(username='other', email='other@example.com', password='pass', role='admin')
+        table = Table.objects.create(name='T1', user=self.admin)
+        start = timezone.make_aware(datetime.datetime(2026, 3, 1, 12))
+        # ORD0001-ORD0004 paid in cash, ORD0005 paid through eSewa, ORD0006 still unpaid
+        for n in range(1, 7):
+            Order.objects.create(
+                id=f'ORD000{n}', table=table, user=self.admin, total=100 * n, items=[],
+                payment_status='paid' if n <= 4 else 'pending',
+            )
+            Order.objects.filter(pk=f'ORD000{n}').update(created_at=start + datetime.timedelta(minutes=n))
+        EsewaTransaction.objects.create(order_id='ORD0005', amount=500, transaction_uuid='txn-5', status='COMPLETED')
+        EsewaTransaction.objects.create(order_id='ORD0006', amount=600, transaction_uuid='txn-6')
+        Order.objects.create(id='ORD0007', table=Table.objects.create(name='T1', user=other), user=other, total=700, items=[], payment_status='paid')
+        self.client.force_login(self.admin)
+
+    def test_each_payment_appears_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            payments = self.client.get('/api/payments/').json()
+        self.assertEqual(len([q for q in queries if 'qrgenerator_order' in q['sql']]), 1)
+        self.assertEqual(
+            [(p['order']['id'], p['payment_method'], p['amount']) for p in payments],
+            [('ORD0005', 'esewa', 500.0), ('ORD0004', 'cash', 400.0), ('ORD0003', 'cash', 300.0), ('ORD0002', 'cash', 200.0), ('ORD0001', 'cash', 100.0)],
+        )
+        self.assertEqual(sum(p['amount'] for p in payments), 1500)
+        # The eSewa payment was made today, outside the range
+        ranged = self.client.get('/api/payments/?start_date=2026-03-01&end_date=2026-03-01').json()
+        self.assertEqual(ranged, payments[1:])
+
+    def test_cursor_pages_through_the_ledger(self):
+        expected = self.client.get('/api/payments/').json()
+        pages, cursor = [], ''
+        while cursor is not None:
+            page = self.client.get(f'/api/payments/?limit=2&cursor={cursor}').json()
+            self.assertLessEqual(len(page['results']), 2)
+            pages.extend(page['results'])
+            cursor = page['next_cursor']
+        self.assertEqual(pages, expected)
+
+    def test_malformed_cursor_is_rejected(self):
+        def encode(raw):
+            return base64.urlsafe_b64encode(raw.encode()).decode()
+
+        for cursor in [
+            'not-a-cursor',
+            encode('yesterday|ORD0001'),
+            encode('2026-03-01T12:01:00|ORD0001'),
+            encode('2026-03-01T12:01:00+00:00|'),
+            encode('2026-03-01T12:01:00+00:00|ORD\x000001'),
+            encode('2026-03-01T12:01:00+00:00|ORD00000000001'),
+            encode('2026-02-30T12:01:00+00:00|ORD0001'),
+        ]:
+            response = self.client.get(f'/api/payments/?cursor={cursor}')
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.json(), {'error': 'Invalid cursor'})
 
-# Create your tests here.
+    def test_scoped_to_the_restaurant(self):
+        waiter = CustomUser.objects.create_user(
+            username='waiter', email='waiter@example.com', password='pass', role='customer_support', is_employee=True, created_by=self.admin,
+        )
+        self.client.force_login(waiter)
+        self.assertNotIn('ORD0007', [p['order']['id'] for p in self.client.get('/api/payments/').json()])
+        self.assertEqual(len(self.client.get('/api/payments/').json()), 5)
+        self.client.force_login(CustomUser.objects.get(username='other'))
+        self.assertEqual([p['order']['id'] for p in self.client.get('/api/payments/').json()], ['ORD0007'])
@@ -2,15 +2,30 @@ import uuid
 import hmac
 import hashlib
 import base64
+from decimal import Decimal
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import require_GET
+from django.utils import timezone
+from . import status_api
 from .models import EsewaTransaction
 from qrgenerator.models import Order, Table
+from qrgenerator.order_items import OrderItemError, active_extra_charges, normalize_items, price_items
+from qrgenerator.renderers import json_response
+from qrgenerator.table_resolver import table_resolver
 from esewaSecretKey.models import EsewaCredentials
 from django.core.exceptions import ObjectDoesNotExist
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Transactions eSewa may still settle; check_transaction_status asks eSewa about these
+OPEN_STATUSES = ('INITIATED', 'PENDING')
 
 # Helper for HMAC SHA256 signature
 def generate_signature(key, message):
@@ -27,13 +42,12 @@ def generate_signature(key, message):
         # Convert the digest to a Base64-encoded string
         signature = base64.b64encode(digest).decode('utf-8')
         
-        print('[eSewa SIGNATURE] Message:', message.decode('utf-8'))
-        print('[eSewa SIGNATURE] Key:', key.decode('utf-8'))
-        print('[eSewa SIGNATURE] Generated signature:', signature)
+        logger.debug('[eSewa SIGNATURE] Message: %s', message.decode('utf-8'))
+        logger.debug('[eSewa SIGNATURE] Generated signature: %s', signature)
         
         return signature
     except Exception as e:
-        print('[eSewa SIGNATURE] Error generating signature:', str(e))
+        logger.exception('[eSewa SIGNATURE] Error generating signature: %s', str(e))
         raise
 
 @api_view(['POST'])
@@ -41,39 +55,17 @@ def generate_signature(key, message):
 def initiate_payment(request):
     try:
         data = request.data
-        print('[eSewa INITIATE] Received request data:', data)
+        logger.debug('[eSewa INITIATE] Received request data: %s', data)
         
-        amount = data.get('amount')
-        tax_amount = data.get('tax_amount', 0)
-        product_service_charge = data.get('product_service_charge', 0)
-        product_delivery_charge = data.get('product_delivery_charge', 0)
         order_id = data.get('orderId')
         
         if not order_id:
             return Response({'error': 'orderId is required'}, status=400)
 
-        # Calculate total_amount as per eSewa docs
-        try:
-            amount = float(amount)
-            tax_amount = float(tax_amount)
-            product_service_charge = float(product_service_charge)
-            product_delivery_charge = float(product_delivery_charge)
-        except (ValueError, TypeError) as e:
-            print('[eSewa INITIATE] Error converting amounts:', str(e))
-            return Response({'error': 'Invalid amount or charge fields'}, status=400)
-            
-        total_amount = amount + tax_amount + product_service_charge + product_delivery_charge
-
-        # Format all values as strings (no extra decimals)
-        try:
-            amount_str = str(int(amount))
-            tax_amount_str = str(int(tax_amount))
-            product_service_charge_str = str(int(product_service_charge))
-            product_delivery_charge_str = str(int(product_delivery_charge))
-            total_amount_str = str(int(total_amount))
-        except (ValueError, TypeError) as e:
-            print('[eSewa INITIATE] Error formatting amounts:', str(e))
-            return Response({'error': 'Error formatting amount values'}, status=400)
+        # The amount charged is the order total worked out on the server (menu prices
+        # plus the restaurant's extra charges, which that total already includes); the
+        # amount and charges the client posts are ignored
+        tax_amount = product_service_charge = product_delivery_charge = 0.0
 
         # Generate UUID for transaction
         transaction_uuid = str(uuid.uuid4())
@@ -85,7 +77,7 @@ def initiate_payment(request):
         order = None
         if order_id.startswith('temp-'):
             # This is a temporary order ID, we'll create the order after payment
-            print('[eSewa INITIATE] Temporary order ID detected:', order_id)
+            logger.debug('[eSewa INITIATE] Temporary order ID detected: %s', order_id)
             
             # Extract tableUid from the temporary order ID or request data
             table_uid = ''
@@ -99,23 +91,35 @@ def initiate_payment(request):
                 table_uid = data.get('tableUid', '')
             
             if table_uid:
-                try:
-                    # Find the table by public_id to get the admin
-                    table = Table.objects.get(public_id=table_uid)
-                    admin_user = table.admin or table.user
-                    print(f'[eSewa INITIATE] Found table {table.name} owned by admin: {admin_user.email if admin_user else "None"}')
-                except Table.DoesNotExist:
-                    print(f'[eSewa INITIATE] Table with public_id {table_uid} not found')
+                # Find the table by public_id to get the admin
+                table = table_resolver.resolve(uid=table_uid)
+                if not table:
+                    logger.debug('[eSewa INITIATE] Table with public_id %s not found', table_uid)
                     return Response({'error': 'Table not found'}, status=404)
+                admin_user = get_user_model().objects.filter(pk=table.admin_id).first()
+                logger.debug('[eSewa INITIATE] Found table %s owned by admin: %s', table.table_id, admin_user.email if admin_user else "None")
             else:
-                print('[eSewa INITIATE] No tableUid provided for temporary order')
+                logger.debug('[eSewa INITIATE] No tableUid provided for temporary order')
                 return Response({'error': 'tableUid is required for temporary orders'}, status=400)
             
+            # Price the cart from the menu, as a new order would be
+            try:
+                items, subtotal = price_items(data.get('items'), table.admin_id)
+            except OrderItemError as e:
+                return Response({'error': str(e)}, status=400)
+            if not items:
+                return Response({'error': 'At least one item is required'}, status=400)
+            extra_charges_applied = active_extra_charges(table.admin_id)
+            total_amount = float(subtotal + sum(Decimal(str(charge['amount'])) for charge in extra_charges_applied))
+
             # Get order details from request data for storage
             order_details = {
-                'table_id': table.id if table else None,
+                'table_id': table.table_id,
                 'customer_name': data.get('customerName', 'Customer'),
-                'items': data.get('items', []),
+                'items': items,
+                'extra_charges_applied': extra_charges_applied,
+                'dining_option': data.get('diningOption', 'dine-in'),
+                'special_instructions': data.get('specialInstructions', ''),
                 'total_amount': total_amount,
                 'tax_amount': tax_amount,
                 'product_service_charge': product_service_charge,
@@ -131,7 +135,7 @@ def initiate_payment(request):
                 )
                 # Store order details for later recreation
                 transaction.set_order_details(order_details)
-                print('[eSewa INITIATE] Stored order details for transaction:', transaction_uuid)
+                logger.debug('[eSewa INITIATE] Stored order details for transaction: %s', transaction_uuid)
 
                 # Send confirmation email to the admin
                 from django.core.mail import send_mail
@@ -151,7 +155,7 @@ def initiate_payment(request):
                     fail_silently=False,
                 )
             except Exception as e:
-                print('[eSewa INITIATE] Error creating transaction:', str(e))
+                logger.exception('[eSewa INITIATE] Error creating transaction: %s', str(e))
                 return Response({'error': 'Error creating transaction record'}, status=500)
         else:
             # Get order and enforce existence for existing orders
@@ -159,23 +163,16 @@ def initiate_payment(request):
                 order = Order.objects.get(id=order_id)
                 # Get the admin who owns this table
                 admin_user = order.table.admin or order.table.user
-                print(f'[eSewa INITIATE] Found order {order.id} for table {order.table.name} owned by admin: {admin_user.email if admin_user else "None"}')
-                
-                # Get order details for storage
-                order_items = []
-                for item in order.items.all():
-                    order_items.append({
-                        'id': item.menu_item.id,
-                        'name': item.menu_item.name,
-                        'quantity': item.quantity,
-                        'price': float(item.price)
-                    })
+                logger.debug('[eSewa INITIATE] Found order %s for table %s owned by admin: %s', order.id, order.table.name, admin_user.email if admin_user else "None")
                 
+                # The order was priced when it was placed; charge its stored total
+                total_amount = float(order.total)
                 order_details = {
                     'table_id': order.table.id if order.table else None,
                     'customer_name': order.customer_name,
-                    'items': order_items,
-                    'total_amount': float(order.total_amount),
+                    'items': order.items or [],
+                    'extra_charges_applied': order.extra_charges_applied or [],
+                    'total_amount': total_amount,
                     'tax_amount': 0,  # Add if you have tax in orders
                     'product_service_charge': 0,  # Add if you have service charge in orders
                     'product_delivery_charge': 0  # Add if you have delivery charge in orders
@@ -191,7 +188,7 @@ def initiate_payment(request):
                     )
                     # Store order details for later recreation
                     transaction.set_order_details(order_details)
-                    print('[eSewa INITIATE] Stored order details for existing order transaction:', transaction_uuid)
+                    logger.debug('[eSewa INITIATE] Stored order details for existing order transaction: %s', transaction_uuid)
 
                     # Send confirmation email to the admin
                     from django.core.mail import send_mail
@@ -211,37 +208,43 @@ def initiate_payment(request):
                         fail_silently=False,
                     )
                 except Exception as e:
-                    print('[eSewa INITIATE] Error creating transaction:', str(e))
+                    logger.exception('[eSewa INITIATE] Error creating transaction: %s', str(e))
                     return Response({'error': 'Error creating transaction record'}, status=500)
                     
             except Order.DoesNotExist:
-                print('[eSewa INITIATE] Error: Order not found')
+                logger.warning('[eSewa INITIATE] Error: Order not found')
                 return Response({'error': 'Order not found'}, status=404)
             except Exception as e:
-                print('[eSewa INITIATE] Error fetching order:', str(e))
+                logger.exception('[eSewa INITIATE] Error fetching order: %s', str(e))
                 return Response({'error': 'Error fetching order'}, status=500)
 
+        # Format all values as strings (no extra decimals)
+        amount_str = total_amount_str = str(int(total_amount))
+        tax_amount_str = str(int(tax_amount))
+        product_service_charge_str = str(int(product_service_charge))
+        product_delivery_charge_str = str(int(product_delivery_charge))
+
         # Get the admin's eSewa credentials
         if not admin_user:
-            print('[eSewa INITIATE] Error: Could not determine admin user for this order/table')
+            logger.warning('[eSewa INITIATE] Error: Could not determine admin user for this order/table')
             return Response({'error': 'Could not determine restaurant owner for this order'}, status=400)
         
         try:
             credentials = EsewaCredentials.objects.get(admin=admin_user, is_active=True)
             if not credentials.is_esewa_enabled():
-                print(f'[eSewa INITIATE] Error: eSewa not properly configured for admin {admin_user.email}')
+                logger.warning('[eSewa INITIATE] Error: eSewa not properly configured for admin %s', admin_user.email)
                 return Response({'error': 'eSewa payment is not configured for this restaurant'}, status=400)
             
             product_code = credentials.esewa_product_code
             secret_key = credentials.decrypt_secret_key()
-            print(f'[eSewa INITIATE] Using eSewa credentials for admin: {admin_user.email}')
-            print(f'[eSewa INITIATE] Product code: {credentials.get_masked_product_code()}')
+            logger.debug('[eSewa INITIATE] Using eSewa credentials for admin: %s', admin_user.email)
+            logger.debug('[eSewa INITIATE] Product code: %s', credentials.get_masked_product_code())
             
         except EsewaCredentials.DoesNotExist:
-            print(f'[eSewa INITIATE] Error: No eSewa credentials found for admin {admin_user.email}')
+            logger.warning('[eSewa INITIATE] Error: No eSewa credentials found for admin %s', admin_user.email)
             return Response({'error': 'eSewa payment is not configured for this restaurant'}, status=400)
         except Exception as e:
-            print(f'[eSewa INITIATE] Error getting eSewa credentials: {str(e)}')
+            logger.exception('[eSewa INITIATE] Error getting eSewa credentials: %s', str(e))
             return Response({'error': 'Error accessing eSewa configuration'}, status=500)
 
         # Use production or test environment based on credentials
@@ -250,7 +253,7 @@ def initiate_payment(request):
         import os
         frontend_base_url = os.environ.get('FRONTEND_BASE_URL', 'https://qr-menu-code.netlify.app')
 
-        print('[eSewa INITIATE] Configuration:', {
+        logger.debug('[eSewa INITIATE] Configuration: %s', {
             'product_code': credentials.get_masked_product_code(),
             'payment_url': payment_url,
             'frontend_base_url': frontend_base_url,
@@ -264,15 +267,15 @@ def initiate_payment(request):
 
         # Create signature string exactly as per the example
         data_to_sign = f"total_amount={total_amount_str},transaction_uuid={transaction_uuid},product_code={product_code}"
-        print('[eSewa INITIATE] Data to sign:', data_to_sign)
+        logger.debug('[eSewa INITIATE] Data to sign: %s', data_to_sign)
         
         try:
             signature = generate_signature(secret_key, data_to_sign)
         except Exception as e:
-            print('[eSewa INITIATE] Error generating signature:', str(e))
+            logger.exception('[eSewa INITIATE] Error generating signature: %s', str(e))
             return Response({'error': 'Error generating signature'}, status=500)
             
-        print('[eSewa INITIATE] Signature:', signature)
+        logger.debug('[eSewa INITIATE] Signature: %s', signature)
 
         # Prepare form data (all as strings)
         if order_id.startswith('temp-'):
@@ -301,7 +304,7 @@ def initiate_payment(request):
             table_uid = order.table.public_id if hasattr(order.table, 'public_id') else ''
             failure_url = f'{frontend_base_url}/menu/payment-cancelled?order_id={order_id}&tableUid={table_uid}'
         
-        print('[eSewa INITIATE] Generated URLs:', {
+        logger.debug('[eSewa INITIATE] Generated URLs: %s', {
             'success_url': success_url,
             'failure_url': failure_url
         })
@@ -320,13 +323,11 @@ def initiate_payment(request):
             'signature': signature,
             'payment_url': payment_url,
         }
-        print('[eSewa INITIATE] Full payment data:', payment_data)
+        logger.debug('[eSewa INITIATE] Full payment data: %s', payment_data)
         return Response(payment_data)
         
     except Exception as e:
-        print('[eSewa INITIATE] Unexpected error:', str(e))
-        import traceback
-        print('[eSewa INITIATE] Traceback:', traceback.format_exc())
+        logger.exception('[eSewa INITIATE] Unexpected error: %s', str(e))
         return Response({'error': 'Internal server error', 'details': str(e)}, status=500)
 
 @api_view(['GET'])
@@ -341,7 +342,7 @@ def verify_payment(request):
         if not transaction_uuid or not data:
             # Try to parse the URL manually
             full_url = request.get_full_path()
-            print('[eSewa VERIFY] Full URL:', full_url)
+            logger.debug('[eSewa VERIFY] Full URL: %s', full_url)
             
             # Look for transaction_uuid and data in the URL
             if 'transaction_uuid=' in full_url:
@@ -357,39 +358,36 @@ def verify_payment(request):
                     data_start = full_url.find('data=') + len('data=')
                     data = full_url[data_start:]
         
-        print('[eSewa VERIFY] Received verification request:')
-        print('[eSewa VERIFY] Transaction UUID:', transaction_uuid)
-        print('[eSewa VERIFY] Data:', data)
-        print('[eSewa VERIFY] All query params:', dict(request.GET))
+        logger.debug('[eSewa VERIFY] Received verification request:')
+        logger.debug('[eSewa VERIFY] Transaction UUID: %s', transaction_uuid)
+        logger.debug('[eSewa VERIFY] Data: %s', data)
+        logger.debug('[eSewa VERIFY] All query params: %s', dict(request.GET))
         
         if not transaction_uuid:
-            print('[eSewa VERIFY] Error: Transaction UUID is required')
+            logger.warning('[eSewa VERIFY] Error: Transaction UUID is required')
             return Response({'status': 'error', 'message': 'Transaction UUID is required'}, status=400)
             
         # Get transaction
         try:
             transaction = EsewaTransaction.objects.get(transaction_uuid=transaction_uuid)
-            print('[eSewa VERIFY] Found transaction:', transaction.transaction_uuid)
-            print('[eSewa VERIFY] Current transaction status:', transaction.status)
+            logger.debug('[eSewa VERIFY] Found transaction: %s', transaction.transaction_uuid)
+            logger.debug('[eSewa VERIFY] Current transaction status: %s', transaction.status)
             if transaction.order:
-                print('[eSewa VERIFY] Current order payment status:', transaction.order.payment_status)
+                logger.debug('[eSewa VERIFY] Current order payment status: %s', transaction.order.payment_status)
             else:
-                print('[eSewa VERIFY] No order associated with transaction (temporary order)')
+                logger.debug('[eSewa VERIFY] No order associated with transaction (temporary order)')
         except EsewaTransaction.DoesNotExist:
-            print('[eSewa VERIFY] Error: Transaction not found')
+            logger.warning('[eSewa VERIFY] Error: Transaction not found')
             return Response({'status': 'error', 'message': 'Transaction not found'}, status=404)
             
         # If transaction is already completed, return success
         if transaction.status == 'COMPLETED':
-            print('[eSewa VERIFY] Transaction already completed')
+            logger.info('[eSewa VERIFY] Transaction already completed')
             if transaction.order:
                 order = transaction.order
                 # Ensure order payment status is set to paid
-                if order.payment_status != 'paid':
-                    order.payment_status = 'paid'
-                    order.payment_method = 'esewa'
-                    order.save()
-                    print('[eSewa VERIFY] Updated order payment status to paid')
+                if order.mark_paid('esewa'):
+                    logger.info('[eSewa VERIFY] Updated order payment status to paid')
                 return Response({
                     'status': 'success',
                     'message': 'Payment already verified',
@@ -405,7 +403,7 @@ def verify_payment(request):
             
         # If transaction is already cancelled, return error
         if transaction.status == 'CANCELLED':
-            print('[eSewa VERIFY] Transaction already cancelled')
+            logger.debug('[eSewa VERIFY] Transaction already cancelled')
             if transaction.order:
                 return Response({
                     'status': 'error',
@@ -430,24 +428,23 @@ def verify_payment(request):
                 decoded_data = base64.b64decode(data).decode('utf-8')
                 response_data = json.loads(decoded_data)
                 
-                print('[eSewa VERIFY] Decoded response data:', response_data)
+                logger.debug('[eSewa VERIFY] Decoded response: transaction_uuid=%s status=%s',
+                             response_data.get('transaction_uuid'), response_data.get('status'))
                 
                 # Check if payment was successful
                 if response_data.get('status') == 'COMPLETE':
-                    print('[eSewa VERIFY] Payment status is COMPLETE')
+                    logger.debug('[eSewa VERIFY] Payment status is COMPLETE')
                     
                     # Update transaction status
                     transaction.status = 'COMPLETED'
                     transaction.save()
-                    print('[eSewa VERIFY] Transaction status updated to COMPLETED')
+                    logger.info('[eSewa VERIFY] Transaction status updated to COMPLETED')
                     
                     # Update order status to paid if order exists
                     if transaction.order:
                         order = transaction.order
-                        order.payment_status = 'paid'
-                        order.payment_method = 'esewa'
-                        order.save()
-                        print('[eSewa VERIFY] Order payment status updated to paid')
+                        order.mark_paid('esewa')
+                        logger.info('[eSewa VERIFY] Order payment status updated to paid')
                     
                     return Response({
                         'status': 'success',
@@ -464,7 +461,7 @@ def verify_payment(request):
                         transaction.status = 'FAILED'
                     transaction.save()
 
-                    print(f"[eSewa VERIFY] Payment not completed. Status: {transaction.status}")
+                    logger.info('[eSewa VERIFY] Payment not completed. Status: %s', transaction.status)
                     if transaction.order:
                         return Response({
                             'status': 'error',
@@ -480,14 +477,14 @@ def verify_payment(request):
                         })
                 
             except Exception as e:
-                print('[eSewa VERIFY] Error processing response data:', str(e))
+                logger.exception('[eSewa VERIFY] Error processing response data: %s', str(e))
                 # Don't return error here, continue to manual verification
                 pass
         
         # If no data is provided and transaction is still INITIATED, 
         # we cannot determine the payment status reliably
         # Return pending status instead of assuming success
-        print('[eSewa VERIFY] No clear success/failure indicators, cannot determine payment status')
+        logger.warning('[eSewa VERIFY] No clear success/failure indicators, cannot determine payment status')
         if transaction.order:
             return Response({
                 'status': 'pending',
@@ -503,22 +500,43 @@ def verify_payment(request):
             })
         
     except Exception as e:
-        print('[eSewa VERIFY] Unexpected error:', str(e))
-        import traceback
-        print('[eSewa VERIFY] Traceback:', traceback.format_exc())
+        logger.exception('[eSewa VERIFY] Unexpected error: %s', str(e))
         return Response({'status': 'error', 'message': 'Internal server error', 'details': str(e)}, status=500)
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def check_transaction_status(request):
-    transaction_uuid = request.query_params.get('transaction_uuid')
+async def _refresh_from_esewa(transaction):
+    """Ask eSewa about a still-open transaction and record a final answer, marking the order paid."""
+    credentials = await EsewaCredentials.objects.filter(admin_id=transaction.tenant_id).afirst()
+    if not credentials or not credentials.is_esewa_enabled():
+        return
+    new_status = status_api.STATUS_MAP.get(await status_api.fetch_status(credentials, transaction))
+    if not new_status:
+        return
+    # Conditional update: verify_payment may have settled it while we were waiting on eSewa
+    updated = await EsewaTransaction.objects.filter(
+        pk=transaction.pk, status__in=OPEN_STATUSES,
+    ).aupdate(status=new_status, updated_at=timezone.now())
+    if not updated:
+        await transaction.arefresh_from_db(fields=['status'])
+        return
+    transaction.status = new_status
+    logger.info('[eSewa STATUS] Transaction %s is %s according to eSewa', transaction.transaction_uuid, new_status)
+    if new_status == 'COMPLETED' and transaction.order_id:
+        order = await Order.objects.filter(pk=transaction.order_id).afirst()
+        if order:
+            await sync_to_async(order.mark_paid)('esewa')
+
+
+@require_GET
+async def check_transaction_status(request):
+    transaction_uuid = request.GET.get('transaction_uuid')
     if not transaction_uuid:
-        return Response({"error": "Transaction UUID is required"}, status=400)
-    try:
-        transaction = EsewaTransaction.objects.get(transaction_uuid=transaction_uuid)
-    except EsewaTransaction.DoesNotExist:
-        return Response({"error": "Transaction not found"}, status=404)
-    return Response({
+        return json_response({"error": "Transaction UUID is required"}, status=400)
+    transaction = await EsewaTransaction.objects.filter(transaction_uuid=transaction_uuid).afirst()
+    if transaction is None:
+        return json_response({"error": "Transaction not found"}, status=404)
+    if transaction.status in OPEN_STATUSES and transaction.tenant_id:
+        await _refresh_from_esewa(transaction)
+    return json_response({
         "transaction_uuid": transaction.transaction_uuid,
         "status": transaction.status,
         "amount": float(transaction.amount),
@@ -539,9 +557,9 @@ def cancel_payment(request):
                 # Mark transaction as cancelled
                 transaction.status = 'CANCELLED'
                 transaction.save()
-                print(f'[eSewa CANCEL] Transaction {transaction_uuid} marked as cancelled')
+                logger.info('[eSewa CANCEL] Transaction %s marked as cancelled', transaction_uuid)
             except EsewaTransaction.DoesNotExist:
-                print(f'[eSewa CANCEL] Transaction {transaction_uuid} not found')
+                logger.debug('[eSewa CANCEL] Transaction %s not found', transaction_uuid)
         
         # Redirect to menu page
         import os
@@ -566,7 +584,7 @@ def cancel_payment(request):
         })
         
     except Exception as e:
-        print('[eSewa CANCEL] Error:', str(e))
+        logger.exception('[eSewa CANCEL] Error: %s', str(e))
         return Response({
             'status': 'error',
             'message': 'Error processing cancellation'
@@ -609,10 +627,9 @@ def link_transaction_to_order(request):
         transaction.save()
         
         # Update the order with the transaction_uuid
-        order.transaction_uuid = transaction_uuid
-        order.save()
+        order.link_transaction(transaction_uuid)
         
-        print(f'[eSewa LINK] Linked transaction {transaction_uuid} to order {order_id}')
+        logger.info('[eSewa LINK] Linked transaction %s to order %s', transaction_uuid, order_id)
         
         return Response({
             'status': 'success',
@@ -620,7 +637,7 @@ def link_transaction_to_order(request):
         })
         
     except Exception as e:
-        print('[eSewa LINK] Error:', str(e))
+        logger.exception('[eSewa LINK] Error: %s', str(e))
         return Response({
             'status': 'error',
             'message': 'Error linking transaction to order'
@@ -632,11 +649,10 @@ def recreate_order_from_transaction(request):
     """Recreate an order from transaction data when frontend localStorage is cleared"""
     try:
         transaction_uuid = request.data.get('transaction_uuid')
-        print(f'[eSewa RECREATE] Received request data: {request.data}')
-        print(f'[eSewa RECREATE] Transaction UUID: {transaction_uuid}')
+        logger.debug('[eSewa RECREATE] Transaction UUID: %s', transaction_uuid)
         
         if not transaction_uuid:
-            print('[eSewa RECREATE] Error: transaction_uuid is required')
+            logger.warning('[eSewa RECREATE] Error: transaction_uuid is required')
             return Response({
                 'status': 'error', 
                 'message': 'transaction_uuid is required'
@@ -645,14 +661,9 @@ def recreate_order_from_transaction(request):
         # Get the transaction
         try:
             transaction = EsewaTransaction.objects.get(transaction_uuid=transaction_uuid)
-            print(f'[eSewa RECREATE] Found transaction: {transaction.transaction_uuid}, status: {transaction.status}')
+            logger.debug('[eSewa RECREATE] Found transaction: %s, status: %s', transaction.transaction_uuid, transaction.status)
         except EsewaTransaction.DoesNotExist:
-            print(f'[eSewa RECREATE] Transaction not found: {transaction_uuid}')
-            # List all available transaction UUIDs for debugging
-            all_transactions = EsewaTransaction.objects.all()[:10]
-            print(f'[eSewa RECREATE] Available transactions (first 10):')
-            for t in all_transactions:
-                print(f'  - {t.transaction_uuid} (status: {t.status})')
+            logger.debug('[eSewa RECREATE] Transaction not found: %s', transaction_uuid)
             return Response({
                 'status': 'error', 
                 'message': 'Transaction not found'
@@ -683,7 +694,7 @@ def recreate_order_from_transaction(request):
         
         # If order details are incomplete, create minimal order details
         if not order_details.get('items') or not order_details.get('table_id'):
-            print('[eSewa RECREATE] Order details incomplete, creating minimal order')
+            logger.debug('[eSewa RECREATE] Order details incomplete, creating minimal order')
             # Create minimal order details for this transaction
             order_details = {
                 'table_id': None,  # Will use default table
@@ -705,7 +716,7 @@ def recreate_order_from_transaction(request):
             import time
             from django.utils import timezone
             
-            print(f'[eSewa RECREATE] Order details: {order_details}')
+            logger.debug('[eSewa RECREATE] Order details: %s', order_details)
             
             # Get or create a default table if table_id is None
             table = None
@@ -713,7 +724,7 @@ def recreate_order_from_transaction(request):
                 try:
                     table = Table.objects.get(id=order_details.get('table_id'))
                 except Table.DoesNotExist:
-                    print(f'[eSewa RECREATE] Table {order_details.get("table_id")} not found, using default')
+                    logger.debug('[eSewa RECREATE] Table %s not found, using default', order_details.get("table_id"))
             
             if not table:
                 # Use the first available table as default
@@ -723,41 +734,52 @@ def recreate_order_from_transaction(request):
                         'status': 'error',
                         'message': 'No tables available in the system'
                     }, status=500)
-                print(f'[eSewa RECREATE] Using default table: {table.name}')
+                logger.debug('[eSewa RECREATE] Using default table: %s', table.name)
             
+            # Price the items from the menu like any new order. The minimal order has none
+            # to price, and an item that has left the menu since keeps what was paid for.
+            items, total = [], transaction.amount
+            if order_details.get('items'):
+                try:
+                    items, subtotal = price_items(order_details['items'], table.user_id)
+                    total = subtotal + sum(Decimal(str(charge['amount'])) for charge in order_details.get('extra_charges_applied', []))
+                except OrderItemError as e:
+                    logger.warning('[eSewa RECREATE] Keeping the paid items of transaction %s: %s', transaction_uuid, e)
+                    try:
+                        items = normalize_items(order_details['items'])
+                    except (TypeError, ValueError):
+                        items = []
+                if total != transaction.amount:
+                    logger.warning('[eSewa RECREATE] Order total %s differs from the %s paid in transaction %s', total, transaction.amount, transaction_uuid)
+
             # Generate unique order ID
-            def generate_unique_order_id():
-                today = timezone.now().date()
-                count = Order.objects.filter(created_at__date=today).count()
-                timestamp = str(int(time.time()))[-4:]
-                return f"ORD{timestamp}{count+1:03d}"
-            
+            from qrgenerator.views import generate_unique_order_id
             order_id = generate_unique_order_id()
-            print(f'[eSewa RECREATE] Generated order ID: {order_id}')
+            logger.debug('[eSewa RECREATE] Generated order ID: %s', order_id)
             
             # Create the order with correct field names
             order = Order.objects.create(
                 id=order_id,  # Set the generated ID
                 table=table,  # Use table object, not table_id
                 customer_name=order_details.get('customer_name', 'Customer'),
-                total=transaction.amount,  # Use 'total' not 'total_amount'
+                total=total,  # Use 'total' not 'total_amount'
                 payment_status='paid',
                 payment_method='esewa',
                 transaction_uuid=transaction_uuid,
                 status='confirmed',
-                items=order_details.get('items', []),  # Store items as JSON
+                items=items,
                 dining_option=order_details.get('dining_option', 'dine-in'),
                 special_instructions=order_details.get('special_instructions', ''),
                 extra_charges_applied=order_details.get('extra_charges_applied', []),
                 user=table.user  # Assign the table's user (admin)
             )
-            print(f'[eSewa RECREATE] Created order: {order.id}')
+            logger.info('[eSewa RECREATE] Created order: %s', order.id)
             
             # Link transaction to order
             transaction.order = order
             transaction.save()
             
-            print(f'[eSewa RECREATE] Successfully recreated order {order.id} from transaction {transaction_uuid}')
+            logger.info('[eSewa RECREATE] Successfully recreated order %s from transaction %s', order.id, transaction_uuid)
             
             return Response({
                 'status': 'success',
@@ -766,16 +788,14 @@ def recreate_order_from_transaction(request):
             })
             
         except Exception as e:
-            print(f'[eSewa RECREATE] Error creating order: {str(e)}')
-            import traceback
-            print(f'[eSewa RECREATE] Traceback: {traceback.format_exc()}')
+            logger.exception('[eSewa RECREATE] Error creating order: %s', str(e))
             return Response({
                 'status': 'error',
                 'message': 'Error creating order from transaction data'
             }, status=500)
         
     except Exception as e:
-        print('[eSewa RECREATE] Error:', str(e))
+        logger.exception('[eSewa RECREATE] Error: %s', str(e))
         return Response({
             'status': 'error',
             'message': 'Error recreating order'
@@ -0,0 +1,102 @@
+"""
+Inventory alerts, kept in step with stock and expiry dates.
+
+refresh_stock_alerts() runs in the transaction that moved stock (see
+ledger.py), over only the items that moved: 'out_of_stock' for items at
+zero, 'low_stock' for items at or under their minimum threshold. Expiry
+alerts come from scan_expiring() (`manage.py scan_expiring_inventory`, run
+daily). Either way an alert is raised once, when the item gets into that
+state, and removed when it gets out of it; a read alert stays read.
+
+The unread count behind the admin header badge is cached per restaurant
+and forgotten whenever one of its alerts changes. The forgetting happens in
+whichever process changed the alert (a worker, or the daily scan), so the
+cache must be shared: production runs on Redis (REDIS_URL) and settings
+refuse to start without it.
+"""
+import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import InventoryAlert, InventoryItem
+
+UNREAD_COUNT_TTL = 300
+# Items expiring within this many days get an expiry alert
+EXPIRY_WARNING_DAYS = 3
+
+
+def _unread_count_key(tenant_id):
+    return f'inventory:unread-alerts:{tenant_id}'
+
+
+def unread_count(tenant_id):
+    """Number of the restaurant's unread alerts, cached."""
+    count = cache.get(_unread_count_key(tenant_id))
+    if count is None:
+        count = InventoryAlert.objects.filter(item__created_by_id=tenant_id, is_read=False).count()
+        cache.set(_unread_count_key(tenant_id), count, UNREAD_COUNT_TTL)
+    return count
+
+
+def forget_unread_counts(tenant_ids):
+    tenant_ids = {tenant_id for tenant_id in tenant_ids if tenant_id}
+    if tenant_ids:
+        # After commit, or the count could be cached again from the old alerts
+        transaction.on_commit(lambda: cache.delete_many([_unread_count_key(tenant_id) for tenant_id in tenant_ids]))
+
+
+def _sync_alerts(alert_type, wanted, item_ids=None):
+    """
+    Give each item in `wanted` ({item id: (restaurant id, message)}) an
+    `alert_type` alert and take it away from every other item, or only from
+    the other `item_ids` when given. Returns (alerts raised, alerts removed).
+    """
+    alerts = InventoryAlert.objects.filter(alert_type=alert_type)
+    if item_ids is not None:
+        alerts = alerts.filter(item_id__in=item_ids)
+    stale = list(alerts.exclude(item_id__in=list(wanted)).values_list('pk', 'item__created_by_id'))
+    if stale:
+        InventoryAlert.objects.filter(pk__in=[pk for pk, _ in stale]).delete()
+    alerted = set(alerts.filter(item_id__in=list(wanted)).values_list('item_id', flat=True))
+    raised = InventoryAlert.objects.bulk_create([
+        InventoryAlert(item_id=item_id, alert_type=alert_type, message=message)
+        for item_id, (_, message) in wanted.items() if item_id not in alerted
+    ])
+    forget_unread_counts({tenant_id for _, tenant_id in stale} | {wanted[alert.item_id][0] for alert in raised})
+    return len(raised), len(stale)
+
+
+def refresh_stock_alerts(item_ids):
+    """Bring the stock alerts of the items in `item_ids` up to date, in a fixed number of queries."""
+    item_ids = set(item_ids)
+    if not item_ids:
+        return
+    out_of_stock, low_stock = {}, {}
+    items = InventoryItem.objects.filter(pk__in=item_ids).values_list('pk', 'created_by_id', 'name', 'current_stock', 'minimum_threshold')
+    for item_id, tenant_id, name, stock, threshold in items:
+        if stock <= 0:
+            out_of_stock[item_id] = (tenant_id, f'{name} is out of stock.')
+        elif stock <= threshold:
+            low_stock[item_id] = (tenant_id, f'{name} is in low stock.')
+    _sync_alerts('out_of_stock', out_of_stock, item_ids)
+    _sync_alerts('low_stock', low_stock, item_ids)
+
+
+def scan_expiring(days=EXPIRY_WARNING_DAYS, today=None):
+    """
+    Raise expiry alerts for items in stock that expire within `days` (or
+    have expired) and remove those of items that no longer do. Returns
+    (alerts raised, alerts removed).
+    """
+    today = today or timezone.localdate()
+    expiring = InventoryItem.objects.filter(
+        expiry_date__lte=today + datetime.timedelta(days=days), current_stock__gt=0,
+    ).values_list('pk', 'created_by_id', 'name', 'expiry_date')
+    wanted = {
+        item_id: (tenant_id, f'{name} expired on {expiry_date}.' if expiry_date < today else f'{name} expires on {expiry_date}.')
+        for item_id, tenant_id, name, expiry_date in expiring.iterator()
+    }
+    with transaction.atomic():
+        return _sync_alerts('expiry', wanted)
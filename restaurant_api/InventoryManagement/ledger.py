@@ -0,0 +1,106 @@
+"""
+Stock levels, moved only by the StockIn / StockOut ledger.
+
+A movement is recorded once and never edited; recording it applies its
+quantity to InventoryItem.current_stock with a single conditional UPDATE
+(`current_stock = current_stock - q WHERE current_stock >= q` for stock
+out), so concurrent orders taking the same ingredient can neither lose an
+update nor take stock below zero. Items are updated in id order, which keeps
+two batches touching the same items from deadlocking, and the stock alerts
+of every item moved are brought up to date in the same transaction (see
+alerts.py).
+"""
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .alerts import refresh_stock_alerts
+from .models import IngredientMapping, InventoryItem, StockIn, StockOut
+
+
+class InsufficientStock(ValueError):
+    """A stock out for more of an item than is in stock."""
+
+
+def _item_quantities(movements):
+    quantities = defaultdict(Decimal)
+    for movement in movements:
+        quantities[movement.item_id] += Decimal(movement.quantity)
+    return quantities
+
+
+def add_stock(quantities):
+    """Add {item id: quantity} to current stock. Call inside a transaction."""
+    now = timezone.now()
+    for item_id in sorted(quantities):
+        InventoryItem.objects.filter(pk=item_id).update(
+            current_stock=F('current_stock') + quantities[item_id], updated_at=now,
+        )
+
+
+def take_stock(quantities):
+    """
+    Take {item id: quantity} from current stock, or raise InsufficientStock.
+
+    Call inside a transaction: when one item is short, the items already
+    taken are put back by the rollback.
+    """
+    now = timezone.now()
+    for item_id in sorted(quantities):
+        quantity = quantities[item_id]
+        taken = InventoryItem.objects.filter(pk=item_id, current_stock__gte=quantity).update(
+            current_stock=F('current_stock') - quantity, updated_at=now,
+        )
+        if not taken:
+            name = InventoryItem.objects.filter(pk=item_id).values_list('name', flat=True).first()
+            raise InsufficientStock(f"Insufficient stock for {name}")
+
+
+def record(movements):
+    """
+    Save new StockIn / StockOut rows and apply them to stock, all or nothing.
+
+    Raises InsufficientStock, saving none of them, if the stock outs take
+    more of an item than is in stock.
+    """
+    stock_ins = [movement for movement in movements if isinstance(movement, StockIn)]
+    stock_outs = [movement for movement in movements if isinstance(movement, StockOut)]
+    incoming, outgoing = _item_quantities(stock_ins), _item_quantities(stock_outs)
+    with transaction.atomic():
+        add_stock(incoming)
+        take_stock(outgoing)
+        # bulk_create skips save(), which would apply the quantities again
+        StockIn.objects.bulk_create(stock_ins)
+        StockOut.objects.bulk_create(stock_outs)
+        refresh_stock_alerts(incoming.keys() | outgoing.keys())
+    return movements
+
+
+def order_stock_outs(order_id, items, created_by_id):
+    """
+    Unsaved StockOuts for the ingredients of an order's items (the order's
+    items JSON), from one IngredientMapping query.
+    """
+    portions = defaultdict(Decimal)
+    for item in items:
+        try:
+            portions[int(item.get('id'))] += Decimal(item.get('quantity', 1))
+        except (TypeError, ValueError, InvalidOperation):
+            continue
+    today = timezone.now().date()
+    return [
+        StockOut(
+            item_id=ingredient_id,
+            quantity=quantity * portions[dish_id],
+            date=today,
+            reason='used',
+            dish_id=dish_id,
+            remarks=f"Auto-deducted for order {order_id}",
+            created_by_id=created_by_id,
+        )
+        for dish_id, ingredient_id, quantity in IngredientMapping.objects.filter(dish_id__in=portions)
+        .order_by('ingredient_id').values_list('dish_id', 'ingredient_id', 'quantity')
+    ]
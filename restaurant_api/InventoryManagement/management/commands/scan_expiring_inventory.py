@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from InventoryManagement.alerts import EXPIRY_WARNING_DAYS, scan_expiring
+
+
+class Command(BaseCommand):
+    help = 'Raise expiry alerts for inventory items expiring within --days days and clear outdated ones; run daily'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=EXPIRY_WARNING_DAYS, help='Alert on items expiring within X days')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        raised, removed = scan_expiring(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Raised {raised} expiry alerts, removed {removed}'))
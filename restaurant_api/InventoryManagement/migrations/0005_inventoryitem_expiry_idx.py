@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 03:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('InventoryManagement', '0004_alter_inventoryitem_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['expiry_date'], name='inventory_item_expiry_idx'),
+        ),
+    ]
@@ -73,6 +73,10 @@ class InventoryItem(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # scan_expiring_inventory reads items by expiry date
+            models.Index(fields=['expiry_date'], name='inventory_item_expiry_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.code})"
@@ -116,25 +120,14 @@ class StockIn(models.Model):
         return f"Stock In: {self.item.name} - {self.quantity} {self.item.unit} on {self.date}"
 
     def save(self, *args, **kwargs):
-        # Update current stock when saving
-        if not self.pk:  # Only on creation
-            self.item.current_stock += self.quantity
-            self.item.save()
-            # Low stock alert logic
-            from .models import InventoryAlert
-            with transaction.atomic():
-                if self.item.is_low_stock:
-                    InventoryAlert.objects.update_or_create(
-                        item=self.item,
-                        alert_type='low_stock',
-                        defaults={
-                            'message': f'{self.item.name} is in low stock.',
-                            'is_read': False
-                        }
-                    )
-                else:
-                    InventoryAlert.objects.filter(item=self.item, alert_type='low_stock').delete()
-        super().save(*args, **kwargs)
+        # The stock moves once, when the movement is recorded; see ledger.py
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        from . import alerts, ledger
+        with transaction.atomic():
+            ledger.add_stock({self.item_id: self.quantity})
+            super().save(*args, **kwargs)
+            alerts.refresh_stock_alerts([self.item_id])
 
 class StockOut(models.Model):
     """Stock out records (usage/consumption)"""
@@ -162,28 +155,14 @@ class StockOut(models.Model):
         return f"Stock Out: {self.item.name} - {self.quantity} {self.item.unit} on {self.date}"
 
     def save(self, *args, **kwargs):
-        # Update current stock when saving
-        if not self.pk:  # Only on creation
-            if self.item.current_stock >= self.quantity:
-                self.item.current_stock -= self.quantity
-                self.item.save()
-                # Low stock alert logic
-                from .models import InventoryAlert
-                with transaction.atomic():
-                    if self.item.is_low_stock:
-                        InventoryAlert.objects.update_or_create(
-                            item=self.item,
-                            alert_type='low_stock',
-                            defaults={
-                                'message': f'{self.item.name} is in low stock.',
-                                'is_read': False
-                            }
-                        )
-                    else:
-                        InventoryAlert.objects.filter(item=self.item, alert_type='low_stock').delete()
-            else:
-                raise ValueError(f"Insufficient stock for {self.item.name}")
-        super().save(*args, **kwargs)
+        # The stock moves once, when the movement is recorded; see ledger.py
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        from . import alerts, ledger
+        with transaction.atomic():
+            ledger.take_stock({self.item_id: self.quantity})
+            super().save(*args, **kwargs)
+            alerts.refresh_stock_alerts([self.item_id])
 
 class IngredientMapping(models.Model):
     """Mapping between menu items (dishes) and ingredients"""
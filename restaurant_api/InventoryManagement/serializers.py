@@ -1,8 +1,22 @@
 from rest_framework import serializers
+from our_menu.models import MenuItem
 from .models import (
     InventoryCategory, Supplier, InventoryItem, StockIn, StockOut, IngredientMapping, InventoryAlert
 )
 
+class TenantPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """A primary key field that only accepts objects of the restaurant in the serializer context's 'tenant'."""
+
+    def __init__(self, tenant_field='created_by', **kwargs):
+        self.tenant_field = tenant_field
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        tenant = self.context.get('tenant')
+        if tenant is None:
+            return super().get_queryset().none()
+        return super().get_queryset().filter(**{self.tenant_field: tenant})
+
 class InventoryCategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = InventoryCategory
@@ -18,10 +32,10 @@ class SupplierSerializer(serializers.ModelSerializer):
 class InventoryItemSerializer(serializers.ModelSerializer):
     category = InventoryCategorySerializer(read_only=True)
     supplier = SupplierSerializer(read_only=True)
-    category_id = serializers.PrimaryKeyRelatedField(
+    category_id = TenantPrimaryKeyRelatedField(
         queryset=InventoryCategory.objects.all(), source='category', write_only=True, required=False
     )
-    supplier_id = serializers.PrimaryKeyRelatedField(
+    supplier_id = TenantPrimaryKeyRelatedField(
         queryset=Supplier.objects.all(), source='supplier', write_only=True, required=False
     )
     class Meta:
@@ -35,11 +49,11 @@ class InventoryItemSerializer(serializers.ModelSerializer):
 
 class StockInSerializer(serializers.ModelSerializer):
     item = InventoryItemSerializer(read_only=True)
-    item_id = serializers.PrimaryKeyRelatedField(
+    item_id = TenantPrimaryKeyRelatedField(
         queryset=InventoryItem.objects.all(), source='item', write_only=True
     )
     supplier = SupplierSerializer(read_only=True)
-    supplier_id = serializers.PrimaryKeyRelatedField(
+    supplier_id = TenantPrimaryKeyRelatedField(
         queryset=Supplier.objects.all(), source='supplier', write_only=True, required=False
     )
     class Meta:
@@ -52,9 +66,12 @@ class StockInSerializer(serializers.ModelSerializer):
 
 class StockOutSerializer(serializers.ModelSerializer):
     item = InventoryItemSerializer(read_only=True)
-    item_id = serializers.PrimaryKeyRelatedField(
+    item_id = TenantPrimaryKeyRelatedField(
         queryset=InventoryItem.objects.all(), source='item', write_only=True
     )
+    dish = TenantPrimaryKeyRelatedField(
+        queryset=MenuItem.objects.all(), tenant_field='user', required=False, allow_null=True
+    )
     class Meta:
         model = StockOut
         fields = [
@@ -62,14 +79,45 @@ class StockOutSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_by', 'created_at']
 
+class FlatStockInSerializer(serializers.ModelSerializer):
+    """Stock in list rows with the item and supplier as ids and names (?flat=1)."""
+    item_name = serializers.CharField(source='item.name', read_only=True)
+    item_code = serializers.CharField(source='item.code', read_only=True)
+    item_unit = serializers.CharField(source='item.unit', read_only=True)
+    supplier_name = serializers.CharField(source='supplier.name', read_only=True, default=None)
+    class Meta:
+        model = StockIn
+        fields = [
+            'id', 'item', 'item_name', 'item_code', 'item_unit', 'quantity', 'date', 'supplier', 'supplier_name',
+            'invoice_id', 'unit_price', 'remarks', 'created_by', 'created_at'
+        ]
+        read_only_fields = fields
+
+class FlatStockOutSerializer(serializers.ModelSerializer):
+    """Stock out list rows with the item and dish as ids and names (?flat=1)."""
+    item_name = serializers.CharField(source='item.name', read_only=True)
+    item_code = serializers.CharField(source='item.code', read_only=True)
+    item_unit = serializers.CharField(source='item.unit', read_only=True)
+    dish_name = serializers.CharField(source='dish.name', read_only=True, default=None)
+    class Meta:
+        model = StockOut
+        fields = [
+            'id', 'item', 'item_name', 'item_code', 'item_unit', 'quantity', 'date', 'reason', 'dish', 'dish_name',
+            'remarks', 'created_by', 'created_at'
+        ]
+        read_only_fields = fields
+
 class IngredientMappingSerializer(serializers.ModelSerializer):
+    dish = TenantPrimaryKeyRelatedField(queryset=MenuItem.objects.all(), tenant_field='user')
     dish_name = serializers.CharField(source='dish.name', read_only=True)
+    ingredient = TenantPrimaryKeyRelatedField(queryset=InventoryItem.objects.all())
     ingredient_name = serializers.CharField(source='ingredient.name', read_only=True)
     class Meta:
         model = IngredientMapping
         fields = ['id', 'dish', 'dish_name', 'ingredient', 'ingredient_name', 'quantity', 'created_at', 'updated_at']
 
 class InventoryAlertSerializer(serializers.ModelSerializer):
+    item = TenantPrimaryKeyRelatedField(queryset=InventoryItem.objects.all())
     item_name = serializers.CharField(source='item.name', read_only=True)
     class Meta:
         model = InventoryAlert
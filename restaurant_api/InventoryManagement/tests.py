@@ -1,3 +1,237 @@
-from django.test import TestCase
+import io
+import threading
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from our_menu.models import Category, MenuItem
+from UserRole.models import CustomUser
+
+from . import alerts, ledger
+from .models import IngredientMapping, InventoryAlert, InventoryCategory, InventoryItem, StockIn, StockOut, Supplier
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pass', role='admin')
+        self.flour = InventoryItem.objects.create(name='Flour', unit='kg', minimum_threshold=5, created_by=self.admin)
+        self.oil = InventoryItem.objects.create(name='Oil', unit='l', current_stock=2, created_by=self.admin)
+
+    def _stock(self, item):
+        item.refresh_from_db()
+        return item.current_stock
+
+    def test_movements_apply_to_stock_and_alerts(self):
+        StockIn.objects.create(item=self.flour, quantity=4, date=date(2026, 1, 1))
+        self.assertEqual(self._stock(self.flour), 4)
+        self.assertTrue(InventoryAlert.objects.filter(item=self.flour, alert_type='low_stock').exists())
+
+        InventoryAlert.objects.update(is_read=True)
+        StockOut.objects.create(item=self.flour, quantity=1, date=date(2026, 1, 2), reason='used')
+        self.assertEqual(self._stock(self.flour), 3)
+        # Still low: the alert already raised stays as it is
+        alert = InventoryAlert.objects.get(item=self.flour, alert_type='low_stock')
+        self.assertTrue(alert.is_read)
+
+        StockOut.objects.create(item=self.flour, quantity=3, date=date(2026, 1, 3), reason='used')
+        self.assertEqual(
+            list(InventoryAlert.objects.filter(item=self.flour).values_list('alert_type', 'message')),
+            [('out_of_stock', 'Flour is out of stock.')],
+        )
+
+        StockIn.objects.create(item=self.flour, quantity=10, date=date(2026, 1, 4))
+        self.assertEqual(self._stock(self.flour), 10)
+        self.assertFalse(InventoryAlert.objects.filter(item=self.flour).exists())
+
+    def test_insufficient_stock_records_nothing(self):
+        with self.assertRaisesMessage(ledger.InsufficientStock, 'Insufficient stock for Oil'):
+            StockOut.objects.create(item=self.oil, quantity=3, date=date(2026, 1, 1), reason='used')
+        self.assertEqual(self._stock(self.oil), 2)
+
+        StockIn.objects.create(item=self.flour, quantity=10, date=date(2026, 1, 1))
+        with self.assertRaises(ledger.InsufficientStock):
+            ledger.record([
+                StockOut(item=self.flour, quantity=4, date=date(2026, 1, 2), reason='used'),
+                StockOut(item=self.oil, quantity=1, date=date(2026, 1, 2), reason='used'),
+                StockOut(item=self.oil, quantity=Decimal('1.5'), date=date(2026, 1, 2), reason='used'),
+            ])
+        self.assertEqual((self._stock(self.flour), self._stock(self.oil)), (10, 2))
+        self.assertFalse(StockOut.objects.exists())
+
+    def test_order_stock_outs(self):
+        category = Category.objects.create(user=self.admin, name='Mains')
+        momo = MenuItem.objects.create(user=self.admin, name='Momo', price=100, category=category)
+        chips = MenuItem.objects.create(user=self.admin, name='Chips', price=80, category=category)
+        IngredientMapping.objects.create(dish=momo, ingredient=self.oil, quantity=Decimal('0.1'))
+        IngredientMapping.objects.create(dish=chips, ingredient=self.oil, quantity=Decimal('0.25'))
+        items = [{'id': str(momo.pk), 'quantity': 2}, {'id': str(chips.pk), 'quantity': 1}, {'id': None}]
+
+        with self.assertNumQueries(1):
+            stock_outs = ledger.order_stock_outs('ORD0001', items, created_by_id=self.admin.pk)
+        ledger.record(stock_outs)
+        self.assertEqual(self._stock(self.oil), Decimal('1.550'))
+        self.assertEqual(StockOut.objects.filter(remarks='Auto-deducted for order ORD0001').count(), 2)
+
+    def test_movements_cannot_be_edited(self):
+        stock_in = StockIn.objects.create(item=self.flour, quantity=4, date=date(2026, 1, 1))
+        self.client.force_login(self.admin)
+        response = self.client.patch(f'/api/inventory/stock-ins/{stock_in.pk}/', {'quantity': 40}, content_type='application/json')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(self._stock(self.flour), 4)
+
+
+class AlertTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pass', role='admin')
+        self.today = date(2026, 3, 10)
+
+    def _item(self, name, expiry_date, stock=1):
+        return InventoryItem.objects.create(name=name, unit='kg', current_stock=stock, expiry_date=expiry_date, created_by=self.admin)
+
+    def test_scan_expiring(self):
+        milk = self._item('Milk', date(2026, 3, 12))
+        self._item('Cream', date(2026, 3, 9))
+        self._item('Rice', date(2026, 6, 1))
+        self._item('Butter', date(2026, 3, 11), stock=0)
+        self.assertEqual(alerts.scan_expiring(days=3, today=self.today), (2, 0))
+        self.assertEqual(
+            sorted(InventoryAlert.objects.filter(alert_type='expiry').values_list('message', flat=True)),
+            ['Cream expired on 2026-03-09.', 'Milk expires on 2026-03-12.'],
+        )
+
+        # Rescanning changes nothing; restocked milk with a later date loses its alert
+        self.assertEqual(alerts.scan_expiring(days=3, today=self.today), (0, 0))
+        InventoryItem.objects.filter(pk=milk.pk).update(expiry_date=date(2026, 4, 1))
+        self.assertEqual(alerts.scan_expiring(days=3, today=self.today), (0, 1))
+
+        out = io.StringIO()
+        call_command('scan_expiring_inventory', days=30, stdout=out)
+        self.assertIn('Raised', out.getvalue())
+
+    def test_unread_count(self):
+        item = self._item('Flour', None, stock=0)
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            alerts.refresh_stock_alerts([item.pk])
+        self.assertEqual(self.client.get('/api/inventory/alerts/unread-count/').json(), {'count': 1})
+
+        # Cached between polls, and forgotten when an alert is read
+        with self.assertNumQueries(0):
+            self.assertEqual(alerts.unread_count(self.admin.pk), 1)
+        alert = InventoryAlert.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/inventory/alerts/{alert.pk}/', {'is_read': True}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/inventory/alerts/unread-count/').json(), {'count': 0})
+        self.assertEqual(self.client.get('/api/inventory/alerts/?is_read=false').json(), [])
+
+        self.client.logout()
+        self.assertIn(self.client.get('/api/inventory/alerts/unread-count/').status_code, (401, 403))
+
+
+class InventoryApiTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pass', role='admin')
+        self.other = CustomUser.objects.create_user(username='other', email='other@example.com', password='pass', role='admin')
+        self.client.force_login(self.admin)
+
+    def _item(self, user, name):
+        category = InventoryCategory.objects.create(name=f'{name} category', created_by=user)
+        supplier = Supplier.objects.create(name=f'{name} supplier', created_by=user)
+        return InventoryItem.objects.create(name=name, unit='kg', category=category, supplier=supplier, created_by=user)
+
+    def _record_stock_ins(self, count):
+        for n in range(count):
+            item = self._item(self.admin, f'Item {StockIn.objects.count()}')
+            StockIn.objects.create(item=item, supplier=item.supplier, quantity=5, date=date(2026, 1, 1), created_by=self.admin)
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_stock_history_query_count_does_not_grow(self):
+        self._record_stock_ins(2)
+        queries = self._queries('/api/inventory/stock-ins/'), self._queries('/api/inventory/stock-ins/?flat=1')
+        self._record_stock_ins(8)
+        self.assertEqual((self._queries('/api/inventory/stock-ins/'), self._queries('/api/inventory/stock-ins/?flat=1')), queries)
+
+    def test_flat_rows_and_pagination(self):
+        self._record_stock_ins(3)
+        response = self.client.get('/api/inventory/stock-ins/?flat=1&limit=2')
+        page = response.json()
+        self.assertEqual((page['count'], len(page['results'])), (3, 2))
+        row = page['results'][0]
+        self.assertEqual((row['item_name'], row['supplier_name'], row['item_unit']), ('Item 2', 'Item 2 supplier', 'kg'))
+        self.assertIsInstance(row['item'], int)
+        # Without ?limit= the list stays a plain list of nested items
+        rows = self.client.get('/api/inventory/stock-ins/').json()
+        self.assertEqual(rows[0]['item']['category']['name'], 'Item 2 category')
+
+    def test_scoped_to_the_restaurant(self):
+        mine, theirs = self._item(self.admin, 'Flour'), self._item(self.other, 'Rice')
+        InventoryAlert.objects.create(item=theirs, alert_type='low_stock', message='Rice is in low stock.')
+        category = Category.objects.create(user=self.other, name='Mains')
+        their_dish = MenuItem.objects.create(user=self.other, name='Pilaf', price=100, category=category)
+        IngredientMapping.objects.create(dish=their_dish, ingredient=theirs, quantity=1)
+
+        response = self.client.post(
+            '/api/inventory/stock-ins/', {'item_id': theirs.pk, 'quantity': 1, 'date': '2026-01-01'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('item_id', response.json())
+        response = self.client.post(
+            '/api/inventory/ingredient-mappings/', {'dish': their_dish.pk, 'ingredient': mine.pk, 'quantity': 1}, content_type='application/json',
+        )
+        self.assertIn('dish', response.json())
+        self.assertEqual(self.client.get('/api/inventory/ingredient-mappings/').json(), [])
+        self.assertEqual(self.client.get('/api/inventory/alerts/').json(), [])
+        self.assertEqual([item['name'] for item in self.client.get('/api/inventory/items/').json()], ['Flour'])
+
+        self.client.logout()
+        self.assertIn(self.client.get('/api/inventory/alerts/').status_code, (401, 403))
+
+
+class ConcurrentStockOutTests(TransactionTestCase):
+    """Stock outs race on the same item from several threads, each with its own connection."""
+
+    def test_stock_never_drifts(self):
+        item = InventoryItem.objects.create(name='Rice', unit='kg', current_stock=50)
+        taken, refused = [], []
+        start = threading.Barrier(8)
+
+        def take(n):
+            start.wait()
+            try:
+                for _ in range(10):
+                    while True:
+                        try:
+                            StockOut.objects.create(item=item, quantity=1, date=date(2026, 1, 1), reason='used')
+                        except ledger.InsufficientStock:
+                            refused.append(n)
+                        except OperationalError:
+                            # SQLite has one writer at a time and refuses the rest; try again
+                            continue
+                        else:
+                            taken.append(n)
+                        break
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=take, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        item.refresh_from_db()
+        self.assertEqual((len(taken), len(refused)), (50, 30))
+        self.assertEqual(item.current_stock, 0)
+        self.assertEqual(StockOut.objects.count(), 50)
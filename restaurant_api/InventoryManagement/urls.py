@@ -14,5 +14,3 @@ router.register(r'ingredient-mappings', IngredientMappingViewSet, basename='ingr
 router.register(r'alerts', InventoryAlertViewSet, basename='inventory-alert')
 
 urlpatterns = router.urls
-
-print('DEBUG: InventoryManagement urlpatterns:', urlpatterns)
@@ -1,104 +1,106 @@
-from django.shortcuts import render
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, filters, permissions, status
+from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from . import alerts
 from .models import (
     InventoryCategory, Supplier, InventoryItem, StockIn, StockOut, IngredientMapping, InventoryAlert
 )
 from .serializers import (
     InventoryCategorySerializer, SupplierSerializer, InventoryItemSerializer, StockInSerializer,
-    StockOutSerializer, IngredientMappingSerializer, InventoryAlertSerializer
+    StockOutSerializer, FlatStockInSerializer, FlatStockOutSerializer, IngredientMappingSerializer,
+    InventoryAlertSerializer
 )
 
-# Create your views here.
+class InventoryPagination(LimitOffsetPagination):
+    """Pages only when asked to with ?limit= (and ?offset=); otherwise lists stay plain lists."""
+    max_limit = 200
 
-class InventoryCategoryViewSet(viewsets.ModelViewSet):
+class TenantViewSetMixin:
+    """
+    Inventory viewsets work on the requesting user's restaurant: an admin's
+    own account, or the admin an employee works for. Serializers get it as
+    the 'tenant' context entry, which limits the objects they accept by id.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = InventoryPagination
+    # List serializer for ?flat=1: related objects as ids and names instead of nested
+    flat_serializer_class = None
+
+    @property
+    def tenant(self):
+        user = self.request.user
+        return user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'tenant': self.tenant}
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.flat_serializer_class and self.request.query_params.get('flat') in ('1', 'true'):
+            return self.flat_serializer_class
+        return super().get_serializer_class()
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.tenant)
+
+class InventoryCategoryViewSet(TenantViewSetMixin, viewsets.ModelViewSet):
     queryset = InventoryCategory.objects.all()
     serializer_class = InventoryCategorySerializer
-    permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
     def get_queryset(self):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        return InventoryCategory.objects.filter(created_by=admin)
+        return InventoryCategory.objects.filter(created_by=self.tenant)
 
-    def perform_create(self, serializer):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        serializer.save(created_by=admin)
-
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(TenantViewSetMixin, viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
-    permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'contact_person', 'email', 'phone']
 
     def get_queryset(self):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        return Supplier.objects.filter(created_by=admin)
-
-    def perform_create(self, serializer):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        serializer.save(created_by=admin)
+        return Supplier.objects.filter(created_by=self.tenant)
 
-class InventoryItemViewSet(viewsets.ModelViewSet):
+class InventoryItemViewSet(TenantViewSetMixin, viewsets.ModelViewSet):
     queryset = InventoryItem.objects.all()
     serializer_class = InventoryItemSerializer
-    permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'code']
     ordering_fields = ['name', 'current_stock', 'minimum_threshold', 'purchase_price']
 
     def get_queryset(self):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        return InventoryItem.objects.filter(created_by=admin)
-
-    def perform_create(self, serializer):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        serializer.save(created_by=admin)
+        return InventoryItem.objects.filter(created_by=self.tenant).select_related('category', 'supplier')
 
-class StockInViewSet(viewsets.ModelViewSet):
+class StockInViewSet(TenantViewSetMixin, viewsets.ModelViewSet):
     queryset = StockIn.objects.all()
+    # Movements are a ledger: recorded once, never edited (see ledger.py)
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
     serializer_class = StockInSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    flat_serializer_class = FlatStockInSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['item__name', 'supplier__name', 'invoice_id']
     ordering_fields = ['date', 'created_at']
 
     def get_queryset(self):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        return StockIn.objects.filter(item__created_by=admin)
-
-    def perform_create(self, serializer):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        serializer.save(created_by=admin)
+        return StockIn.objects.filter(item__created_by=self.tenant).select_related(
+            'item__category', 'item__supplier', 'supplier'
+        )
 
-class StockOutViewSet(viewsets.ModelViewSet):
+class StockOutViewSet(TenantViewSetMixin, viewsets.ModelViewSet):
     queryset = StockOut.objects.all()
+    # Movements are a ledger: recorded once, never edited (see ledger.py)
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
     serializer_class = StockOutSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    flat_serializer_class = FlatStockOutSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['item__name', 'reason', 'dish__name']
     ordering_fields = ['date', 'created_at']
 
     def get_queryset(self):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        return StockOut.objects.filter(item__created_by=admin)
-
-    def perform_create(self, serializer):
-        user = self.request.user
-        admin = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
-        serializer.save(created_by=admin)
+        return StockOut.objects.filter(item__created_by=self.tenant).select_related(
+            'item__category', 'item__supplier', 'dish'
+        )
 
     def create(self, request, *args, **kwargs):
         try:
@@ -106,16 +108,41 @@ class StockOutViewSet(viewsets.ModelViewSet):
         except ValueError as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class IngredientMappingViewSet(viewsets.ModelViewSet):
+class IngredientMappingViewSet(TenantViewSetMixin, viewsets.ModelViewSet):
     queryset = IngredientMapping.objects.all()
     serializer_class = IngredientMappingSerializer
-    permission_classes = [AllowAny]
     filter_backends = [filters.SearchFilter]
     search_fields = ['dish__name', 'ingredient__name']
 
-class InventoryAlertViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        return IngredientMapping.objects.filter(ingredient__created_by=self.tenant).select_related('dish', 'ingredient')
+
+    def perform_create(self, serializer):
+        serializer.save()
+
+class InventoryAlertViewSet(TenantViewSetMixin, viewsets.ModelViewSet):
     queryset = InventoryAlert.objects.all()
     serializer_class = InventoryAlertSerializer
-    permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ['item__name', 'alert_type', 'message']
+    filterset_fields = ['alert_type', 'is_read']
+
+    def get_queryset(self):
+        return InventoryAlert.objects.filter(item__created_by=self.tenant).select_related('item')
+
+    def perform_create(self, serializer):
+        alert = serializer.save()
+        alerts.forget_unread_counts([alert.item.created_by_id])
+
+    def perform_update(self, serializer):
+        alert = serializer.save()
+        alerts.forget_unread_counts([alert.item.created_by_id])
+
+    def perform_destroy(self, instance):
+        alerts.forget_unread_counts([instance.item.created_by_id])
+        instance.delete()
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """Unread alerts of the user's restaurant, for the admin header badge to poll."""
+        return Response({'count': alerts.unread_count(self.tenant.pk)})
@@ -14,6 +14,6 @@ class ReviewAdmin(admin.ModelAdmin):
         if hasattr(admin_user, 'is_employee') and admin_user.is_employee and admin_user.created_by:
             admin_user = admin_user.created_by
         # Return only reviews for orders belonging to this admin
-        return Review.objects.filter(order__user=admin_user)
+        return Review.objects.filter(tenant=admin_user)
 
 # Review admin configuration has been removed 
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+CSV exports of a restaurant's orders, payments, stock movements and reviews.
+
+Each export is a generator of rows (the header first) over querysets read
+with .iterator(), turned into CSV a chunk at a time by csv_chunks(), so
+memory use doesn't grow with the size of the export. An export is either
+streamed straight into the response or, for large ones, written by a
+background job to MEDIA_ROOT/exports/<tenant id>/<job id>/ and downloaded
+once it's done. Jobs run in the process that started them; one whose
+unfinished file hasn't been written to for STALE_JOB_SECONDS is reported
+as failed, since a restart or a killed worker leaves it behind for good.
+"""
+import csv
+import datetime
+import heapq
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from InventoryManagement.models import StockIn, StockOut
+from payments.views import archived_ledger_queryset, ledger_entry, payment_ledger_queryset
+from qrgenerator.archive import archived_orders, merge_newest_first, order_values
+from qrgenerator.models import Order
+from qrgenerator.order_items import readable_items
+
+from .models import Review
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = 'exports'
+# Rows fetched per query and written per chunk
+EXPORT_CHUNK_SIZE = 500
+FAILED_MARKER = 'FAILED'
+# A running job writes a chunk every EXPORT_CHUNK_SIZE rows; this long without one, it is gone
+STALE_JOB_SECONDS = 30 * 60
+
+# Exports are read-heavy and rare; one at a time keeps them from crowding out requests
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='export')
+
+
+def _in_range(queryset, field, start_date, end_date):
+    if start_date:
+        queryset = queryset.filter(**{f'{field}__gte': start_date})
+    if end_date:
+        queryset = queryset.filter(**{f'{field}__lte': end_date})
+    return queryset
+
+
+def _items_summary(items):
+    return '; '.join(f"{item['quantity']} x {item['name']}" for item in readable_items(items))
+
+
+def order_rows(tenant_id, start_date=None, end_date=None):
+    fields = (
+        'id', 'created_at', 'table__name', 'customer_name', 'status', 'payment_status',
+        'payment_method', 'dining_option', 'items', 'total',
+    )
+    yield ('Order', 'Created at', 'Table', 'Customer', 'Status', 'Payment status', 'Payment method', 'Dining option', 'Items', 'Total')
+    orders = _in_range(Order.objects.filter(tenant_id=tenant_id), 'created_at__date', start_date, end_date)
+    rows = orders.order_by('-created_at').values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    archived = archived_orders(tenant_id, start_date, end_date)
+    if archived is not None:
+        archived_rows = order_values(archived.order_by('-created_at'), *fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        rows = merge_newest_first([rows, archived_rows])
+    for row in rows:
+        yield (
+            row['id'], row['created_at'], row['table__name'], row['customer_name'], row['status'], row['payment_status'],
+            row['payment_method'], row['dining_option'], _items_summary(row['items']), row['total'],
+        )
+
+
+def payment_rows(tenant_id, start_date=None, end_date=None):
+    yield ('Payment', 'Order', 'Table', 'Method', 'Amount', 'Paid at')
+    ledger = _in_range(payment_ledger_queryset(tenant_id), 'paid_at__date', start_date, end_date)
+    rows = ledger.values(
+        'id', 'items', 'total', 'payment_method', 'table__name', 'esewa_txn_id', 'esewa_amount', 'paid_at',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    archived = archived_ledger_queryset(tenant_id, start_date, end_date)
+    if archived is not None:
+        archived_rows = order_values(archived, 'id', 'items', 'total', 'payment_method', 'table__name', 'paid_at')
+        rows = merge_newest_first([rows, archived_rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)], 'paid_at', 'id')
+    for row in rows:
+        entry = ledger_entry(row)
+        yield (entry['id'], entry['order']['id'], entry['order']['table'], entry['payment_method'], entry['amount'], entry['created_at'])
+
+
+def stock_movement_rows(tenant_id, start_date=None, end_date=None):
+    yield ('Date', 'Type', 'Item', 'Code', 'Quantity', 'Unit', 'Reason', 'Dish', 'Supplier', 'Invoice', 'Unit price', 'Remarks', 'Recorded at')
+    ins = _in_range(StockIn.objects.filter(item__created_by_id=tenant_id), 'date', start_date, end_date).order_by('-date', '-created_at').values(
+        'date', 'created_at', 'item__name', 'item__code', 'quantity', 'item__unit', 'supplier__name', 'invoice_id', 'unit_price', 'remarks',
+    )
+    outs = _in_range(StockOut.objects.filter(item__created_by_id=tenant_id), 'date', start_date, end_date).order_by('-date', '-created_at').values(
+        'date', 'created_at', 'item__name', 'item__code', 'quantity', 'item__unit', 'reason', 'dish__name', 'remarks',
+    )
+    movements = heapq.merge(
+        (('in', row) for row in ins.iterator(chunk_size=EXPORT_CHUNK_SIZE)),
+        (('out', row) for row in outs.iterator(chunk_size=EXPORT_CHUNK_SIZE)),
+        key=lambda movement: itemgetter('date', 'created_at')(movement[1]), reverse=True,
+    )
+    for kind, row in movements:
+        yield (
+            row['date'], kind, row['item__name'], row['item__code'], row['quantity'], row['item__unit'],
+            row.get('reason'), row.get('dish__name'), row.get('supplier__name'), row.get('invoice_id'), row.get('unit_price'),
+            row['remarks'], row['created_at'],
+        )
+
+
+def review_rows(tenant_id, start_date=None, end_date=None):
+    yield ('Order', 'Rating', 'Comment', 'Public', 'Created at')
+    reviews = _in_range(Review.objects.filter(tenant_id=tenant_id), 'created_at__date', start_date, end_date)
+    for row in reviews.order_by('-created_at').values_list('order_id', 'rating', 'comment', 'is_public', 'created_at').iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield row
+
+
+EXPORTS = {
+    'orders': order_rows,
+    'payments': payment_rows,
+    'stock-movements': stock_movement_rows,
+    'reviews': review_rows,
+}
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).isoformat(timespec='seconds')
+    if isinstance(value, (datetime.date, Decimal, int, float)):
+        return str(value)
+    value = str(value)
+    # Spreadsheets run cells starting with these as formulas; customer-entered text mustn't
+    if value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object csv.writer writes to, handing each formatted row straight back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """UTF-8 CSV bytes for `rows`, `chunk_size` rows at a time."""
+    writer = csv.writer(_Echo())
+    # Byte order mark, so Excel reads the file as UTF-8
+    batch = ['\ufeff']
+    for row in rows:
+        batch.append(writer.writerow([_cell(value) for value in row]))
+        if len(batch) >= chunk_size:
+            yield ''.join(batch).encode('utf-8')
+            batch = []
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+
+
+def export_filename(kind, start_date=None, end_date=None):
+    return '-'.join([kind] + [day.isoformat() for day in (start_date, end_date) if day]) + '.csv'
+
+
+def job_directory(tenant_id, job_id):
+    return os.path.join(settings.MEDIA_ROOT, EXPORT_DIR, str(tenant_id), job_id.hex)
+
+
+def _write_export(directory, kind, tenant_id, start_date, end_date):
+    filename = export_filename(kind, start_date, end_date)
+    part_path = os.path.join(directory, filename + '.part')
+    try:
+        with open(part_path, 'wb') as f:
+            for chunk in csv_chunks(EXPORTS[kind](tenant_id, start_date, end_date)):
+                f.write(chunk)
+        os.replace(part_path, os.path.join(directory, filename))
+    except Exception:
+        logger.exception('Export %s failed for tenant %s', kind, tenant_id)
+        open(os.path.join(directory, FAILED_MARKER), 'w').close()
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    finally:
+        # The worker thread's own connection; nothing else will close it
+        connection.close()
+
+
+def start_export_job(kind, tenant_id, start_date=None, end_date=None):
+    """Queue a background export; returns the job id for export_job_status()."""
+    job_id = uuid.uuid4()
+    directory = job_directory(tenant_id, job_id)
+    os.makedirs(directory)
+    # Written to until the export is done, so the job reads as running from the start;
+    # its modification time is the job's last sign of life
+    open(os.path.join(directory, export_filename(kind, start_date, end_date) + '.part'), 'w').close()
+    _executor.submit(_write_export, directory, kind, tenant_id, start_date, end_date)
+    return job_id
+
+
+def export_job_status(tenant_id, job_id):
+    """
+    ('done', path to the file), ('running', None) or ('failed', None) for one
+    of the tenant's jobs, or None if there is no such job. A job whose worker
+    went away mid-export is failed once it is STALE_JOB_SECONDS old.
+    """
+    directory = job_directory(tenant_id, job_id)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return None
+    if FAILED_MARKER in names:
+        return 'failed', None
+    for name in names:
+        if name.endswith('.csv'):
+            return 'done', os.path.join(directory, name)
+    parts = [name for name in names if name.endswith('.part')]
+    if not parts:
+        return 'failed', None
+    try:
+        idle = time.time() - os.path.getmtime(os.path.join(directory, parts[0]))
+    except FileNotFoundError:
+        # Finished or failed since the listing
+        return export_job_status(tenant_id, job_id)
+    if idle > STALE_JOB_SECONDS:
+        return 'failed', None
+    return 'running', None
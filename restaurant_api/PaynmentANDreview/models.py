@@ -7,6 +7,8 @@ from django.db.models import Avg, Count
 
 class Review(BaseModel):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reviews')
+    # Owner of the reviewed order's table, copied at write time (see Order.tenant)
+    tenant = models.ForeignKey('UserRole.CustomUser', on_delete=models.CASCADE, related_name='tenant_reviews', null=True, blank=True, editable=False)
     rating = models.IntegerField(choices=[(i, i) for i in range(1, 6)])
     comment = models.TextField()
     is_public = models.BooleanField(default=True)
@@ -18,10 +20,15 @@ class Review(BaseModel):
     def __str__(self):
         return f"Review for Order #{self.order.id} - {self.rating} stars"
 
+    def save(self, *args, **kwargs):
+        if self.tenant_id is None and self.order_id is not None:
+            self.tenant_id = self.order.tenant_id or self.order.table.user_id
+        super().save(*args, **kwargs)
+
     @classmethod
     def get_feedback_overview(cls, user):
         # Get reviews for the specific user's orders
-        reviews = cls.objects.filter(order__user=user)
+        reviews = cls.objects.filter(tenant=user)
         total_reviews = reviews.count()
         
         if total_reviews == 0:
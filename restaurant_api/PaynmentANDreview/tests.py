@@ -1,3 +1,212 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from EsewaIntegration.models import EsewaTransaction
+from InventoryManagement.models import InventoryItem, StockIn, StockOut
+from qrgenerator.models import Order, OrderArchive, Table
+from restaurant_api import db_router
+from restaurant_api.db_router import PrimaryReplicaRouter, replica_reads
+from UserRole.models import CustomUser
+
+from . import exports
+from .models import Review
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        db_router.reset()
+        self.addCleanup(db_router.reset)
+        self.router = PrimaryReplicaRouter()
+
+    @mock.patch('restaurant_api.db_router.replica_configured', return_value=False)
+    def test_reads_use_the_primary_without_a_replica(self, _):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(CustomUser), 'default')
+
+    @mock.patch('restaurant_api.db_router.replica_configured', return_value=True)
+    def test_only_opted_in_reads_use_the_replica(self, _):
+        self.assertEqual(self.router.db_for_read(CustomUser), 'default')
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(CustomUser), 'replica')
+        self.assertEqual(self.router.db_for_read(CustomUser), 'default')
+
+    @mock.patch('restaurant_api.db_router.replica_configured', return_value=True)
+    def test_a_write_pins_reads_to_the_primary_until_reset(self, _):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(CustomUser), 'default')
+            self.assertEqual(self.router.db_for_read(CustomUser), 'default')
+        db_router.reset()
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(CustomUser), 'replica')
+
+    def test_replica_is_never_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'qrgenerator'))
+        self.assertFalse(self.router.allow_migrate('replica', 'qrgenerator'))
+
+
+class AnalyticsRoutingTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pass', role='admin')
+        self.client.force_login(self.admin)
+
+    def _replica_flags(self, url):
+        """Whether each read made while serving `url` was eligible for the replica."""
+        flags = []
+
+        def db_for_read(router, model, **hints):
+            flags.append(db_router._replica_reads.get())
+            return 'default'
+
+        with mock.patch.object(PrimaryReplicaRouter, 'db_for_read', autospec=True, side_effect=db_for_read):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return flags
+
+    def test_analytics_read_from_the_replica_after_authenticating_on_the_primary(self):
+        flags = self._replica_flags('/api/popular-items/')
+        # The session's user is loaded before the view opts in
+        self.assertFalse(flags[0])
+        self.assertTrue(flags[-1])
+
+    def test_other_endpoints_stay_on_the_primary(self):
+        self.assertNotIn(True, self._replica_flags('/api/tables/'))
+
+
+def _csv_rows(content):
+    return list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+
+
+class ExportTestMixin:
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.admin = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='pass', role='admin')
+        table = Table.objects.create(name='T1', user=self.admin)
+        now = timezone.now()
+        self.recent = Order.objects.create(
+            id='ORD0001', table=table, user=self.admin, total='250.00', status='completed', payment_status='paid',
+            customer_name='=HYPERLINK("http://example.com")', items=[{'id': '1', 'name': 'Momo', 'price': 125.0, 'quantity': 2}],
+        )
+        EsewaTransaction.objects.create(order=self.recent, amount='250.00', transaction_uuid='txn-1', status='COMPLETED')
+        Order.objects.create(id='ORD0002', table=table, user=self.admin, total='80.00', items=[])
+        OrderArchive.objects.create(
+            order_id='ORD0099', tenant=self.admin, user=self.admin, table=table, items=[], status='completed', total='40.00',
+            payment_status='paid', payment_method='cash', dining_option='dine-in',
+            created_at=now - timedelta(days=400), updated_at=now - timedelta(days=400),
+        )
+        Review.objects.create(order=self.recent, rating=5, comment='+1, great')
+        flour = InventoryItem.objects.create(name='Flour', unit='kg', current_stock=0, created_by=self.admin)
+        StockIn.objects.create(item=flour, quantity=10, date=date(2026, 1, 2), created_by=self.admin)
+        StockOut.objects.create(item=flour, quantity=3, date=date(2026, 1, 5), reason='used', created_by=self.admin)
+        other = CustomUser.objects.create_user(username='other', email='other@example.com', password='pass', role='admin')
+        StockIn.objects.create(item=InventoryItem.objects.create(name='Rice', unit='kg', created_by=other), quantity=1, date=date(2026, 1, 3))
+        self.long_ago = (now - timedelta(days=500)).date().isoformat()
+
+
+class ExportTests(ExportTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def _export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return _csv_rows(b''.join(response.streaming_content))
+
+    def test_orders(self):
+        rows = self._export('/api/exports/orders/')
+        self.assertEqual(rows[0][:3], ['Order', 'Created at', 'Table'])
+        self.assertEqual([row[0] for row in rows[1:]], ['ORD0002', 'ORD0001'])
+        # Spreadsheets must not run customer-entered text as a formula
+        self.assertEqual(rows[2][3], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(rows[2][8:], ['2 x Momo', '250.00'])
+        # A date range reaches into the order archive
+        rows = self._export(f'/api/exports/orders/?start_date={self.long_ago}')
+        self.assertEqual([row[0] for row in rows[1:]], ['ORD0002', 'ORD0001', 'ORD0099'])
+
+    def test_legacy_items(self):
+        # Items migration 0016 couldn't read are left as stored; they are skipped, not fatal
+        Order.objects.filter(pk='ORD0002').update(items=['Momo', {'name': 'Tea', 'price': 'free'}])
+        Order.objects.create(id='ORD0003', table=self.recent.table, user=self.admin, total='10.00', items='2 x Momo')
+        rows = self._export('/api/exports/orders/')
+        self.assertEqual([(row[0], row[8]) for row in rows[1:]], [('ORD0003', ''), ('ORD0002', ''), ('ORD0001', '2 x Momo')])
+        response = self.client.get('/api/popular-items/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(item['name'], item['total_orders']) for item in response.json()], [('Momo', 2)])
+
+    def test_payments_reviews_and_stock_movements(self):
+        rows = self._export(f'/api/exports/payments/?start_date={self.long_ago}')
+        self.assertEqual([row[1] for row in rows[1:]], ['ORD0001', 'ORD0099'])
+        self.assertEqual(rows[1][3:5], ['esewa', '250.0'])
+        self.assertEqual(self._export('/api/exports/reviews/')[1][:3], ['ORD0001', '5', "'+1, great"])
+        rows = self._export('/api/exports/stock-movements/?start_date=2026-01-01&end_date=2026-01-31')
+        self.assertEqual([row[:3] for row in rows[1:]], [['2026-01-05', 'out', 'Flour'], ['2026-01-02', 'in', 'Flour']])
+
+    def test_errors_and_permissions(self):
+        self.assertEqual(self.client.get('/api/exports/menus/').status_code, 404)
+        self.assertEqual(self.client.get('/api/exports/orders/?start_date=yesterday').status_code, 400)
+        waiter = CustomUser.objects.create_user(
+            username='waiter', email='waiter@example.com', password='pass', role='customer_support', is_employee=True, created_by=self.admin,
+        )
+        self.client.force_login(waiter)
+        self.assertEqual(self.client.get('/api/exports/orders/').status_code, 403)
+        self.client.logout()
+        self.assertIn(self.client.get('/api/exports/orders/').status_code, (401, 403))
+
+    async def test_streams_under_asgi(self):
+        client = AsyncClient()
+        await client.aforce_login(self.admin)
+        response = await client.get('/api/exports/orders/')
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(_csv_rows(content)), 3)
+
+
+class ExportJobTests(ExportTestMixin, TransactionTestCase):
+    """Background exports run on a worker thread, so the data they read has to be committed."""
+
+    def test_background_export(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(f'/api/exports/orders/?start_date={self.long_ago}')
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+        # The worker runs one job at a time, so this returns once the export is written
+        exports._executor.submit(lambda: None).result()
+
+        job = self.client.get(status_url).json()
+        self.assertEqual(job['status'], 'done')
+        response = self.client.get(job['download_url'])
+        self.assertIn(f'orders-{self.long_ago}.csv', response['Content-Disposition'])
+        rows = _csv_rows(b''.join(response.streaming_content))
+        self.assertEqual([row[0] for row in rows[1:]], ['ORD0002', 'ORD0001', 'ORD0099'])
+
+        other = CustomUser.objects.get(username='other')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(status_url).status_code, 404)
+
+    def test_abandoned_job_fails(self):
+        self.client.force_login(self.admin)
+        # The job is queued but never runs, as when its worker is restarted
+        with mock.patch.object(exports, '_executor'):
+            job = self.client.post('/api/exports/orders/').json()
+        self.assertEqual(self.client.get(job['status_url']).json()['status'], 'running')
+
+        part_path = os.path.join(exports.job_directory(self.admin.pk, uuid.UUID(job['job_id'])), 'orders.csv.part')
+        idle_since = time.time() - exports.STALE_JOB_SECONDS - 1
+        os.utime(part_path, (idle_since, idle_since))
+        self.assertEqual(self.client.get(job['status_url']).json()['status'], 'failed')
@@ -10,4 +10,6 @@ urlpatterns = [
     path('popular-items/', views.popular_items, name='popular-items'),
     path('table-performance/', views.table_performance, name='table-performance'),
     path('peak-hours/', views.peak_hours_analysis, name='peak-hours'),
+    path('exports/jobs/<uuid:job_id>/', views.ExportJobView.as_view(), name='export-job'),
+    path('exports/<slug:kind>/', views.ExportView.as_view(), name='export'),
 ] 
\ No newline at end of file
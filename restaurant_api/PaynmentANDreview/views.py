@@ -10,7 +10,19 @@ from django.db.models import Count
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from qrgenerator.models import Order
+from qrgenerator.order_items import readable_items
 from collections import Counter
+from restaurant_api.db_router import replica_reads
+from restaurant_api.renderers import streaming_content
+from UserRole.permissions import IsEmployeeOrAdmin
+from django.http import FileResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from . import exports
+import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Review views have been removed
 
@@ -46,7 +58,7 @@ class ReviewListView(generics.ListAPIView):
                 admin_user = user.created_by
             else:
                 admin_user = user
-            return Review.objects.filter(order__user=admin_user)
+            return Review.objects.filter(tenant=admin_user)
         else:
             # For unauthenticated users, allow checking reviews by order ID
             order_id = self.request.query_params.get('order')
@@ -65,7 +77,7 @@ class ReviewDetailView(generics.RetrieveDestroyAPIView):
             admin_user = user.created_by
         else:
             admin_user = user
-        return Review.objects.filter(order__user=admin_user)
+        return Review.objects.filter(tenant=admin_user)
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -81,7 +93,7 @@ class ReviewDeleteAllView(generics.DestroyAPIView):
             admin_user = user.created_by
         else:
             admin_user = user
-        return Review.objects.filter(order__user=admin_user)
+        return Review.objects.filter(tenant=admin_user)
 
     def destroy(self, request, *args, **kwargs):
         self.get_queryset().delete()
@@ -90,6 +102,7 @@ class ReviewDeleteAllView(generics.DestroyAPIView):
 class FeedbackOverviewView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @replica_reads()
     def get(self, request):
         user = request.user
         if hasattr(user, 'is_employee') and user.is_employee and user.created_by:
@@ -108,6 +121,7 @@ class FeedbackOverviewView(APIView):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def popular_items(request):
     # Get the last 30 days of orders
     thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
@@ -115,15 +129,13 @@ def popular_items(request):
     # Get all orders from the last 30 days for the current user
     orders = Order.objects.filter(
         created_at__gte=thirty_days_ago,
-        user=request.user  # Filter by current user
+        tenant=request.user  # Filter by current user
     )
-    print(f"Found {orders.count()} orders in the last 30 days for user {request.user}")
     
     # Count items across all orders
     item_counter = Counter()
-    for order in orders:
-        print(f"Processing order {order.id} with items: {order.items}")
-        for item in order.items:
+    for items in orders.values_list('items', flat=True):
+        for item in readable_items(items):
             item_counter[item['name']] += item['quantity']
     
     # Get top 5 most ordered items
@@ -136,11 +148,12 @@ def popular_items(request):
         for idx, (item_name, count) in enumerate(item_counter.most_common(5))
     ]
     
-    print(f"Popular items for user {request.user}: {popular_items}")
+    logger.debug('Popular items for user %s: %s', request.user, popular_items)
     return Response(popular_items)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def table_performance(request):
     # Get the last 30 days of orders
     thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
@@ -148,7 +161,7 @@ def table_performance(request):
     # Get all orders from the last 30 days for the current user
     orders = Order.objects.filter(
         created_at__gte=thirty_days_ago,
-        user=request.user
+        tenant=request.user
     )
     
     # Calculate table performance
@@ -184,19 +197,17 @@ def table_performance(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def peak_hours_analysis(request):
-    print(f"Processing peak hours analysis for user: {request.user}")
     
     # Get the last 30 days of orders
     thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
-    print(f"Looking for orders since: {thirty_days_ago}")
     
     # Get all orders from the last 30 days for the current user
     orders = Order.objects.filter(
         created_at__gte=thirty_days_ago,
-        user=request.user
+        tenant=request.user
     )
-    print(f"Found {orders.count()} orders for user {request.user}")
     
     # Initialize data structures
     hourly_data = {hour: 0 for hour in range(24)}
@@ -214,10 +225,6 @@ def peak_hours_analysis(request):
         # Update counts
         hourly_data[hour] += 1
         daily_data[day] += 1
-        print(f"Processing order {order.id} - Hour: {hour}, Day: {day}")
-    
-    print(f"Hourly data: {hourly_data}")
-    print(f"Daily data: {daily_data}")
     
     # Find peak hours (top 3 busiest hours)
     peak_hours = sorted(
@@ -233,8 +240,7 @@ def peak_hours_analysis(request):
         reverse=True
     )[:3]
     
-    print(f"Peak hours: {peak_hours}")
-    print(f"Peak days: {peak_days}")
+    logger.debug('Peak hours for user %s: %s, peak days: %s', request.user, peak_hours, peak_days)
     
     # Format hours for display
     def format_hour(hour):
@@ -268,10 +274,83 @@ def peak_hours_analysis(request):
         'total_orders': sum(hourly_data.values())
     }
     
-    print(f"Response data: {response_data}")
     return Response(response_data)
 
 
 
+def _admin_user(user):
+    return user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
+
+
+def _export_date_range(request):
+    """(start_date, end_date) from the query string as dates (either may be None); ValueError if malformed."""
+    dates = []
+    for param in ('start_date', 'end_date'):
+        value = request.query_params.get(param)
+        day = parse_date(value) if value else None
+        if value and day is None:
+            raise ValueError(f'{param} must be a date (YYYY-MM-DD)')
+        dates.append(day)
+    return tuple(dates)
+
+
+class ExportView(APIView):
+    """
+    CSV export of orders, payments, stock-movements or reviews, optionally
+    limited with ?start_date=/&end_date= (YYYY-MM-DD).
+
+    GET streams the file. POST runs the export as a background job instead
+    and returns its status URL; poll that until the file is ready.
+    """
+    permission_classes = [IsEmployeeOrAdmin]
+    required_permission = 'reports_export'
+
+    def _parse(self, request, kind):
+        if kind not in exports.EXPORTS:
+            return None, Response({'error': f"Unknown export '{kind}'"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            return _export_date_range(request), None
+        except ValueError as e:
+            return None, Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    def get(self, request, kind):
+        date_range, error = self._parse(request, kind)
+        if error:
+            return error
+        rows = exports.EXPORTS[kind](_admin_user(request.user).pk, *date_range)
+        response = StreamingHttpResponse(streaming_content(exports.csv_chunks(rows), request), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{exports.export_filename(kind, *date_range)}"'
+        return response
+
+    def post(self, request, kind):
+        date_range, error = self._parse(request, kind)
+        if error:
+            return error
+        job_id = exports.start_export_job(kind, _admin_user(request.user).pk, *date_range)
+        return Response({
+            'job_id': job_id.hex,
+            'status': 'running',
+            'status_url': reverse('export-job', args=[job_id]),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportJobView(APIView):
+    """A background export's status; ?download=1 returns the file once it's done."""
+    permission_classes = [IsEmployeeOrAdmin]
+    required_permission = 'reports_export'
+
+    def get(self, request, job_id):
+        job = exports.export_job_status(_admin_user(request.user).pk, job_id)
+        if job is None:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+        job_status, path = job
+        if path and request.query_params.get('download'):
+            return FileResponse(open(path, 'rb'), as_attachment=True, filename=os.path.basename(path), content_type='text/csv')
+        data = {'job_id': job_id.hex, 'status': job_status}
+        if path:
+            data['download_url'] = reverse('export-job', args=[job_id]) + '?download=1'
+        return Response(data)
+
+
 def isNaN(num):
     return num != num
@@ -11,6 +11,9 @@ from django.urls import reverse
 from django.http import HttpResponseRedirect
 from django.db import models
 from django.contrib import messages
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Custom Admin Site that redirects employees based on permissions
 class RestaurantAdminSite(admin.AdminSite):
@@ -24,34 +27,35 @@ class RestaurantAdminSite(admin.AdminSite):
         try:
             return [str(p.id) for p in user.custom_permissions.all()]
         except Exception as e:
-            print(f"Error getting permissions: {e}")
+            logger.exception('Error getting permissions: %s', e)
             return []
     
     def index(self, request, extra_context=None):
-        # Print useful debugging info for every admin request
-        print(f"\n{'='*50}\nADMIN REQUEST: {request.path}\nUser: {request.user.username}\nAuthenticated: {request.user.is_authenticated}\n")
+        logger.debug('Admin request: %s user: %s authenticated: %s', request.path, request.user.username, request.user.is_authenticated)
         
         # Check if user is authenticated and has an employee attribute
         if not request.user.is_authenticated:
-            print("User not authenticated")
+            logger.debug('User not authenticated')
             return super().index(request, extra_context)
             
-        # Print important user info for debugging
-        print(f"User Role: {getattr(request.user, 'role', 'unknown')}")
-        print(f"Is Employee: {getattr(request.user, 'is_employee', False)}")
-        print(f"Is Superuser: {getattr(request.user, 'is_superuser', False)}")
+        logger.debug(
+            'Admin user role: %s, employee: %s, superuser: %s',
+            getattr(request.user, 'role', 'unknown'),
+            getattr(request.user, 'is_employee', False),
+            getattr(request.user, 'is_superuser', False),
+        )
         
         # Get permissions using our helper method
         user_permissions = self._get_permission_ids(request.user)
-        print(f"User Permissions: {user_permissions}")
+        logger.debug('User Permissions: %s', user_permissions)
         
         # For employee redirection
         if hasattr(request.user, 'is_employee') and request.user.is_employee:
             # Skip redirection only for superusers and admin roles
             if request.user.is_superuser or request.user.role in ['super_admin', 'admin']:
-                print(f"Admin user: allowing dashboard access")
+                logger.debug('Admin user: allowing dashboard access')
             else:
-                print(f"Employee detected: {request.user.username} - checking redirect permissions")
+                logger.debug('Employee detected: %s - checking redirect permissions', request.user.username)
                 
                 # Comprehensive check for order-related permissions (case insensitive)
                 order_perms = ['orders_view', 'orders_manage', 'order_view', 'order_manage', 'view_order', 'manage_order']
@@ -69,34 +73,35 @@ class RestaurantAdminSite(admin.AdminSite):
                 has_qr_code_perm = any(perm.lower() in [p.lower() for p in qr_code_perms] for perm in user_permissions)
                 has_account_perm = any(perm.lower() in [p.lower() for p in account_perms] for perm in user_permissions)
                 
-                print(f"Permission check results - Orders: {has_order_perm}, Menu: {has_menu_perm}, ")
-                print(f"Customers: {has_customer_perm}, Users: {has_user_perm}, ")
-                print(f"QR Codes: {has_qr_code_perm}, Accounts: {has_account_perm}")
+                logger.debug(
+                    'Permission check results - Orders: %s, Menu: %s, Customers: %s, Users: %s, QR Codes: %s, Accounts: %s',
+                    has_order_perm, has_menu_perm, has_customer_perm, has_user_perm, has_qr_code_perm, has_account_perm,
+                )
                 
                 # Redirect based on permission priority
                 if has_order_perm:
-                    print(f"Redirecting {request.user.username} to orders section")
+                    logger.debug('Redirecting %s to orders section', request.user.username)
                     return HttpResponseRedirect(reverse('restaurant_admin:qrgenerator_order_changelist'))
                 elif has_menu_perm:
-                    print(f"Redirecting {request.user.username} to menu section")
+                    logger.debug('Redirecting %s to menu section', request.user.username)
                     return HttpResponseRedirect(reverse('restaurant_admin:our_menu_menuitem_changelist'))
                 elif has_customer_perm:
-                    print(f"Redirecting {request.user.username} to customer section")
+                    logger.debug('Redirecting %s to customer section', request.user.username)
                     return HttpResponseRedirect(reverse('restaurant_admin:qrgenerator_waitercall_changelist'))
                 elif has_user_perm:
-                    print(f"Redirecting {request.user.username} to user section")
+                    logger.debug('Redirecting %s to user section', request.user.username)
                     return HttpResponseRedirect(reverse('restaurant_admin:UserRole_customuser_changelist'))
                 elif has_qr_code_perm:
-                    print(f"Redirecting {request.user.username} to QR code section")
+                    logger.debug('Redirecting %s to QR code section', request.user.username)
                     return HttpResponseRedirect(reverse('restaurant_admin:qrgenerator_qrcode_changelist'))
                 elif has_account_perm:
-                    print(f"Redirecting {request.user.username} to account section")
+                    logger.debug('Redirecting %s to account section', request.user.username)
                     # Use an appropriate URL for account management
                     # If you don't have a specific model for accounts yet, you could redirect to the dashboard
                     return HttpResponseRedirect(reverse('restaurant_admin:index'))
                 else:
                     # If no specific permissions found, still redirect employees away from dashboard
-                    print(f"No specific permissions found, redirecting to orders as fallback")
+                    logger.debug('No specific permissions found, redirecting to orders as fallback')
                     return HttpResponseRedirect(reverse('restaurant_admin:qrgenerator_order_changelist'))
         
         # If we get here, either:
@@ -115,11 +120,11 @@ from django.apps import apps
 try:
     # Menu app models
     from our_menu.models import MenuItem, Category, Discount, ExtraCharge
-    print("Successfully registered menu models with restaurant admin site")
+    logger.debug('Successfully registered menu models with restaurant admin site')
     
     # QR Generator app models
     from qrgenerator.models import Order, Table, WaiterCall
-    print("Successfully registered qrgenerator models with restaurant admin site")
+    logger.debug('Successfully registered qrgenerator models with restaurant admin site')
     
     # Get the admin classes for each model if they exist
     # This preserves any custom admin configurations
@@ -141,10 +146,10 @@ try:
     restaurant_admin_site.register(Table, get_admin_class(Table))
     restaurant_admin_site.register(WaiterCall, get_admin_class(WaiterCall))
     
-    print("Successfully registered models with custom admin site")
+    logger.debug('Successfully registered models with custom admin site')
     
 except Exception as e:
-    print(f"Error registering models with custom admin site: {e}")
+    logger.exception('Error registering models with custom admin site: %s', e)
     # If there's an error, we'll still have the basic functionality
 
 
@@ -367,6 +372,7 @@ restaurant_admin_site.register(Permission, PermissionAdmin)
 
 # Also register with the default admin site for backward compatibility
 from django.contrib import admin as default_admin
+
 # Unregister if already registered (in case Django auto-registered it)
 try:
     default_admin.site.unregister(CustomUser)
@@ -56,10 +56,10 @@ class Command(BaseCommand):
             
             if created:
                 created_count += 1
-                logger.info(f"Created permission: {perm.id} - {perm.name}")
+                logger.info('Created permission: %s - %s', perm.id, perm.name)
             else:
                 updated_count += 1
-                logger.info(f"Updated permission: {perm.id} - {perm.name}")
+                logger.info('Updated permission: %s - %s', perm.id, perm.name)
                 
         # Print summary
         self.stdout.write(self.style.SUCCESS(
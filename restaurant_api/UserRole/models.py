@@ -3,6 +3,9 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.apps import apps
+import logging
+
+logger = logging.getLogger(__name__)
 
 class UserRoleChoices(models.TextChoices):
     SUPER_ADMIN = 'super_admin', 'Super Admin'
@@ -149,9 +152,9 @@ class CustomUser(AbstractUser):
                 self.custom_permissions.clear()
                 self.custom_permissions.add(*permissions)
                 
-                print(f"Assigned {permissions.count()} permissions to user {self.username} (Role: {self.role})")
+                logger.info('Assigned %s permissions to user %s (Role: %s)', len(role_perms), self.username, self.role)
         except Exception as e:
-            print(f"Error assigning permissions to user {self.username}: {str(e)}")
+            logger.exception('Error assigning permissions to user %s: %s', self.username, str(e))
 
     def __str__(self):
         return f"{self.username} ({self.email})"
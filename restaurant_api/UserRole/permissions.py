@@ -1,6 +1,9 @@
 from rest_framework import permissions
 from .models import Permission, CustomUser
 from django.db import models
+import logging
+
+logger = logging.getLogger(__name__)
 
 class HasRequiredPermission(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -24,117 +27,111 @@ class IsSuperAdmin(permissions.BasePermission):
 class IsAdminOrSuperAdmin(permissions.BasePermission):
     """Permission check for admin or super admin with strict access controls."""
     def has_permission(self, request, view):
-        print(f"IsAdminOrSuperAdmin - Checking if user {request.user.username} (role: {request.user.role}) has admin permissions")
+        logger.debug('IsAdminOrSuperAdmin - Checking if user %s (role: %s) has admin permissions', request.user.username, request.user.role)
         
         # Check if user has a valid role
         if not hasattr(request.user, 'role'):
-            print(f"User {request.user.username} has no role attribute")
+            logger.debug('User %s has no role attribute', request.user.username)
             return False
             
         # Super admin has all permissions
         if request.user.role == 'super_admin':
-            print(f"User {request.user.username} is super_admin, granting access")
+            logger.debug('User %s is super_admin, granting access', request.user.username)
             return True
             
         # Admin users have permission but with restrictions
         if request.user.role == 'admin':
-            print(f"User {request.user.username} is admin, checking specific access permissions")
+            logger.debug('User %s is admin, checking specific access permissions', request.user.username)
             
             # If it's a list/create view, restrict to only seeing their own created users
             if view.__class__.__name__ in ['UserListCreateView', 'MyUsersView']:
-                print(f"Admin {request.user.username} granted access to user list with filtering")
+                logger.debug('Admin %s granted access to user list with filtering', request.user.username)
                 return True
                 
             # For detail views (retrieve/update/destroy), check object permission
             if view.__class__.__name__ == 'UserRetrieveUpdateDestroyView':
                 # Object permission will be checked in has_object_permission
-                print(f"Admin {request.user.username} accessing detail view, will check object permission")
+                logger.debug('Admin %s accessing detail view, will check object permission', request.user.username)
                 return True
                 
             return True
             
-        print(f"User {request.user.username} with role {request.user.role} denied admin access")
+        logger.info('User %s with role %s denied admin access', request.user.username, request.user.role)
         return False
         
     def has_object_permission(self, request, view, obj):
-        print(f"IsAdminOrSuperAdmin - Checking object permission for user {request.user.username} (role: {request.user.role})")
+        logger.debug('IsAdminOrSuperAdmin - Checking object permission for user %s (role: %s)', request.user.username, request.user.role)
         
         # Super admin has all permissions
         if request.user.role == 'super_admin':
-            print(f"Object permission granted to super_admin {request.user.username}")
+            logger.debug('Object permission granted to super_admin %s', request.user.username)
             return True
             
         # Admin users can only access their own profile or users they created
         if request.user.role == 'admin':
             # If accessing own profile
             if hasattr(obj, 'id') and obj.id == request.user.id:
-                print(f"Admin {request.user.username} accessing their own profile, granted")
+                logger.debug('Admin %s accessing their own profile, granted', request.user.username)
                 return True
                 
             # If accessing user they created - STRICT CHECK
             if hasattr(obj, 'created_by') and obj.created_by and obj.created_by.id == request.user.id:
-                print(f"Admin {request.user.username} accessing user they created, granted")
+                logger.debug('Admin %s accessing user they created, granted', request.user.username)
                 return True
                 
             # DENY ACCESS to other admin-created users
             if hasattr(obj, 'role'):
                 if obj.role == 'admin':
-                    print(f"Admin {request.user.username} DENIED access to another admin {obj.username}")
+                    logger.warning('Admin %s DENIED access to another admin %s', request.user.username, obj.username)
                     return False
                     
                 if hasattr(obj, 'created_by') and obj.created_by and obj.created_by.role == 'admin' and obj.created_by.id != request.user.id:
-                    print(f"Admin {request.user.username} DENIED access to user created by another admin")
+                    logger.warning('Admin %s DENIED access to user created by another admin', request.user.username)
                     return False
             
-            print(f"Admin {request.user.username} denied access to object {obj}")
+            logger.info('Admin %s denied access to object %s', request.user.username, obj)
             return False
             
-        print(f"User {request.user.username} with role {request.user.role} denied object permission")
+        logger.info('User %s with role %s denied object permission', request.user.username, request.user.role)
         return False
 
 class CanModifyCredentials(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        # Debug logging
-        print(f"Checking credential modification for user: {request.user}")
-        print(f"User role: {request.user.role}")
-        print(f"Object: {obj}")
+        logger.debug('Checking credential modification for user: %s (role: %s) on %s', request.user, request.user.role, obj)
         
         # Allow if user is modifying their own credentials and has permission
         if request.user == obj:
             can_modify = request.user.can_modify_credentials()
-            print(f"User modifying own credentials, can_modify: {can_modify}")
+            logger.debug('User modifying own credentials, can_modify: %s', can_modify)
             return can_modify
         # Allow if user is admin/super_admin modifying employee credentials
         is_admin = request.user.is_admin_or_super_admin()
         is_employee = obj.is_employee
-        print(f"User is admin: {is_admin}, object is employee: {is_employee}")
+        logger.debug('User is admin: %s, object is employee: %s', is_admin, is_employee)
         return is_admin and is_employee
 
 class IsEmployeeOrAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
         if not request.user.is_authenticated:
-            print("User is not authenticated")
+            logger.debug('User is not authenticated')
             return False
             
-        # Debug logging
-        print(f"Checking employee/admin permissions for user: {request.user}")
-        print(f"User role: {request.user.role}")
-        print(f"Is admin or super admin: {request.user.is_admin_or_super_admin()}")
+        logger.debug('Checking employee/admin permissions for user: %s (role: %s)', request.user, request.user.role)
             
         # Allow if user is admin/super_admin
         if request.user.is_admin_or_super_admin():
-            print("User is admin/super_admin - granting permission")
+            logger.debug('User is admin/super_admin - granting permission')
             return True
             
         # Allow if user is employee and has required permission
         required_permission = getattr(view, 'required_permission', None)
         if not required_permission:
-            print("No required permission specified - granting access")
+            logger.debug('No required permission specified - granting access')
             return True
             
         # Check if user has the required permission
         has_perm = request.user.is_employee and request.user.has_permission(required_permission)
-        print(f"User is employee: {request.user.is_employee}, has required permission: {has_perm}")
+        logger.debug('User is employee: %s, has required permission: %s', request.user.is_employee, has_perm)
         
         # If user has permission, ensure they can only access their admin's data
         if has_perm and hasattr(view, 'get_queryset'):
@@ -146,7 +143,7 @@ class IsEmployeeOrAdmin(permissions.BasePermission):
                 view.queryset = view.queryset.filter(
                     models.Q(created_by=admin) | models.Q(admin=admin)
                 )
-                print(f"Filtered queryset for employee {request.user.username} to show admin {admin.username}'s data")
+                logger.debug("Filtered queryset for employee %s to show admin %s's data", request.user.username, admin.username)
         
         return has_perm
 
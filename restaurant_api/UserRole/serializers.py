@@ -1,5 +1,8 @@
 from rest_framework import serializers
 from .models import CustomUser, Permission, UserRoleChoices, UserStatus
+import logging
+
+logger = logging.getLogger(__name__)
 
 class PermissionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -84,7 +87,7 @@ class UserSerializer(serializers.ModelSerializer):
         
         # Get the creator (from context) - this is the authenticated user making the request
         creator = self.context.get('request').user if self.context.get('request') else None
-        print(f"Creator user for new user: {creator.username if creator else 'None'} (ID: {creator.id if creator else 'None'})")
+        logger.debug('Creator user for new user: %s (ID: %s)', creator.username if creator else 'None', creator.id if creator else 'None')
 
         # Only set super_admin role for the first user in the system
         if not CustomUser.objects.filter(role=UserRoleChoices.SUPER_ADMIN).exists():
@@ -109,7 +112,7 @@ class UserSerializer(serializers.ModelSerializer):
         # Set the created_by field to the authenticated user if not specified
         if creator and creator.is_authenticated and not user.created_by:
             user.created_by = creator
-            print(f"Setting created_by to {creator.username} (ID: {creator.id})")
+            logger.debug('Setting created_by to %s (ID: %s)', creator.username, creator.id)
         
         # --- FORCE is_employee False for new admins and super_admins after instance creation ---
         if user.role in [UserRoleChoices.ADMIN, UserRoleChoices.SUPER_ADMIN]:
@@ -126,7 +129,7 @@ class UserSerializer(serializers.ModelSerializer):
             if permission_ids:
                 permissions_to_set = Permission.objects.filter(id__in=permission_ids)
                 user.custom_permissions.set(permissions_to_set)
-                print(f"Set {len(permission_ids)} permissions for new user {user.username}")
+                logger.debug('Set %s permissions for new user %s', len(permission_ids), user.username)
         
         # For super_admin role, always set all permissions
         if user.role == 'super_admin':
@@ -181,7 +184,7 @@ class UserSerializer(serializers.ModelSerializer):
                 if permissions_to_set.exists():
                     # Directly update the many-to-many relationship
                     instance.custom_permissions.set(permissions_to_set)
-                    print(f"Updated permissions for {instance.username}: {permission_ids}")
+                    logger.info('Updated permissions for %s: %s', instance.username, permission_ids)
         
         # For super_admin, always ensure they have all permissions
         if instance.role == 'super_admin':
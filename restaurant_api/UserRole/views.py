@@ -14,6 +14,9 @@ from rest_framework import serializers
 from django.core.exceptions import PermissionDenied
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth import get_user_model
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -150,7 +153,7 @@ class UserListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         try:
             current_user = self.request.user
-            print(f"UserListCreateView - Current user: {current_user.username} (ID: {current_user.id}) with role: {current_user.role}")
+            logger.debug('UserListCreateView - Current user: %s (ID: %s) with role: %s', current_user.username, current_user.id, current_user.role)
             
             # Start with base query
             from django.db.models import Q
@@ -178,7 +181,7 @@ class UserListCreateView(generics.ListCreateAPIView):
             return queryset
             
         except Exception as e:
-            print(f"Error in UserListCreateView get_queryset: {str(e)}")
+            logger.exception('Error in UserListCreateView get_queryset: %s', str(e))
             raise PermissionDenied(str(e))
 
     def perform_create(self, serializer):
@@ -191,7 +194,7 @@ class UserListCreateView(generics.ListCreateAPIView):
                 user.is_staff = True
                 user.save(update_fields=['is_employee', 'is_staff'])
         except Exception as e:
-            print(f"Error in perform_create: {str(e)}")
+            logger.exception('Error in perform_create: %s', str(e))
             raise PermissionDenied(str(e))
 
     def list(self, request, *args, **kwargs):
@@ -224,7 +227,7 @@ class UserRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
             # If user is employee, only show their own profile
             return CustomUser.objects.filter(id=current_user.id).prefetch_related('custom_permissions')
         except Exception as e:
-            print(f"Error in get_queryset: {str(e)}")
+            logger.exception('Error in get_queryset: %s', str(e))
             raise PermissionDenied(str(e))
 
     def get_object(self):
@@ -245,17 +248,17 @@ class UserRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
                 return obj
             # Block access to any admin or super_admin
             if obj.role in ['admin', 'super_admin']:
-                print(f"Access DENIED: Admin {current_user.username} attempted to access admin/super_admin {obj.username}")
+                logger.warning('Access DENIED: Admin %s attempted to access admin/super_admin %s', current_user.username, obj.username)
                 raise PermissionDenied("You cannot view or edit other admin users.")
             # Allow only if created_by is current admin
             if obj.created_by and obj.created_by.id == current_user.id:
                 return obj
-            print(f"Access DENIED: Admin {current_user.username} attempted to access user {obj.username} not created by them")
+            logger.warning('Access DENIED: Admin %s attempted to access user %s not created by them', current_user.username, obj.username)
             raise PermissionDenied("You can only view or edit users you have created.")
             
         # Regular users can only access their own profile
         elif obj.id != current_user.id:
-            print(f"Access denied: User {current_user.username} attempted to access another user {obj.username}")
+            logger.warning('Access denied: User %s attempted to access another user %s', current_user.username, obj.username)
             raise PermissionDenied("You can only view or edit your own profile.")
             
         return obj
@@ -282,7 +285,7 @@ class UserRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
             instance = serializer.save(**update_kwargs)
             return instance
         except Exception as e:
-            print(f"Error in perform_update: {str(e)}")
+            logger.exception('Error in perform_update: %s', str(e))
             raise PermissionDenied(str(e))
 
 class PermissionListView(generics.ListAPIView):
@@ -299,15 +302,7 @@ class MyUsersView(generics.ListAPIView):
     def get_queryset(self):
         try:
             current_user = self.request.user
-            print(f"MyUsersView - Current user: {current_user.username} (ID: {current_user.id}) with role: {current_user.role}")
-            
-            # Debug: Print all users and their created_by relationships
-            all_users = CustomUser.objects.all()
-            print(f"Total users in system: {all_users.count()}")
-            for user in all_users:
-                creator_id = user.created_by_id if user.created_by_id else 'None'
-                creator_name = user.created_by.username if user.created_by else 'None'
-                print(f"User {user.username} (ID: {user.id}, Role: {user.role}) - Created by: {creator_name} (ID: {creator_id})")
+            logger.debug('MyUsersView - Current user: %s (ID: %s) with role: %s', current_user.username, current_user.id, current_user.role)
             
             # Start with base query
             from django.db.models import Q
@@ -319,23 +314,22 @@ class MyUsersView(generics.ListAPIView):
                 # 1. Themselves
                 # 2. Users they created (but not other super_admins)
                 base_query = Q(id=current_user.id) | (Q(created_by=current_user) & ~Q(role='super_admin'))
-                print(f"Super admin {current_user.username} sees self and users they created (excluding other super_admins)")
+                logger.debug('Super admin %s sees self and users they created (excluding other super_admins)', current_user.username)
             # For admin role:
             elif current_user.role == 'admin':
                 # Admin can see:
                 # 1. Themselves
                 # 2. Non-admin users they created
                 base_query = Q(id=current_user.id) | (Q(created_by=current_user) & ~Q(role__in=['admin', 'super_admin']))
-                print(f"Admin {current_user.username} sees self and non-admin users they created")
+                logger.debug('Admin %s sees self and non-admin users they created', current_user.username)
             
             # Apply the query and prefetch related permissions
             queryset = CustomUser.objects.filter(base_query).prefetch_related('custom_permissions')
-            print(f"Final queryset count: {queryset.count()}")
             
             return queryset
             
         except Exception as e:
-            print(f"Error in MyUsersView get_queryset: {str(e)}")
+            logger.exception('Error in MyUsersView get_queryset: %s', str(e))
             raise PermissionDenied(str(e))
     
     def list(self, request, *args, **kwargs):
@@ -11,13 +11,11 @@ def send_otp_email_async(user_email, otp_code, purpose):
     try:
         result = send_otp_email(user_email, otp_code, purpose)
         if result:
-            logger.info(f"OTP email sent successfully to {user_email} for {purpose}")
+            logger.info('OTP email sent successfully to %s for %s', user_email, purpose)
         else:
-            logger.warning(f"OTP email sending returned False for {user_email} - check email configuration")
+            logger.warning('OTP email sending returned False for %s - check email configuration', user_email)
     except Exception as e:
-        logger.error(f"Failed to send OTP email to {user_email}: {str(e)}", exc_info=True)
-        # Print to console for immediate visibility in logs
-        print(f"ERROR: Failed to send OTP email to {user_email}: {str(e)}")
+        logger.exception('Failed to send OTP email to %s: %s', user_email, e)
 
 def send_otp_email(user_email, otp_code, purpose):
     if purpose == 'signup':
@@ -112,28 +110,23 @@ def send_otp_email(user_email, otp_code, purpose):
             fail_silently=False,  # Set to False to see actual errors
         )
         if result:
-            logger.info(f"OTP email sent successfully to {user_email} for {purpose}")
-            print(f"SUCCESS: OTP email sent to {user_email}")
+            logger.info('OTP email sent successfully to %s for %s', user_email, purpose)
             return True
         else:
-            logger.warning(f"send_mail returned False for {user_email}")
-            print(f"WARNING: send_mail returned False for {user_email}")
+            logger.warning('send_mail returned False for %s', user_email)
             return False
     except Exception as e:
         error_msg = str(e)
-        logger.error(f"Error sending OTP email to {user_email}: {error_msg}", exc_info=True)
-        # Print to console for immediate visibility
-        print(f"ERROR: Failed to send OTP email to {user_email}: {error_msg}")
-        print(f"ERROR Type: {type(e).__name__}")
+        logger.exception('Error sending OTP email to %s (%s): %s', user_email, type(e).__name__, error_msg)
         
         # Provide helpful error messages
         if "authentication failed" in error_msg.lower() or "invalid credentials" in error_msg.lower():
-            print("ERROR: Gmail authentication failed. Please check:")
-            print("  1. App Password is correct and not expired")
-            print("  2. 2-Step Verification is enabled")
-            print("  3. App Password is valid for the account")
+            logger.error(
+                'Gmail authentication failed. Check that the App Password is correct and not expired, '
+                '2-Step Verification is enabled, and the App Password is valid for the account'
+            )
         elif "connection" in error_msg.lower() or "timeout" in error_msg.lower():
-            print("ERROR: Email connection issue. Check network/firewall settings.")
+            logger.error('Email connection issue. Check network/firewall settings.')
         
         # Don't raise exception - allow signup to continue even if email fails
         return False
@@ -18,6 +18,9 @@ from datetime import timedelta
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf import settings
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -191,7 +194,7 @@ class LoginView(APIView):
                 redirect_url = '/admin/'
 
                 # For debugging, print user info
-                print(f"\n{'='*50}\nLOGIN for user: {user.username}\nIs Employee: {user.is_employee}\nRole: {user.role}\n")
+                logger.debug('Login for user: %s (employee: %s, role: %s)', user.username, user.is_employee, user.role)
 
                 # --- ADMIN SUBSCRIPTION/PAYMENT CHECK ---
                 if not user.is_employee and (getattr(user, 'role', None) in ['super_admin', 'admin'] or getattr(user, 'is_superuser', False)):
@@ -207,7 +210,7 @@ class LoginView(APIView):
                         else:
                             redirect_url = '/admin/subscribe/'
                     except Exception as e:
-                        print(f"Error in admin subscription/payment check: {e}")
+                        logger.exception('Error in admin subscription/payment check: %s', e)
                         redirect_url = '/admin/subscribe/'
                 # --- END ADMIN SUBSCRIPTION/PAYMENT CHECK ---
 
@@ -218,7 +221,7 @@ class LoginView(APIView):
                     
                     # Get user permissions for more specific redirects
                     user_permissions = [str(p.id).lower() for p in user.custom_permissions.all()]
-                    print(f"User permissions: {user_permissions}")
+                    logger.debug('User permissions: %s', user_permissions)
                     
                     # Comprehensive check for all permission variations (like in middleware)
                     order_perms = ['orders_view', 'orders_manage', 'order_view', 'order_manage', 'view_order', 'manage_order']
@@ -232,32 +235,34 @@ class LoginView(APIView):
                     has_customer_perm = any(perm in [p.lower() for p in customer_perms] for perm in user_permissions)
                     has_user_perm = any(perm in [p.lower() for p in user_perms] for perm in user_permissions)
                     
-                    print(f"Permission check results - Orders: {has_order_perm}, Menu: {has_menu_perm}")
-                    print(f"Customers: {has_customer_perm}, Users: {has_user_perm}")
+                    logger.debug(
+                        'Permission check results - Orders: %s, Menu: %s, Customers: %s, Users: %s',
+                        has_order_perm, has_menu_perm, has_customer_perm, has_user_perm,
+                    )
                     
                     # Redirect based on permission priority - use explicit URLs with proper admin site prefix
                     try:
                         from django.urls import reverse
                         if has_order_perm:
-                            print(f"Redirecting {user.username} to orders section")
+                            logger.debug('Redirecting %s to orders section', user.username)
                             redirect_url = reverse('restaurant_admin:qrgenerator_order_changelist')
-                            print(f"Generated URL: {redirect_url}")
+                            logger.debug('Generated URL: %s', redirect_url)
                         elif has_menu_perm:
-                            print(f"Redirecting {user.username} to menu section")
+                            logger.debug('Redirecting %s to menu section', user.username)
                             redirect_url = reverse('restaurant_admin:our_menu_menuitem_changelist')
                         elif has_customer_perm:
-                            print(f"Redirecting {user.username} to customer section")
+                            logger.debug('Redirecting %s to customer section', user.username)
                             redirect_url = reverse('restaurant_admin:qrgenerator_waitercall_changelist')
                         elif has_user_perm:
-                            print(f"Redirecting {user.username} to user section")
+                            logger.debug('Redirecting %s to user section', user.username)
                             redirect_url = reverse('restaurant_admin:UserRole_customuser_changelist')
                         else:
                             # If no specific permissions, still redirect to orders as fallback
-                            print(f"No specific permissions found, using fallback")
+                            logger.debug('No specific permissions found, using fallback')
                             redirect_url = reverse('restaurant_admin:qrgenerator_order_changelist')
                     except Exception as e:
                         # Fallback to hardcoded paths if reverse fails
-                        print(f"Error generating reverse URL: {e}")
+                        logger.exception('Error generating reverse URL: %s', e)
                         if has_order_perm:
                             redirect_url = '/restaurant/qrgenerator/order/'
                         elif has_menu_perm:
@@ -342,8 +347,7 @@ class ChangePasswordView(APIView):
 
     def post(self, request):
         user = request.user
-        print(f"Changing password for user: {user.email} (id={user.id})")
-        print(f"Request headers: {request.headers}")
+        logger.debug('Changing password for user: %s (id=%s)', user.email, user.id)
         current_password = request.data.get('current_password')
         new_password = request.data.get('new_password')
         if not user.check_password(current_password):
@@ -0,0 +1 @@
+"""Load-test and benchmark suite for the ordering hot path; see benchmarks/run.py."""
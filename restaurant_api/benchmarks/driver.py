@@ -0,0 +1,121 @@
+"""
+Timing and query counting for benchmark scenarios.
+
+Requests are split across `concurrency` threads, each with its own test
+client and database connection. For every request we record wall-clock
+latency, the CPU time its thread spent, the number of queries it ran on its
+thread's connection, the response size in bytes (as sent, i.e. after
+compression) and the response status. Streamed bodies are read in full inside
+the timed section, since that is where their queries and rendering happen.
+"""
+import math
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, elapsed, concurrency):
+    latencies = [sample['latency'] * 1000 for sample in samples]
+    queries = [sample['queries'] for sample in samples]
+    cpu = [sample['cpu'] * 1000 for sample in samples]
+    sizes = [sample['bytes'] for sample in samples]
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample['status'])] = statuses.get(str(sample['status']), 0) + 1
+    return {
+        'requests': len(samples),
+        'concurrency': concurrency,
+        # Every scenario expects success, so any 4xx/5xx (or an exception, recorded as 0) is an error
+        'errors': sum(1 for sample in samples if not 200 <= sample['status'] < 400),
+        'statuses': statuses,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'mean': round(statistics.fmean(latencies), 3),
+            'max': round(max(latencies), 3),
+        },
+        'cpu_ms': {
+            'p50': round(percentile(cpu, 0.50), 3),
+            'p95': round(percentile(cpu, 0.95), 3),
+            'mean': round(statistics.fmean(cpu), 3),
+        },
+        'queries': {
+            'p50': percentile(queries, 0.50),
+            'p95': percentile(queries, 0.95),
+            'max': max(queries),
+        },
+        'bytes': {
+            'p50': percentile(sizes, 0.50),
+            'max': max(sizes),
+        },
+    }
+
+
+def _body_size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _client_for(scenario, tenant):
+    client = Client(headers=scenario.headers)
+    if scenario.authenticated:
+        client.force_login(tenant.admin)
+    return client
+
+
+def _run_chunk(scenario, tenant, args, samples, lock):
+    client = _client_for(scenario, tenant)
+    results = []
+    try:
+        for arg in args:
+            start, cpu_start = time.perf_counter(), time.thread_time()
+            size = 0
+            with CaptureQueriesContext(connection) as captured:
+                try:
+                    response = scenario.request(client, tenant, arg)
+                    status = response.status_code
+                    size = _body_size(response)
+                except Exception:
+                    status = 0
+            results.append({
+                'latency': time.perf_counter() - start, 'cpu': time.thread_time() - cpu_start,
+                'queries': len(captured), 'bytes': size, 'status': status,
+            })
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+    with lock:
+        samples.extend(results)
+
+
+def run_scenario(scenario, tenant, factory, requests=50, concurrency=1, warmup=5):
+    """Run `warmup` untimed requests, then `requests` timed ones over `concurrency` threads."""
+    args = scenario.prepare(tenant, factory, warmup + requests)
+    _run_chunk(scenario, tenant, args[:warmup], [], threading.Lock())
+    timed = args[warmup:]
+
+    samples, lock = [], threading.Lock()
+    start = time.perf_counter()
+    if concurrency <= 1:
+        _run_chunk(scenario, tenant, timed, samples, lock)
+    else:
+        chunks = [timed[index::concurrency] for index in range(concurrency)]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(_run_chunk, scenario, tenant, chunk, samples, lock) for chunk in chunks]:
+                future.result()
+    return summarize(samples, time.perf_counter() - start, concurrency)
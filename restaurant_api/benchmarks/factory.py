@@ -0,0 +1,310 @@
+"""
+Fast, deterministic synthetic restaurants for benchmarks and load testing.
+
+Everything is written with bulk_create, so model save() methods and
+post_save signals don't run: fields they would fill in (user flags, order,
+review and transaction tenants, table QR URLs, inventory codes, subscription
+dates) are set here instead, and no emails are sent. All users share one
+password hash. The same seed always produces the same rows.
+"""
+import datetime
+import json
+import random
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cached_property
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from Billing.models import Subscription
+from EsewaIntegration.models import EsewaTransaction
+from InventoryManagement.models import IngredientMapping, InventoryItem
+from our_menu.models import Category, Discount, ExtraCharge, MenuItem
+from PaynmentANDreview.models import Review
+from qrgenerator.models import Order, Table
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 2000
+
+CATEGORY_NAMES = ['Starters', 'Mains', 'Momo', 'Noodles', 'Curries', 'Desserts', 'Drinks', 'Specials']
+DISH_WORDS = ['Chicken', 'Paneer', 'Veg', 'Buff', 'Mutton', 'Fish', 'Egg', 'Mushroom', 'Pork', 'Tofu']
+DISH_STYLES = ['Momo', 'Chowmein', 'Thukpa', 'Curry', 'Sekuwa', 'Chilli', 'Biryani', 'Sandwich', 'Soup', 'Thali']
+INGREDIENTS = [
+    ('Flour', 'kg'), ('Rice', 'kg'), ('Chicken', 'kg'), ('Paneer', 'kg'), ('Onion', 'kg'), ('Tomato', 'kg'),
+    ('Oil', 'l'), ('Milk', 'l'), ('Egg', 'pcs'), ('Cheese', 'kg'), ('Spice mix', 'g'), ('Noodles', 'pcs'),
+]
+SECTIONS = ['Main Dining', 'Terrace', 'Bar', 'Private']
+CUSTOMER_NAMES = ['Aarav', 'Sita', 'Ram', 'Gita', 'Hari', 'Maya', 'Bikash', 'Anita', 'Suman', 'Priya', '']
+EMPLOYEE_ROLES = ['order_manager', 'menu_manager', 'customer_support', 'inventory_manager', 'account_manager']
+REVIEW_COMMENTS = ['Great food', 'Slow service', 'Loved the momo', 'Too spicy', 'Will come again', 'Cold when served']
+
+# Relative order volume by hour of day (lunch and dinner peaks) and by weekday (Mon..Sun)
+HOURLY_WEIGHTS = [0, 0, 0, 0, 0, 0, 1, 3, 5, 4, 4, 6, 12, 13, 8, 4, 3, 4, 8, 13, 14, 10, 5, 2]
+WEEKDAY_WEIGHTS = [0.85, 0.8, 0.85, 0.9, 1.1, 1.3, 1.2]
+_HOURLY_CUM_WEIGHTS = [sum(HOURLY_WEIGHTS[:hour + 1]) for hour in range(24)]
+
+
+@dataclass
+class TenantData:
+    admin: object
+    employees: list = field(default_factory=list)
+    tables: list = field(default_factory=list)
+    categories: list = field(default_factory=list)
+    menu_items: list = field(default_factory=list)
+    inventory_items: list = field(default_factory=list)
+    order_count: int = 0
+
+    @cached_property
+    def orderable_items(self):
+        return [item for item in self.menu_items if item.available] or self.menu_items
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we set instead of now()."""
+    saved = []
+    for model in models:
+        for model_field in model._meta.concrete_fields:
+            if getattr(model_field, 'auto_now', False) or getattr(model_field, 'auto_now_add', False):
+                saved.append((model_field, model_field.auto_now, model_field.auto_now_add))
+                model_field.auto_now = model_field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for model_field, auto_now, auto_now_add in saved:
+            model_field.auto_now, model_field.auto_now_add = auto_now, auto_now_add
+
+
+def _base36(number):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        out = digits[remainder] + out
+        if not number:
+            return out
+
+
+class SyntheticDataFactory:
+    """
+    Builds restaurants: an admin with tables, a categorised menu with
+    discounts and extra charges, inventory with ingredient mappings, and
+    `days` of order history shaped by HOURLY_WEIGHTS and WEEKDAY_WEIGHTS.
+    """
+
+    def __init__(self, seed=0, batch_size=DEFAULT_BATCH_SIZE, prefix='bench', password='benchmark'):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.password_hash = make_password(password)
+        self.now = timezone.now().replace(microsecond=0)
+        # Order ids are 10 chars: one prefix letter and a base36 sequence that can't clash with ORD... ids
+        self._order_seq = Order.objects.filter(id__startswith='S').count()
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _user(self, username, role, created_by=None):
+        return User(
+            username=username, email=f'{username}@example.com', password=self.password_hash,
+            role=role, status='active', is_active=True, is_staff=True,
+            is_employee=created_by is not None, created_by=created_by,
+        )
+
+    def create_admin(self, index):
+        return User.objects.bulk_create([self._user(f'{self.prefix}-admin-{index}', 'admin')])[0]
+
+    def create_employees(self, admin, count):
+        return User.objects.bulk_create([
+            self._user(f'{admin.username}-staff-{number}', self.rng.choice(EMPLOYEE_ROLES), created_by=admin)
+            for number in range(count)
+        ], batch_size=self.batch_size)
+
+    def create_subscription(self, admin):
+        started = self.now - datetime.timedelta(days=self.rng.randrange(30))
+        return Subscription.objects.bulk_create([Subscription(
+            admin=admin, status='active', trial_end_date=started,
+            subscription_start_date=started, subscription_end_date=started + datetime.timedelta(days=30),
+            last_payment_date=started, next_payment_date=started + datetime.timedelta(days=30),
+        )])[0]
+
+    def create_tenant(self, index, tables=20, menu_items=60, inventory_items=12, days=90, orders=3600,
+                      employees=0, review_rate=0.0):
+        tenant = TenantData(admin=self.create_admin(index))
+        tenant.employees = self.create_employees(tenant.admin, employees)
+        self.create_subscription(tenant.admin)
+        tenant.tables = self.create_tables(tenant.admin, tables)
+        tenant.categories, tenant.menu_items = self.create_menu(tenant.admin, menu_items)
+        tenant.inventory_items = self.create_inventory(tenant.admin, tenant.menu_items, inventory_items)
+        tenant.order_count = self.create_orders(tenant, days, orders, review_rate)
+        return tenant
+
+    def create_tables(self, admin, count):
+        tables = []
+        for number in range(1, count + 1):
+            public_id = self.uuid()
+            tables.append(Table(
+                user=admin, name=f'T{number}', section=self.rng.choice(SECTIONS),
+                size=self.rng.choice([2, 2, 4, 4, 6, 8]), public_id=public_id,
+                qr_code_url=Table.menu_url_for(public_id),
+            ))
+        return Table.objects.bulk_create(tables, batch_size=self.batch_size)
+
+    def create_menu(self, admin, item_count):
+        categories = Category.objects.bulk_create(
+            [Category(user=admin, name=name) for name in CATEGORY_NAMES], batch_size=self.batch_size,
+        )
+        items = []
+        for number in range(item_count):
+            price = Decimal(self.rng.randrange(120, 1500, 10))
+            items.append(MenuItem(
+                user=admin, category=self.rng.choice(categories),
+                name=f'{self.rng.choice(DISH_WORDS)} {self.rng.choice(DISH_STYLES)} {number}',
+                description='Synthetic menu item', price=price,
+                is_new=self.rng.random() < 0.1, available=self.rng.random() < 0.95,
+            ))
+        items = MenuItem.objects.bulk_create(items, batch_size=self.batch_size)
+
+        today = self.now.date()
+        discounts = Discount.objects.bulk_create([
+            Discount(user=admin, description='Happy hour', discount_percentage=10),
+            Discount(user=admin, description='Weekly special', discount_percentage=15,
+                     start_date=today - datetime.timedelta(days=3), end_date=today + datetime.timedelta(days=4)),
+            Discount(user=admin, description='Expired', discount_percentage=25,
+                     start_date=today - datetime.timedelta(days=30), end_date=today - datetime.timedelta(days=1)),
+        ])
+        through = Discount.applicable_items.through
+        through.objects.bulk_create([
+            through(discount_id=discount.pk, menuitem_id=item.pk)
+            for discount in discounts for item in self.rng.sample(items, min(len(items), 8))
+        ], batch_size=self.batch_size)
+        ExtraCharge.objects.bulk_create([
+            ExtraCharge(user=admin, label='Service charge', amount=Decimal('50.00')),
+            ExtraCharge(user=admin, label='Packaging', amount=Decimal('20.00'), active=self.rng.random() < 0.5),
+        ])
+        return categories, items
+
+    def create_inventory(self, admin, menu_items, count):
+        inventory = InventoryItem.objects.bulk_create([
+            InventoryItem(
+                created_by=admin, name=name, unit=unit, code=self.uuid().hex[:10].upper(),
+                current_stock=Decimal(self.rng.randrange(5, 200)), minimum_threshold=Decimal(5),
+                purchase_price=Decimal(self.rng.randrange(50, 800)),
+                expiry_date=self.now.date() + datetime.timedelta(days=self.rng.randrange(-5, 120)),
+            )
+            for name, unit in (INGREDIENTS * (count // len(INGREDIENTS) + 1))[:count]
+        ], batch_size=self.batch_size)
+        mappings = []
+        for dish in menu_items:
+            for ingredient in self.rng.sample(inventory, min(len(inventory), self.rng.randint(1, 3))):
+                mappings.append(IngredientMapping(
+                    dish=dish, ingredient=ingredient, quantity=Decimal(self.rng.randrange(10, 300)) / 1000,
+                ))
+        IngredientMapping.objects.bulk_create(mappings, batch_size=self.batch_size)
+        return inventory
+
+    def order_time(self, day):
+        """A timestamp on `day` drawn from the lunch/dinner-shaped HOURLY_WEIGHTS, never in the future."""
+        hour = self.rng.choices(range(24), cum_weights=_HOURLY_CUM_WEIGHTS)[0]
+        start = timezone.make_aware(datetime.datetime.combine(day, datetime.time(hour)))
+        created_at = start + datetime.timedelta(seconds=self.rng.randrange(3600))
+        if created_at > self.now:
+            created_at = self.now - datetime.timedelta(seconds=self.rng.randrange(3600))
+        return created_at
+
+    def next_order_id(self):
+        self._order_seq += 1
+        return 'S' + _base36(self._order_seq).rjust(9, '0')
+
+    def build_order(self, tenant, created_at, active=False):
+        available = tenant.orderable_items
+        items = []
+        for menu_item in self.rng.sample(available, min(len(available), self.rng.choice([1, 1, 2, 2, 3, 4]))):
+            items.append({
+                'id': str(menu_item.pk), 'name': menu_item.name,
+                'price': float(menu_item.price), 'quantity': self.rng.choice([1, 1, 1, 2, 3]),
+            })
+        total = Decimal(str(sum(item['price'] * item['quantity'] for item in items))) + Decimal('50.00')
+        if active:
+            status, payment_status = self.rng.choice(['pending', 'pending', 'in-progress']), 'pending'
+        else:
+            status = self.rng.choices(['completed', 'cancelled'], weights=[95, 5])[0]
+            payment_status = 'paid' if status == 'completed' else 'unpaid'
+        payment_method = self.rng.choices(['cash', 'esewa'], weights=[60, 40])[0]
+        return Order(
+            id=self.next_order_id(), user=tenant.admin, tenant=tenant.admin,
+            table=self.rng.choice(tenant.tables), items=items, total=total,
+            status=status, payment_status=payment_status, payment_method=payment_method,
+            customer_name=self.rng.choice(CUSTOMER_NAMES), special_instructions='',
+            dining_option=self.rng.choices(['dine-in', 'takeaway', 'delivery'], weights=[70, 20, 10])[0],
+            extra_charges_applied=[{'label': 'Service charge', 'amount': 50.0}],
+            created_at=created_at, updated_at=created_at,
+        )
+
+    def daily_counts(self, days, total):
+        """Split `total` orders over the last `days` days and today, weighted by WEEKDAY_WEIGHTS."""
+        today = self.now.date()
+        dates = [today - datetime.timedelta(days=offset) for offset in range(days, -1, -1)]
+        weights = [WEEKDAY_WEIGHTS[day.weekday()] * self.rng.uniform(0.9, 1.1) for day in dates]
+        scale = total / sum(weights)
+        counts = [int(weight * scale) for weight in weights]
+        # Hand out what rounding down left over, largest remainders first
+        by_remainder = sorted(range(len(dates)), key=lambda i: weights[i] * scale - counts[i], reverse=True)
+        for index in by_remainder[:total - sum(counts)]:
+            counts[index] += 1
+        return list(zip(dates, counts))
+
+    def iter_orders(self, tenant, days, total):
+        """Yield `total` unsaved orders covering the last `days` days; today's are still active."""
+        today = self.now.date()
+        for day, count in self.daily_counts(days, total):
+            for _ in range(count):
+                yield self.build_order(tenant, self.order_time(day), active=(day == today))
+
+    def create_orders(self, tenant, days, total, review_rate=0.0):
+        """
+        Write the order history in batches, with eSewa transactions for eSewa
+        orders and reviews for about `review_rate` of completed orders.
+        """
+        written = 0
+        batch = []
+        with explicit_timestamps(Order, EsewaTransaction, Review):
+            for order in self.iter_orders(tenant, days, total):
+                batch.append(order)
+                if len(batch) >= self.batch_size:
+                    written += self._write_orders(tenant, batch, review_rate)
+                    batch = []
+            if batch:
+                written += self._write_orders(tenant, batch, review_rate)
+        return written
+
+    def _write_orders(self, tenant, orders, review_rate):
+        Order.objects.bulk_create(orders, batch_size=self.batch_size)
+        transactions = [
+            EsewaTransaction(
+                order=order, tenant_id=order.tenant_id, amount=order.total,
+                transaction_uuid=f'{order.id}-{self.uuid().hex[:12]}',
+                status='COMPLETED' if order.payment_status == 'paid' else 'INITIATED',
+                order_details=json.dumps({'table_id': order.table_id, 'total': float(order.total)}),
+                created_at=order.created_at, updated_at=order.created_at,
+            )
+            for order in orders if order.payment_method == 'esewa'
+        ]
+        EsewaTransaction.objects.bulk_create(transactions, batch_size=self.batch_size)
+        reviews = [
+            Review(
+                order=order, tenant_id=order.tenant_id, admin=tenant.admin,
+                rating=self.rng.choices(range(1, 6), weights=[5, 5, 15, 35, 40])[0],
+                comment=self.rng.choice(REVIEW_COMMENTS),
+                created_at=order.created_at + datetime.timedelta(minutes=self.rng.randrange(20, 120)),
+                updated_at=order.created_at,
+            )
+            for order in orders if order.status == 'completed' and self.rng.random() < review_rate
+        ]
+        Review.objects.bulk_create(reviews, batch_size=self.batch_size)
+        return len(orders)
@@ -0,0 +1,150 @@
+"""
+Run the benchmark suite and write the results as JSON.
+
+    cd restaurant_api
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output new.json --compare bench.json
+
+The suite creates a throwaway test database (like manage.py test), seeds it
+with SyntheticDataFactory and times every scenario in benchmarks.scenarios.
+With --compare it exits non-zero if any scenario's p95 latency grew by more
+than --threshold or its p95 query count grew at all.
+
+SQLite serialises writes, so numbers for --concurrency > 1 are only
+meaningful against PostgreSQL (set DATABASE_URL).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description='Benchmark the ordering hot path.')
+    parser.add_argument('--scenario', action='append', dest='scenarios', help='Run only this scenario (repeatable)')
+    parser.add_argument('--requests', type=int, default=50, help='Timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='Client threads per scenario')
+    parser.add_argument('--tenants', type=int, default=2)
+    parser.add_argument('--tables', type=int, default=20, help='Tables per tenant')
+    parser.add_argument('--menu-items', type=int, default=60, help='Menu items per tenant')
+    parser.add_argument('--days', type=int, default=90, help='Days of order history per tenant')
+    parser.add_argument('--orders-per-day', type=int, default=40, help='Average orders per tenant per day')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-', help='JSON results file (default: stdout)')
+    parser.add_argument('--compare', help='Earlier results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative p95 latency growth')
+    return parser.parse_args(argv)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(options):
+    import django
+    from django.db import connection
+    from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+    from .driver import run_scenario
+    from .factory import SyntheticDataFactory
+    from .scenarios import SCENARIOS
+
+    names = options.scenarios or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(SCENARIOS)}")
+
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        started = time.perf_counter()
+        factory = SyntheticDataFactory(seed=options.seed)
+        tenants = [
+            factory.create_tenant(
+                index, tables=options.tables, menu_items=options.menu_items,
+                days=options.days, orders=options.orders_per_day * options.days,
+            )
+            for index in range(options.tenants)
+        ]
+        seed_seconds = time.perf_counter() - started
+
+        results = {}
+        for name in names:
+            # The first tenant is measured; the others are there so queries have to filter by tenant
+            results[name] = run_scenario(
+                SCENARIOS[name], tenants[0], factory,
+                requests=options.requests, concurrency=options.concurrency, warmup=options.warmup,
+            )
+            print(f"{name}: p50 {results[name]['latency_ms']['p50']}ms p95 {results[name]['latency_ms']['p95']}ms "
+                  f"cpu p50 {results[name]['cpu_ms']['p50']}ms bytes p50 {results[name]['bytes']['p50']} "
+                  f"queries p95 {results[name]['queries']['p95']} errors {results[name]['errors']}", file=sys.stderr)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed_seconds': round(seed_seconds, 2),
+            'orders_per_tenant': tenants[0].order_count,
+            'options': {key: value for key, value in vars(options).items() if key not in ('output', 'compare')},
+        },
+        'scenarios': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Regressions of `current` against `baseline`, as human-readable lines."""
+    regressions = []
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        old_p95, new_p95 = before['latency_ms']['p95'], result['latency_ms']['p95']
+        if old_p95 and new_p95 > old_p95 * (1 + threshold):
+            regressions.append(f'{name}: p95 latency {old_p95}ms -> {new_p95}ms')
+        if result['queries']['p95'] > before['queries']['p95']:
+            regressions.append(f"{name}: p95 queries {before['queries']['p95']} -> {result['queries']['p95']}")
+        if result['errors'] > before['errors']:
+            regressions.append(f"{name}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'restaurant_api.settings')
+    import django
+    django.setup()
+
+    results = run(options)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if options.output == '-':
+        print(output)
+    else:
+        with open(options.output, 'w') as fh:
+            fh.write(output + '\n')
+
+    if options.compare:
+        with open(options.compare) as fh:
+            regressions = compare(results, json.load(fh), options.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
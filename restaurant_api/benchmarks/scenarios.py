@@ -0,0 +1,141 @@
+"""
+The requests each benchmark scenario makes.
+
+A scenario's prepare() runs once, untimed, and returns one argument per
+request it will make (e.g. a fresh eSewa transaction for every verify call);
+request() then makes a single timed request with Django's test client.
+"""
+import base64
+import json
+
+from EsewaIntegration.models import EsewaTransaction
+from qrgenerator.models import Order
+
+from .factory import explicit_timestamps
+
+
+class Scenario:
+    name = None
+    # Requests are made as the tenant's admin (session login) instead of anonymously
+    authenticated = False
+    # Extra request headers, e.g. Accept-Encoding
+    headers = {}
+
+    def prepare(self, tenant, factory, count):
+        return [None] * count
+
+    def request(self, client, tenant, arg):
+        raise NotImplementedError
+
+
+class CustomerMenu(Scenario):
+    name = 'customer_menu'
+
+    def prepare(self, tenant, factory, count):
+        return [factory.rng.choice(tenant.tables).public_id for _ in range(count)]
+
+    def request(self, client, tenant, table_uid):
+        return client.get('/api/menu/customer/', {'tableUid': str(table_uid)})
+
+
+class CreateOrderFromMenu(Scenario):
+    name = 'create_order_from_menu'
+
+    def prepare(self, tenant, factory, count):
+        payloads = []
+        for _ in range(count):
+            order = factory.build_order(tenant, factory.now, active=True)
+            payloads.append({
+                'tableUid': str(order.table.public_id),
+                'items': order.items,
+                'customerName': order.customer_name,
+                'diningOption': order.dining_option,
+                'payment_method': 'cash',
+            })
+        return payloads
+
+    def request(self, client, tenant, payload):
+        return client.post('/api/create-order/', payload, content_type='application/json')
+
+
+class OrderList(Scenario):
+    name = 'order_list'
+    authenticated = True
+
+    def request(self, client, tenant, arg):
+        return client.get('/api/orders/')
+
+
+class OrderListGzip(OrderList):
+    name = 'order_list_gzip'
+    headers = {'Accept-Encoding': 'gzip'}
+
+
+class OrderListBrotli(OrderList):
+    """What browsers get: they all accept Brotli over HTTPS."""
+    name = 'order_list_br'
+    headers = {'Accept-Encoding': 'gzip, deflate, br'}
+
+
+class DashboardFullStats(Scenario):
+    name = 'dashboard_full_stats'
+    authenticated = True
+
+    def request(self, client, tenant, arg):
+        return client.get('/api/orders/dashboard_full_stats/')
+
+
+class ListPayments(Scenario):
+    name = 'list_payments'
+    authenticated = True
+
+    def request(self, client, tenant, arg):
+        return client.get('/api/payments/')
+
+
+class ListPaymentsPage(Scenario):
+    name = 'list_payments_page'
+    authenticated = True
+
+    def request(self, client, tenant, arg):
+        return client.get('/api/payments/', {'limit': 50})
+
+
+class VerifyPayment(Scenario):
+    """Each call completes a fresh INITIATED transaction, like eSewa's success redirect."""
+    name = 'verify_payment'
+
+    def prepare(self, tenant, factory, count):
+        orders = [factory.build_order(tenant, factory.now, active=True) for _ in range(count)]
+        for order in orders:
+            order.payment_method = 'esewa'
+        transactions = [
+            EsewaTransaction(
+                order=order, tenant_id=order.tenant_id, amount=order.total,
+                transaction_uuid=f'{order.id}-verify', created_at=factory.now, updated_at=factory.now,
+            )
+            for order in orders
+        ]
+        with explicit_timestamps(Order, EsewaTransaction):
+            Order.objects.bulk_create(orders, batch_size=factory.batch_size)
+            EsewaTransaction.objects.bulk_create(transactions, batch_size=factory.batch_size)
+        return [
+            (transaction.transaction_uuid, base64.b64encode(json.dumps({
+                'status': 'COMPLETE', 'transaction_uuid': transaction.transaction_uuid,
+                'total_amount': str(transaction.amount),
+            }).encode()).decode())
+            for transaction in transactions
+        ]
+
+    def request(self, client, tenant, arg):
+        transaction_uuid, data = arg
+        return client.get('/api/payments/esewa/verify/', {'transaction_uuid': transaction_uuid, 'data': data})
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        CustomerMenu(), CreateOrderFromMenu(), OrderList(), OrderListGzip(), OrderListBrotli(), DashboardFullStats(),
+        ListPayments(), ListPaymentsPage(), VerifyPayment(),
+    )
+}
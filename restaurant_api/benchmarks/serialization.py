@@ -0,0 +1,77 @@
+"""
+Time order serialization on its own, without the HTTP stack.
+
+    cd restaurant_api
+    python -m benchmarks.serialization --orders 1000
+
+Compares OrderSerializer(many=True), which retrieve and create responses
+still use, with the values()-based fast path the order list and dashboard
+use. "format" timings start from rows already in memory; "fetch + format"
+timings include the query and turning database values into Python ones.
+Each figure is the best of --repeat runs.
+"""
+import argparse
+import os
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serialization', description='Benchmark order serialization.')
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(options):
+    from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+    from django.utils import timezone
+
+    from qrgenerator.models import Order
+    from qrgenerator.serializers import ORDER_READ_FIELDS, OrderSerializer, order_representation, serialize_orders
+
+    from .factory import SyntheticDataFactory
+
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        tenant = SyntheticDataFactory(seed=options.seed).create_tenant(0, days=max(1, options.orders // 40), orders=options.orders)
+        queryset = Order.objects.filter(tenant=tenant.admin).select_related('table').order_by('-created_at')
+        instances = list(queryset)
+        rows = list(queryset.values(*ORDER_READ_FIELDS))
+        tz = timezone.get_current_timezone()
+        timings = {
+            'serializer_format_ms': best_of(options.repeat, lambda: OrderSerializer(instances, many=True).data),
+            'fast_path_format_ms': best_of(options.repeat, lambda: [order_representation(row, tz) for row in rows]),
+            'serializer_fetch_and_format_ms': best_of(options.repeat, lambda: OrderSerializer(queryset.all(), many=True).data),
+            'fast_path_fetch_and_format_ms': best_of(options.repeat, lambda: serialize_orders(queryset.all())),
+        }
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+    print(f'{len(rows)} orders, best of {options.repeat}:')
+    for kind in ('format', 'fetch_and_format'):
+        before, after = timings[f'serializer_{kind}_ms'], timings[f'fast_path_{kind}_ms']
+        print(f"  {kind.replace('_', ' ')}: OrderSerializer {before:.1f}ms, fast path {after:.1f}ms ({before / after:.1f}x)")
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'restaurant_api.settings')
+    import django
+    django.setup()
+    run(options)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,9 @@ python manage.py collectstatic --no-input
 # Run migrations
 python manage.py migrate
 
+# Populate denormalized tenant columns on rows written before they existed
+python manage.py backfill_tenants
+
 # Create permissions (if they don't exist)
 python manage.py create_permissions
 
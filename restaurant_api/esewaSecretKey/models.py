@@ -6,6 +6,9 @@ import re
 from cryptography.fernet import Fernet
 import base64
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 class EsewaCredentials(models.Model):
     """
@@ -121,6 +124,13 @@ class EsewaCredentials(models.Model):
         else:
             return 'https://rc-epay.esewa.com.np/api/epay/main/v2/form'
     
+    def get_status_url(self):
+        """Get the eSewa transaction status API URL based on environment"""
+        if self.environment == 'production':
+            return 'https://epay.esewa.com.np/api/epay/transaction/status/'
+        else:
+            return 'https://rc.esewa.com.np/api/epay/transaction/status/'
+    
     def get_encryption_key(self):
         """Get the encryption key from environment or settings"""
         # First try to get from environment variable
@@ -134,7 +144,7 @@ class EsewaCredentials(models.Model):
             # For development, use a consistent test key
             # In production, this should be set in environment variables
             key = "xClBx4WsWbPJc2a_0OaA_8gBmEnhH1qRStUvWxYz1234567890="
-            print(f"Using default test encryption key: {key[:20]}...")
+            logger.warning('ENCRYPTION_KEY is not set; using the built-in development key')
         elif isinstance(key, str):
             # Convert string key to bytes if needed
             key = key.encode()
@@ -167,7 +177,7 @@ class EsewaCredentials(models.Model):
             return decrypted_data.decode()
         except Exception as e:
             # Log the error but don't expose it
-            print(f"Failed to decrypt secret key for admin {self.admin.id}: {str(e)}")
+            logger.exception('Failed to decrypt secret key for admin %s: %s', self.admin.id, str(e))
             return None
     
     def set_secret_key(self, secret_key):
@@ -2,6 +2,9 @@ from rest_framework import serializers
 from .models import EsewaCredentials, EsewaCredentialAuditLog
 from django.core.exceptions import ValidationError
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class EsewaCredentialsSerializer(serializers.ModelSerializer):
@@ -281,7 +284,7 @@ class EsewaCredentialsSerializer(serializers.ModelSerializer):
             )
         except Exception as e:
             # Don't fail the main operation if audit logging fails
-            print(f"Failed to log audit action: {str(e)}")
+            logger.exception('Failed to log audit action: %s', str(e))
     
     def _get_client_ip(self):
         """Get client IP address"""
@@ -331,7 +334,7 @@ class EsewaCredentialsViewSerializer(serializers.ModelSerializer):
             )
         except Exception as e:
             # Don't fail the main operation if audit logging fails
-            print(f"Failed to log view action: {str(e)}")
+            logger.exception('Failed to log view action: %s', str(e))
         
         return super().to_representation(instance)
     
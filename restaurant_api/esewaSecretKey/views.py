@@ -23,6 +23,9 @@ from .serializers import (
     EsewaCredentialAuditLogSerializer
 )
 from UserRole.models import CustomUser
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def validate_esewa_credentials(product_code, secret_key, environment='production'):
@@ -229,11 +232,7 @@ def initiate_credential_view(request):
         EsewaOTP.objects.create(user=user, otp_code=otp)
         
         # Debug logging
-        print(f"Debug OTP Storage:")
-        print(f"  User ID: {user.id}")
-        print(f"  OTP: {otp}")
-        print(f"  Session ID: {request.session.session_key}")
-        print(f"  Session Data: {dict(request.session)}")
+        logger.debug('Stored credential OTP for user %s in session %s', user.id, request.session.session_key)
         
         # Send OTP via email
         try:
@@ -290,10 +289,10 @@ def initiate_credential_view(request):
                 fail_silently=False,
             )
             
-            print(f"OTP email sent successfully to {user.email}: {otp}")
+            logger.info('OTP email sent to %s', user.email)
             
         except Exception as e:
-            print(f"Failed to send OTP email to {user.email}: {str(e)}")
+            logger.exception('Failed to send OTP email to %s: %s', user.email, str(e))
             # Fallback: return OTP in response for development
             return Response({
                 'message': 'OTP sent successfully.',
@@ -316,7 +315,7 @@ def initiate_credential_view(request):
                 }
             )
         except Exception as e:
-            print(f"Failed to log audit action: {str(e)}")
+            logger.exception('Failed to log audit action: %s', str(e))
         
         return Response({
             'message': 'OTP sent successfully.',
@@ -324,9 +323,7 @@ def initiate_credential_view(request):
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
-        print(f"Error in initiate_credential_view: {str(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception('Error in initiate_credential_view: %s', str(e))
         return Response({
             'error': 'Internal server error',
             'details': str(e)
@@ -367,19 +364,14 @@ def verify_otp_and_view_credentials(request):
         otp_user_id = request.session.get('esewa_otp_user_id')
         
         # Debug logging
-        print(f"Debug OTP Validation:")
-        print(f"  User ID: {user.id}")
-        print(f"  Stored OTP: {stored_otp}")
-        print(f"  OTP Created: {otp_created}")
-        print(f"  OTP User ID: {otp_user_id}")
-        print(f"  Provided OTP: {otp}")
-        print(f"  Session ID: {request.session.session_key}")
-        print(f"  All Session Data: {dict(request.session)}")
-        print(f"  Session Modified: {request.session.modified}")
+        logger.debug(
+            'Validating credential OTP for user %s (session %s, OTP stored: %s, created: %s, for user: %s)',
+            user.id, request.session.session_key, bool(stored_otp), otp_created, otp_user_id,
+        )
         
         # If session OTP is not found, try database OTP as fallback
         if not stored_otp:
-            print("  Session OTP not found, trying database OTP...")
+            logger.debug('Session OTP not found, trying database OTP...')
             try:
                 db_otp = EsewaOTP.objects.filter(
                     user=user, 
@@ -391,22 +383,22 @@ def verify_otp_and_view_credentials(request):
                     stored_otp = db_otp.otp_code
                     otp_created = db_otp.created_at.isoformat()
                     otp_user_id = user.id
-                    print(f"  Database OTP found: {stored_otp}")
+                    logger.debug('Database OTP found for user %s', user.id)
                 else:
-                    print("  Database OTP expired")
+                    logger.info('Database OTP expired for user %s', user.id)
                     db_otp.delete()
             except EsewaOTP.DoesNotExist:
-                print("  No database OTP found")
+                logger.debug('No database OTP found')
         
         # Validate OTP
         if not stored_otp:
-            print("  Error: No stored OTP found")
+            logger.info('No stored OTP found for user %s', user.id)
             return Response({
                 'error': 'No OTP found. Please request a new one.'
             }, status=status.HTTP_401_UNAUTHORIZED)
         
         if otp_user_id != user.id:
-            print(f"  Error: User ID mismatch - stored: {otp_user_id}, current: {user.id}")
+            logger.warning('Error: User ID mismatch - stored: %s, current: %s', otp_user_id, user.id)
             return Response({
                 'error': 'Invalid OTP session. Please request a new one.'
             }, status=status.HTTP_401_UNAUTHORIZED)
@@ -468,16 +460,10 @@ def verify_otp_and_view_credentials(request):
             request.session.modified = True
             request.session.save()
         except Exception as e:
-            print(f"Session storage failed: {e}")
+            logger.exception('Session storage failed: %s', e)
         
         # Debug logging
-        print(f"Debug: OTP verification completed:")
-        print(f"  Session ID: {request.session.session_key}")
-        print(f"  User ID: {user.id}")
-        print(f"  OTP verified: {request.session.get('otp_verified', False)}")
-        print(f"  All session keys: {list(request.session.keys())}")
-        print(f"  Session modified: {request.session.modified}")
-        print(f"  Database verification record created: {verification_record.id}")
+        logger.info('Credential OTP verified for user %s (verification record %s)', user.id, verification_record.id)
         
         # Return success message without exposing the verification token
         return Response({
@@ -487,9 +473,7 @@ def verify_otp_and_view_credentials(request):
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
-        print(f"Error in verify_otp_and_view_credentials: {str(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception('Error in verify_otp_and_view_credentials: %s', str(e))
         return Response({
             'error': 'Internal server error',
             'details': str(e)
@@ -563,13 +547,10 @@ def get_secure_credentials_display(request):
         timestamp = request.session.get('temp_credentials_timestamp')
         
         # Debug logging
-        print(f"Debug: Session data in secure display:")
-        print(f"  Session ID: {request.session.session_key}")
-        print(f"  temp_credentials_verified: {verified}")
-        print(f"  temp_credentials_user_id: {user_id}")
-        print(f"  temp_credentials_timestamp: {timestamp}")
-        print(f"  Current user ID: {user.id}")
-        print(f"  All session keys: {list(request.session.keys())}")
+        logger.debug(
+            'Secure display for user %s: verified=%s, verified user=%s, verified at=%s',
+            user.id, verified, user_id, timestamp,
+        )
         
         if not verified or user_id != user.id:
             return Response({
@@ -612,7 +593,7 @@ def get_secure_credentials_display(request):
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
-        print(f"Error in get_secure_credentials_display: {str(e)}")
+        logger.exception('Error in get_secure_credentials_display: %s', str(e))
         return Response({
             'error': 'Internal server error'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -678,7 +659,7 @@ def display_credentials_with_token(request):
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
-        print(f"Error in display_credentials_with_token: {str(e)}")
+        logger.exception('Error in display_credentials_with_token: %s', str(e))
         return Response({
             'error': 'Internal server error'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -707,16 +688,14 @@ def display_credentials_securely(request):
         session_token = request.session.get('verification_token')
         
         # Debug logging
-        print(f"Debug: OTP verification check:")
-        print(f"  User ID: {user.id}")
-        print(f"  Session OTP verified: {otp_verified}")
-        print(f"  Session OTP user ID: {otp_user_id}")
-        print(f"  Session OTP timestamp: {otp_timestamp}")
-        print(f"  Session token: {session_token}")
+        logger.debug(
+            'OTP verification check for user %s: verified=%s, verified user=%s, verified at=%s',
+            user.id, otp_verified, otp_user_id, otp_timestamp,
+        )
         
         # If session verification fails, try database verification
         if not otp_verified or otp_user_id != user.id:
-            print("  Session verification failed, trying database verification...")
+            logger.debug('Session verification failed, trying database verification...')
             try:
                 from .models import EsewaVerificationToken
                 db_verification = EsewaVerificationToken.objects.get(
@@ -725,7 +704,7 @@ def display_credentials_securely(request):
                     expires_at__gt=timezone.now()
                 )
                 
-                print(f"  Database verification found: {db_verification.token}")
+                logger.debug('Database verification found for user %s', user.id)
                 otp_verified = True
                 otp_user_id = user.id
                 otp_timestamp = db_verification.created_at.isoformat()
@@ -734,7 +713,7 @@ def display_credentials_securely(request):
                 db_verification.mark_as_used()
                 
             except EsewaVerificationToken.DoesNotExist:
-                print("  No database verification found")
+                logger.debug('No database verification found')
                 return Response({
                     'error': 'OTP verification not found. Please verify OTP again.'
                 }, status=status.HTTP_401_UNAUTHORIZED)
@@ -876,7 +855,7 @@ def display_credentials_securely(request):
         return HttpResponse(template.render(context), content_type='text/html')
         
     except Exception as e:
-        print(f"Error in display_credentials_securely: {str(e)}")
+        logger.exception('Error in display_credentials_securely: %s', str(e))
         return Response({
             'error': 'Internal server error'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -939,7 +918,7 @@ def public_esewa_status(request):
     Returns has_secret_key: true if the table's admin has valid active credentials.
     """
     from .models import EsewaCredentials
-    from qrgenerator.models import Table
+    from qrgenerator.table_resolver import table_resolver
     
     try:
         # Get tableUid or tableId from query parameters
@@ -950,30 +929,23 @@ def public_esewa_status(request):
             return Response({'has_secret_key': False, 'error': 'Missing tableUid or tableId parameter'}, status=400)
         
         # Find the table
-        table = None
         if table_uid:
-            try:
-                table = Table.objects.get(public_id=table_uid)
-            except Table.DoesNotExist:
-                return Response({'has_secret_key': False, 'error': 'Table not found'}, status=404)
-        elif table_id:
-            try:
-                table = Table.objects.get(id=table_id)
-            except Table.DoesNotExist:
-                return Response({'has_secret_key': False, 'error': 'Table not found'}, status=404)
+            table = table_resolver.resolve(uid=table_uid)
+        else:
+            table = table_resolver.resolve(pk=table_id)
         
         if not table:
             return Response({'has_secret_key': False, 'error': 'Table not found'}, status=404)
         
         # Get the admin who owns this table
-        table_admin = table.admin
-        if not table_admin:
+        table_admin_id = table.admin_id
+        if not table_admin_id:
             return Response({'has_secret_key': False, 'error': 'Table has no admin assigned'}, status=404)
         
         # Check if this admin has active eSewa credentials
         try:
             credentials = EsewaCredentials.objects.get(
-                admin=table_admin,
+                admin_id=table_admin_id,
                 is_active=True,
                 esewa_product_code__isnull=False,
                 esewa_secret_key_encrypted__isnull=False
@@ -983,7 +955,7 @@ def public_esewa_status(request):
                 return Response({
                     'has_secret_key': True, 
                     'environment': credentials.environment,
-                    'admin_id': table_admin.id
+                    'admin_id': table_admin_id
                 })
             else:
                 return Response({'has_secret_key': False, 'environment': None})
@@ -3,6 +3,9 @@ from .models import MenuItem, Category, Discount, ExtraCharge
 
 # Import our custom admin site
 from UserRole.admin import restaurant_admin_site
+import logging
+
+logger = logging.getLogger(__name__)
 
 class MenuItemAdmin(admin.ModelAdmin):
     list_display = ('name', 'price', 'category', 'available')
@@ -76,4 +79,4 @@ try:
 except admin.sites.AlreadyRegistered:
     pass
 
-print("Successfully registered menu models with both admin sites")
\ No newline at end of file
+logger.debug('Successfully registered menu models with both admin sites')
\ No newline at end of file
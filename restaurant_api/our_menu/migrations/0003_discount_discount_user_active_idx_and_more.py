@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 01:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('our_menu', '0002_category_user_alter_category_name_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='discount',
+            index=models.Index(fields=['user', 'active', 'start_date', 'end_date'], name='discount_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['user', 'available'], name='menuitem_user_available_idx'),
+        ),
+    ]
@@ -26,6 +26,11 @@ class Discount(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'active', 'start_date', 'end_date'], name='discount_user_active_idx'),
+        ]
+
     def __str__(self):
         return f"Discount {self.discount_percentage}%"
 
@@ -48,6 +53,9 @@ class MenuItem(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['user', 'available'], name='menuitem_user_available_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -25,6 +25,10 @@ class MenuItemSerializer(serializers.ModelSerializer):
         return data
 
     def get_discount_percentage(self, obj):
+        # Callers that already worked out the discounts ({item id: percentage}) pass them in context
+        item_discounts = self.context.get('item_discounts')
+        if item_discounts is not None:
+            return item_discounts.get(obj.id, 0)
         # Calculate applicable discount percentage here
         today = timezone.now().date()
         # Find applicable discounts for this item
@@ -13,6 +13,9 @@ from django.shortcuts import render
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, AllowAny
+import logging
+
+logger = logging.getLogger(__name__)
 
 def root_view(request):
     return JsonResponse({"message": "Welcome to the Restaurant API"})
@@ -179,7 +182,7 @@ class ExtraChargeViewSet(viewsets.ModelViewSet):
         # Only allow admin to create
         if hasattr(user, 'is_employee') and user.is_employee:
             raise PermissionDenied("Employees cannot add extra charges.")
-        print(f"[DEBUG] Creating ExtraCharge as user: {user} (email: {getattr(user, 'email', None)})")
+        logger.debug('Creating ExtraCharge as user: %s (email: %s)', user, getattr(user, 'email', None))
         serializer.save(user=user)
 
 
@@ -192,12 +195,10 @@ class ExtraChargesByUserView(APIView):
     permission_classes = []
     
     def get(self, request, user_id):
-        # Log user_id for debugging
-        print(f"Fetching extra charges for user_id: {user_id}")
+        logger.debug('Fetching extra charges for user_id: %s', user_id)
         
         # Retrieve extra charges for the specific user
         extra_charges = ExtraCharge.objects.filter(user_id=user_id, active=True)
-        print(f"Found {extra_charges.count()} active extra charges")
         
         serializer = ExtraChargeSerializer(extra_charges, many=True)
         return Response(serializer.data)
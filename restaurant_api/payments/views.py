@@ -2,61 +2,174 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from qrgenerator.models import Order, Table
+from qrgenerator.archive import archived_orders, merge_newest_first, order_values
+from qrgenerator.models import Order
 from EsewaIntegration.models import EsewaTransaction
-from django.db.models import Q
+from django.db.models import Q, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+import base64
+import itertools
+
+from restaurant_api.db_router import replica_reads
+
+LEDGER_MAX_PAGE_SIZE = 500
+
+
+def payment_ledger_queryset(admin_user):
+    """
+    Build the payments ledger for an admin as a single query.
+
+    Each paid/pending order appears once: as an eSewa payment if it has a
+    completed eSewa transaction, otherwise as a cash/manual payment when the
+    order itself is marked paid. Rows are ordered newest first by the time
+    the payment was recorded.
+    """
+    completed_esewa = EsewaTransaction.objects.filter(
+        order=OuterRef('pk'), status='COMPLETED'
+    ).order_by('pk')
+    return Order.objects.filter(
+        payment_status__in=['paid', 'pending'],
+        tenant=admin_user,
+    ).annotate(
+        esewa_txn_id=Subquery(completed_esewa.values('pk')[:1]),
+        esewa_amount=Subquery(completed_esewa.values('amount')[:1]),
+        esewa_created_at=Subquery(completed_esewa.values('created_at')[:1]),
+    ).filter(
+        Q(esewa_txn_id__isnull=False) | Q(payment_status='paid')
+    ).annotate(
+        paid_at=Coalesce(F('esewa_created_at'), F('created_at')),
+    ).order_by('-paid_at', '-id')
+
+
+def _encode_ledger_cursor(row):
+    raw = f"{row['paid_at'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_ledger_cursor(cursor):
+    """(paid_at, order id) from a cursor made by _encode_ledger_cursor, or None if it is not one."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii')
+        paid_at, order_id = raw.split('|', 1)
+        paid_at = parse_datetime(paid_at)
+    except (ValueError, UnicodeError, OverflowError):
+        return None
+    if paid_at is None or timezone.is_naive(paid_at):
+        return None
+    # Order ids are short alphanumeric strings (see qrgenerator.views.generate_unique_order_id)
+    if not order_id.isalnum() or len(order_id) > Order._meta.pk.max_length:
+        return None
+    return paid_at, order_id
+
+
+def archived_ledger_queryset(admin_user, start_date=None, end_date=None):
+    """
+    Ledger rows for archived orders in a date range, or None without one.
+
+    Archived orders are all paid and never linked to an eSewa transaction
+    (see qrgenerator.archive), so each is a cash/manual payment recorded when
+    the order was created.
+    """
+    archived = archived_orders(admin_user, start_date, end_date)
+    if archived is None:
+        return None
+    return archived.annotate(paid_at=F('created_at')).order_by('-paid_at', '-order_id')
+
+
+def ledger_entry(row):
+    if row.get('esewa_txn_id') is not None:
+        return {
+            'id': f"ESEWA-{row['esewa_txn_id']}",
+            'order': {
+                'id': row['id'],
+                'table': row['table__name'] or 'N/A',
+                'items': row['items'] or [],
+            },
+            'amount': float(row['esewa_amount']),
+            'status': 'paid',
+            'payment_method': 'esewa',
+            'created_at': row['paid_at'],
+        }
+    return {
+        'id': f"ORDER-{row['id']}",
+        'order': {
+            'id': row['id'],
+            'table': row['table__name'] or 'N/A',
+            'items': row['items'] or [],
+        },
+        'amount': float(row['total']),
+        'status': 'paid',
+        'payment_method': row['payment_method'] or 'cash',
+        'created_at': row['paid_at'],
+    }
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def list_payments(request):
+    """
+    List eSewa and cash payments for the admin's tables.
+
+    Optional query params:
+    - start_date / end_date (YYYY-MM-DD): filter on the payment date; a range
+      also lists archived orders paid in it
+    - limit: page size; when given (or when a cursor is given) the response is
+      {'results': [...], 'next_cursor': ...} instead of a plain list
+    - cursor: opaque keyset cursor returned as next_cursor by the previous page
+    """
     try:
         user = request.user
         admin_user = user.created_by if hasattr(user, 'is_employee') and user.is_employee else user
-        admin_tables = Table.objects.filter(user=admin_user)
-        orders = Order.objects.filter(
-            Q(payment_status='paid') | Q(payment_status='pending'),
-            table__in=admin_tables
-        ).select_related('table').order_by('-created_at')
-
-        payments = []
-        
-        for order in orders:
-            # Only show completed eSewa transactions
-            esewa_txn = EsewaTransaction.objects.filter(order=order, status='COMPLETED').first()
-            if esewa_txn:
-                # Check if we already added this order via another transaction
-                if not any(payment['order']['id'] == order.id for payment in payments):
-                    payments.append({
-                        'id': f'ESEWA-{esewa_txn.id}',
-                        'order': {
-                            'id': order.id,
-                            'table': order.table.name if order.table else 'N/A',
-                            'items': order.items if hasattr(order, 'items') else [],
-                        },
-                        'amount': float(esewa_txn.amount),
-                        'status': 'paid',
-                        'payment_method': 'esewa',
-                        'created_at': esewa_txn.created_at,
-                    })
-            elif order.payment_status == 'paid':
-                # Check if we already added this order via eSewa transaction
-                if not any(payment['order']['id'] == order.id for payment in payments):
-                    payments.append({
-                        'id': f'ORDER-{order.id}',
-                        'order': {
-                            'id': order.id,
-                            'table': order.table.name if order.table else 'N/A',
-                            'items': order.items if hasattr(order, 'items') else [],
-                        },
-                        'amount': float(order.total),
-                        'status': 'paid',
-                        'payment_method': order.payment_method or 'cash',
-                        'created_at': order.created_at,
-                    })
-            # Optionally, add pending/unpaid orders if you want
-
-        payments.sort(key=lambda x: x['created_at'], reverse=True)
-        return Response(payments)
+        ledger = payment_ledger_queryset(admin_user)
+
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        if start_date:
+            ledger = ledger.filter(paid_at__date__gte=start_date)
+        if end_date:
+            ledger = ledger.filter(paid_at__date__lte=end_date)
+
+        rows = ledger.values(
+            'id', 'items', 'total', 'payment_method', 'table__name',
+            'esewa_txn_id', 'esewa_amount', 'paid_at',
+        )
+        # A date range also covers archived orders
+        archived = archived_ledger_queryset(admin_user, start_date, end_date)
+        if archived is not None:
+            archived = order_values(archived, 'id', 'items', 'total', 'payment_method', 'table__name', 'paid_at')
+
+        limit = request.query_params.get('limit')
+        cursor = request.query_params.get('cursor')
+        if not limit and not cursor:
+            if archived is not None:
+                rows = merge_newest_first([rows, archived], 'paid_at', 'id')
+            return Response([ledger_entry(row) for row in rows])
+
+        try:
+            limit = min(max(int(limit or 50), 1), LEDGER_MAX_PAGE_SIZE)
+        except (TypeError, ValueError):
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if cursor:
+            position = _decode_ledger_cursor(cursor)
+            if position is None:
+                return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+            paid_at, order_id = position
+            rows = rows.filter(Q(paid_at__lt=paid_at) | Q(paid_at=paid_at, id__lt=order_id))
+            if archived is not None:
+                archived = archived.filter(Q(paid_at__lt=paid_at) | Q(paid_at=paid_at, order_id__lt=order_id))
+
+        if archived is not None:
+            page = list(itertools.islice(merge_newest_first([rows[:limit + 1], archived[:limit + 1]], 'paid_at', 'id'), limit + 1))
+        else:
+            page = list(rows[:limit + 1])
+        next_cursor = _encode_ledger_cursor(page[limit - 1]) if len(page) > limit else None
+        return Response({
+            'results': [ledger_entry(row) for row in page[:limit]],
+            'next_cursor': next_cursor,
+        })
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -68,16 +181,14 @@ def toggle_payment_status(request, payment_id):
         # Get admin user (either the user themselves or their admin if they're an employee)
         admin_user = user.created_by if hasattr(user, 'is_employee') and user.is_employee else user
 
-        # Get all tables owned by this admin
-        admin_tables = Table.objects.filter(user=admin_user)
-
         # Check if it's an eSewa transaction
         if payment_id.startswith('ESEWA-'):
             transaction_id = payment_id.replace('ESEWA-', '')
             try:
                 transaction = EsewaTransaction.objects.get(
                     id=transaction_id,
-                    order__table__in=admin_tables
+                    tenant=admin_user,
+                    order__isnull=False
                 )
                 order = transaction.order
             except EsewaTransaction.DoesNotExist:
@@ -91,7 +202,7 @@ def toggle_payment_status(request, payment_id):
             try:
                 order = Order.objects.get(
                     id=order_id,
-                    table__in=admin_tables
+                    tenant=admin_user
                 )
             except Order.DoesNotExist:
                 return Response(
@@ -100,8 +211,7 @@ def toggle_payment_status(request, payment_id):
                 )
 
         # Toggle payment status
-        order.payment_status = 'unpaid' if order.payment_status == 'paid' else 'paid'
-        order.save()
+        order.toggle_payment_status()
 
         return Response({
             'status': 'success',
@@ -120,16 +230,15 @@ def toggle_payment_status(request, payment_id):
 def delete_payment(request, payment_id):
     user = request.user
     admin_user = user.created_by if hasattr(user, 'is_employee') and user.is_employee else user
-    admin_tables = Table.objects.filter(user=admin_user)
     try:
         if payment_id.startswith('ESEWA-'):
             transaction_id = payment_id.replace('ESEWA-', '')
-            transaction = EsewaTransaction.objects.get(id=transaction_id, order__table__in=admin_tables)
+            transaction = EsewaTransaction.objects.get(id=transaction_id, tenant=admin_user, order__isnull=False)
             transaction.delete()
             return Response({'status': 'success', 'message': 'Esewa payment deleted.'})
         elif payment_id.startswith('ORDER-'):
             order_id = payment_id.replace('ORDER-', '')
-            order = Order.objects.get(id=order_id, table__in=admin_tables)
+            order = Order.objects.get(id=order_id, tenant=admin_user)
             order.delete()
             return Response({'status': 'success', 'message': 'Order payment deleted.'})
         else:
@@ -144,12 +253,11 @@ def delete_payment(request, payment_id):
 def delete_all_payments(request):
     user = request.user
     admin_user = user.created_by if hasattr(user, 'is_employee') and user.is_employee else user
-    admin_tables = Table.objects.filter(user=admin_user)
     try:
         # Delete all EsewaTransactions for this admin
-        EsewaTransaction.objects.filter(order__table__in=admin_tables).delete()
+        EsewaTransaction.objects.filter(tenant=admin_user, order__isnull=False).delete()
         # Delete all Orders for this admin
-        Order.objects.filter(table__in=admin_tables).delete()
+        Order.objects.filter(tenant=admin_user).delete()
         return Response({'status': 'success', 'message': 'All payments deleted.'})
     except Exception as e:
         return Response({'status': 'error', 'message': str(e)}, status=500)
\ No newline at end of file
@@ -9,6 +9,9 @@ from UserRole.admin import restaurant_admin_site
 
 # Register your models here
 from .models import Order
+import logging
+
+logger = logging.getLogger(__name__)
 
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'table', 'user', 'total', 'status', 'payment_status', 'created_at')
@@ -92,7 +95,7 @@ try:
 except admin.sites.AlreadyRegistered:
     pass
 
-print("Successfully registered qrgenerator models with restaurant admin site")
+logger.debug('Successfully registered qrgenerator models with restaurant admin site')
 
 # Removed DiscountAdmin registration to avoid AlreadyRegistered error
 
@@ -5,6 +5,5 @@ class QrgeneratorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'qrgenerator'
 
-
-def ready(self):
-    import qrgenerator.signals
+    def ready(self):
+        import qrgenerator.signals
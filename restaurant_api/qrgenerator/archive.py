@@ -0,0 +1,93 @@
+"""
+Old orders moved out of the live Order table.
+
+archive_orders() (run by `manage.py archive_orders`) moves completed, paid
+orders older than a cutoff into OrderArchive a batch at a time, so the order
+list, the dashboard and the payments ledger only scan recent orders. Those
+reads include archived orders only when the request asks for a date range;
+archived_orders() returns the archived side of such a range.
+
+Orders that a review or an eSewa transaction points at stay live: both
+cascade from Order, and the review and payment pages look them up by order.
+"""
+import heapq
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+
+from EsewaIntegration.models import EsewaTransaction
+from PaynmentANDreview.models import Review
+
+from .models import Order, OrderArchive
+
+ARCHIVE_BATCH_SIZE = 500
+
+# Order columns copied to OrderArchive; the order's id goes to order_id
+ARCHIVED_FIELDS = (
+    'user_id', 'tenant_id', 'table_id', 'items', 'status', 'total', 'special_instructions', 'customer_name',
+    'payment_status', 'payment_method', 'dining_option', 'created_at', 'updated_at', 'extra_charges_applied',
+    'transaction_uuid',
+)
+
+
+def archivable_orders(cutoff):
+    """Completed, paid orders created before `cutoff` that nothing else points at."""
+    return Order.objects.filter(
+        status='completed', payment_status='paid', created_at__lt=cutoff,
+    ).exclude(
+        Exists(Review.objects.filter(order=OuterRef('pk')))
+    ).exclude(
+        Exists(EsewaTransaction.objects.filter(order=OuterRef('pk')))
+    )
+
+
+def archive_orders(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move archivable orders created before `cutoff` to OrderArchive.
+
+    Each batch of `batch_size` orders is copied and deleted in one
+    transaction, oldest first. Returns the number of orders moved.
+    """
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                archivable_orders(cutoff).order_by('created_at', 'pk').select_for_update()
+                .only('pk', *ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not batch:
+                return moved
+            OrderArchive.objects.bulk_create([
+                OrderArchive(order_id=order.pk, **{field: getattr(order, field) for field in ARCHIVED_FIELDS})
+                for order in batch
+            ])
+            Order.objects.filter(pk__in=[order.pk for order in batch]).delete()
+        moved += len(batch)
+
+
+def archived_orders(tenant, start_date=None, end_date=None):
+    """
+    The tenant's archived orders between two dates (inclusive, YYYY-MM-DD),
+    or None if neither is given: without a date range reads stay on Order.
+    """
+    if not start_date and not end_date:
+        return None
+    archived = OrderArchive.objects.filter(tenant=tenant)
+    if start_date:
+        archived = archived.filter(created_at__date__gte=start_date)
+    if end_date:
+        archived = archived.filter(created_at__date__lte=end_date)
+    return archived
+
+
+def order_values(queryset, *fields):
+    """queryset.values(*fields) for an Order or OrderArchive queryset, with the order's id as 'id'."""
+    if queryset.model is OrderArchive:
+        return queryset.values(*(field for field in fields if field != 'id'), id=F('order_id'))
+    return queryset.values(*fields)
+
+
+def merge_newest_first(row_lists, *keys):
+    """Rows from several lists, each already sorted by `keys` (default created_at) descending, merged the same way."""
+    return heapq.merge(*row_lists, key=itemgetter(*(keys or ('created_at',))), reverse=True)
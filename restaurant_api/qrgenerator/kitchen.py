@@ -0,0 +1,125 @@
+"""
+Compact, incremental order feed for kitchen display screens.
+
+Each restaurant has a version counter in the cache that is bumped, together
+with the ids of the orders that changed, whenever an order is saved, updated
+or deleted. A screen polls with the last version it saw: if nothing changed
+the answer comes from the cache alone, otherwise it gets only the orders that
+changed (or a full snapshot if it has fallen too far behind). The counter
+and the change log must be shared by all worker processes, so production
+runs on the Redis cache (REDIS_URL); settings refuse to start without it.
+"""
+from django.core.cache import cache
+
+from our_menu.models import MenuItem
+from .models import Order
+from .order_items import readable_items
+
+ACTIVE_STATUSES = ['pending', 'in-progress']
+CHANGES_TTL = 600
+CATEGORY_MAP_TTL = 300
+# Past this many missed versions a full snapshot is cheaper than replaying changes
+MAX_INCREMENTAL_VERSIONS = 200
+
+
+def _version_key(tenant_id):
+    return f'kitchen:version:{tenant_id}'
+
+
+def _changes_key(tenant_id, version):
+    return f'kitchen:changes:{tenant_id}:{version}'
+
+
+def _category_map_key(tenant_id):
+    return f'kitchen:categories:{tenant_id}'
+
+
+def current_version(tenant_id):
+    return cache.get(_version_key(tenant_id)) or 0
+
+
+def record_changes(tenant_id, order_ids):
+    """Bump the restaurant's feed version and remember which orders it covers."""
+    if not tenant_id or not order_ids:
+        return
+    cache.add(_version_key(tenant_id), 0, timeout=None)
+    version = cache.incr(_version_key(tenant_id))
+    cache.set(_changes_key(tenant_id, version), [str(order_id) for order_id in order_ids], CHANGES_TTL)
+
+
+def category_map(tenant_id):
+    """Menu item id (as stored in order items) -> category id, cached per restaurant."""
+    mapping = cache.get(_category_map_key(tenant_id))
+    if mapping is None:
+        mapping = {
+            str(item_id): category_id
+            for item_id, category_id in MenuItem.objects.filter(user_id=tenant_id).values_list('id', 'category_id')
+        }
+        cache.set(_category_map_key(tenant_id), mapping, CATEGORY_MAP_TTL)
+    return mapping
+
+
+def forget_category_map(tenant_id):
+    cache.delete(_category_map_key(tenant_id))
+
+
+def _compact_order(row, categories, stations):
+    items = []
+    for item in readable_items(row['items']):
+        category = categories.get(str(item['id']))
+        if stations and category not in stations:
+            continue
+        items.append({'name': item['name'], 'quantity': item['quantity'], 'category': category})
+    if stations and not items:
+        return None
+    return {
+        'id': row['id'],
+        'table': row['table__name'],
+        'status': row['status'],
+        'dining_option': row['dining_option'],
+        'customer_name': row['customer_name'],
+        'special_instructions': row['special_instructions'],
+        'created_at': row['created_at'],
+        'items': items,
+    }
+
+
+def _active_orders(tenant_id, order_ids=None):
+    queryset = Order.objects.filter(tenant_id=tenant_id, status__in=ACTIVE_STATUSES)
+    if order_ids is not None:
+        queryset = queryset.filter(pk__in=order_ids)
+    return queryset.order_by('created_at').values(
+        'id', 'table__name', 'status', 'dining_option', 'customer_name', 'special_instructions', 'created_at', 'items',
+    )
+
+
+def build_feed(tenant_id, since=None, stations=None):
+    """
+    The feed for a restaurant since a version the client already has.
+
+    Returns {'version', 'full', 'orders', 'removed'}: `orders` are active
+    orders to add or replace on screen, `removed` are ids to take off it.
+    `stations` optionally limits items to a set of menu category ids.
+    """
+    version = current_version(tenant_id)
+    if since is not None and since == version:
+        return {'version': version, 'full': False, 'orders': [], 'removed': []}
+
+    changed = None
+    if since is not None and 0 <= since < version and version - since <= MAX_INCREMENTAL_VERSIONS:
+        keys = [_changes_key(tenant_id, v) for v in range(since + 1, version + 1)]
+        found = cache.get_many(keys)
+        if len(found) == len(keys):
+            changed = {order_id for ids in found.values() for order_id in ids}
+
+    categories = category_map(tenant_id)
+    orders = []
+    for row in _active_orders(tenant_id, changed):
+        compact = _compact_order(row, categories, stations)
+        if compact is not None:
+            orders.append(compact)
+
+    if changed is None:
+        return {'version': version, 'full': True, 'orders': orders, 'removed': []}
+    shown = {order['id'] for order in orders}
+    return {'version': version, 'full': False, 'orders': orders, 'removed': sorted(changed - shown)}
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from qrgenerator.archive import ARCHIVE_BATCH_SIZE, archivable_orders, archive_orders
+
+
+class Command(BaseCommand):
+    help = 'Move completed, paid orders older than --older-than days into the order archive in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, required=True, help='Archive orders created more than X days ago')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Orders moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Count the orders that would be archived without moving them')
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 1:
+            raise CommandError('--older-than must be at least 1 day')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+
+        if options['dry_run']:
+            count = archivable_orders(cutoff).count()
+            self.stdout.write(self.style.WARNING(f'DRY RUN - Would archive {count} orders created before {cutoff:%Y-%m-%d %H:%M}'))
+            return
+
+        moved = archive_orders(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} orders created before {cutoff:%Y-%m-%d %H:%M}'))
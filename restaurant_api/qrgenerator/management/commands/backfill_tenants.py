@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from qrgenerator.models import Table, Order, WaiterCall
+from EsewaIntegration.models import EsewaTransaction
+from PaynmentANDreview.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Populate the denormalized tenant column on orders, waiter calls, reviews and eSewa transactions in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per UPDATE statement')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        table_owner = Subquery(Table.objects.filter(pk=OuterRef('table_id')).values('user_id')[:1])
+        order_tenant = Subquery(Order.objects.filter(pk=OuterRef('order_id')).values('tenant_id')[:1])
+
+        # Orders first: reviews and eSewa transactions copy their tenant from the order
+        steps = [
+            ('orders', Order.objects.filter(tenant__isnull=True, table__user__isnull=False), table_owner),
+            ('waiter calls', WaiterCall.objects.filter(tenant__isnull=True, table__user__isnull=False), table_owner),
+            ('reviews', Review.objects.filter(tenant__isnull=True, order__tenant__isnull=False), order_tenant),
+            ('eSewa transactions', EsewaTransaction.objects.filter(tenant__isnull=True, order__tenant__isnull=False), order_tenant),
+        ]
+        for label, pending, tenant_expression in steps:
+            total = 0
+            while True:
+                ids = list(pending.order_by('pk').values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                with transaction.atomic():
+                    total += pending.model.objects.filter(pk__in=ids).update(tenant=tenant_expression)
+            self.stdout.write(self.style.SUCCESS(f'Backfilled tenant on {total} {label}'))
+
+        # Temporary-order transactions have no order yet; resolve them from the stored table_id
+        resolved = 0
+        for txn in EsewaTransaction.objects.filter(tenant__isnull=True, order__isnull=True).iterator(chunk_size=batch_size):
+            tenant_id = txn._resolve_tenant_id()
+            if tenant_id:
+                EsewaTransaction.objects.filter(pk=txn.pk).update(tenant_id=tenant_id)
+                resolved += 1
+        self.stdout.write(self.style.SUCCESS(f'Backfilled tenant on {resolved} temporary eSewa transactions'))
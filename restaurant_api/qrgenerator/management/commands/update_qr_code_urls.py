@@ -2,13 +2,13 @@ from django.core.management.base import BaseCommand
 from qrgenerator.models import Table
 
 class Command(BaseCommand):
-    help = 'Update qr_code_url for all existing tables to use table name'
+    help = 'Update qr_code_url for all existing tables to their public_id menu URL'
 
     def handle(self, *args, **options):
         tables = Table.objects.all()
         updated_count = 0
         for table in tables:
-            correct_url = f"https://qr-menu-code.netlify.app/menu?tableId={table.name}"  # Use table.name for tableId
+            correct_url = Table.menu_url_for(table.public_id)
             if table.qr_code_url != correct_url:
                 table.qr_code_url = correct_url
                 table.save(update_fields=['qr_code_url'])
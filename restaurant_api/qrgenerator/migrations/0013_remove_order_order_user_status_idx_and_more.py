@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-19 01:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qrgenerator', '0012_order_order_user_status_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_user_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_user_payment_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_user_active_idx',
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='tenant',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tenant_orders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='waitercall',
+            name='tenant',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tenant_waiter_calls', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['tenant', 'status'], name='order_tenant_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['tenant', 'payment_status'], name='order_tenant_payment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['tenant', '-created_at'], name='order_tenant_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'in-progress'])), fields=['tenant', '-created_at'], name='order_tenant_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waitercall',
+            index=models.Index(fields=['tenant', 'status'], name='waitercall_tenant_status_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 01:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qrgenerator', '0013_remove_order_order_user_status_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='table',
+            index=models.Index(fields=['name'], name='table_name_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 01:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def resolve_duplicate_active_calls(apps, schema_editor):
+    # Keep the newest active call per table so the unique constraint can be added
+    WaiterCall = apps.get_model('qrgenerator', 'WaiterCall')
+    seen = set()
+    stale = []
+    for call_id, table_id in WaiterCall.objects.filter(status='active').order_by('table_id', '-created_at', '-id').values_list('id', 'table_id'):
+        if table_id in seen:
+            stale.append(call_id)
+        seen.add(table_id)
+    WaiterCall.objects.filter(id__in=stale).update(status='resolved')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qrgenerator', '0014_table_name_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicate_active_calls, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='waitercall',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'active')), fields=('table',), name='waitercall_one_active_per_table'),
+        ),
+    ]
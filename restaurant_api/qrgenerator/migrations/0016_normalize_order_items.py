@@ -0,0 +1,54 @@
+import json
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def _normalize(items):
+    """
+    Frozen copy of qrgenerator.order_items.normalize_items, except that keys
+    it doesn't know are kept and that it returns None, leaving the order as
+    it is, if any item can't be read: history is only ever tidied, never lost.
+    """
+    if not isinstance(items, list):
+        return None
+    normalized = []
+    for item in items:
+        if not isinstance(item, dict):
+            return None
+        name = item.get('name', 'Unknown Item')
+        try:
+            price = float(item.get('price', 0))
+            quantity = int(item.get('quantity', 1))
+        except (ValueError, TypeError):
+            return None
+        normalized.append({**item, 'id': item.get('id', str(name)), 'name': name, 'price': price, 'quantity': quantity})
+    return normalized
+
+
+def normalize_order_items(apps, schema_editor):
+    Order = apps.get_model('qrgenerator', 'Order')
+    changed = []
+    for order in Order.objects.only('id', 'items').iterator(chunk_size=BATCH_SIZE):
+        items = _normalize(order.items)
+        # Compared as JSON: == can't tell a price of 10 from 10.0, or see key order
+        if items is not None and json.dumps(items) != json.dumps(order.items):
+            order.items = items
+            changed.append(order)
+        if len(changed) >= BATCH_SIZE:
+            Order.objects.bulk_update(changed, ['items'])
+            changed = []
+    Order.objects.bulk_update(changed, ['items'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qrgenerator', '0015_waitercall_one_active_per_table'),
+    ]
+
+    operations = [
+        # Only numbers are coerced and missing keys filled in; nothing to undo
+        migrations.RunPython(normalize_order_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-19 03:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qrgenerator', '0016_normalize_order_items'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderArchive',
+            fields=[
+                ('archive_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('order_id', models.CharField(max_length=10)),
+                ('items', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in-progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('special_instructions', models.TextField(blank=True, null=True)),
+                ('customer_name', models.CharField(blank=True, max_length=10000, null=True)),
+                ('payment_status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid')], max_length=2000)),
+                ('payment_method', models.CharField(blank=True, choices=[('cash', 'Cash'), ('card', 'Card'), ('esewa', 'eSewa'), ('khalti', 'Khalti'), ('fonepay', 'FonePay')], max_length=2000, null=True)),
+                ('dining_option', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('extra_charges_applied', models.JSONField(blank=True, default=list)),
+                ('transaction_uuid', models.CharField(blank=True, max_length=500, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('table', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to='qrgenerator.table')),
+                ('tenant', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tenant_archived_orders', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['tenant', '-created_at'], name='order_archive_tenant_idx'), models.Index(fields=['order_id'], name='order_archive_order_id_idx')],
+            },
+        ),
+    ]
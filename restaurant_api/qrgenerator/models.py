@@ -1,11 +1,15 @@
 from django.db import models
-from django.db.models import JSONField
+from django.db.models import JSONField, Q
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.dispatch import Signal
 import uuid
 
 User = get_user_model()
 
+# Sent once per batched order mutation with order_ids, fields and tenant_id kwargs.
+orders_updated = Signal()
+
 class Table(models.Model):
     id = models.AutoField(primary_key=True)  # Ensure id is unique and auto-incremented
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tables', null=True, blank=True)
@@ -22,10 +26,18 @@ class Table(models.Model):
     class Meta:
         unique_together = ('user', 'name')
         ordering = ['name']
+        indexes = [
+            # Older QR codes and the waiter-call widget still look tables up by name
+            models.Index(fields=['name'], name='table_name_idx'),
+        ]
+
+    @staticmethod
+    def menu_url_for(public_id):
+        return f"https://qr-menu-code.netlify.app/menu?tableUid={public_id}"
 
     def save(self, *args, **kwargs):
         # Dynamically generate the QR code URL based on the table public_id
-        self.qr_code_url = f"https://qr-menu-code.netlify.app/menu?tableUid={self.public_id}"
+        self.qr_code_url = self.menu_url_for(self.public_id)
         # If admin is not set and user is an employee, set admin to user's admin
         if not self.admin and self.user and self.user.is_employee and self.user.created_by:
             self.admin = self.user.created_by
@@ -58,6 +70,8 @@ class Order(models.Model):
 
     id = models.CharField(max_length=10, primary_key=True)  # Format: ORD-XXX
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders', null=True, blank=True)
+    # Owner of the order's table, copied at write time so tenant filters don't join through Table
+    tenant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tenant_orders', null=True, blank=True, editable=False)
     table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='orders')
     items = models.JSONField()  # Stores list of items with their quantities
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -75,8 +89,100 @@ class Order(models.Model):
     def __str__(self):
         return f"Order {self.id} - Table {self.table.name}"
 
+    def save(self, *args, **kwargs):
+        if self.tenant_id is None and self.table_id is not None:
+            self.tenant_id = self.table.user_id
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tenant', 'status'], name='order_tenant_status_idx'),
+            models.Index(fields=['tenant', 'payment_status'], name='order_tenant_payment_idx'),
+            models.Index(fields=['tenant', '-created_at'], name='order_tenant_created_idx'),
+            models.Index(fields=['table', '-created_at'], name='order_table_created_idx'),
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            models.Index(
+                fields=['tenant', '-created_at'], name='order_tenant_active_idx',
+                condition=Q(status__in=['pending', 'in-progress']),
+            ),
+        ]
+
+    def _transition(self, **values):
+        """
+        Write only the given columns (plus updated_at) with a conditional UPDATE.
+
+        The row is updated only if at least one column differs from the target
+        value in the database, so items/extra_charges_applied are never rewritten.
+        Returns True if a transition happened.
+        """
+        now = timezone.now()
+        updated = Order.objects.filter(pk=self.pk).exclude(**values).update(updated_at=now, **values)
+        if not updated:
+            return False
+        for field, value in values.items():
+            setattr(self, field, value)
+        self.updated_at = now
+        orders_updated.send(sender=Order, order_ids=[self.pk], fields=sorted(values), tenant_id=self.tenant_id)
+        return True
+
+    def set_status(self, status):
+        return self._transition(status=status)
+
+    def set_payment(self, payment_status, payment_method=None):
+        values = {'payment_status': payment_status}
+        if payment_method:
+            values['payment_method'] = payment_method
+        return self._transition(**values)
+
+    def mark_paid(self, payment_method=None):
+        return self.set_payment('paid', payment_method)
+
+    def toggle_payment_status(self):
+        """Flip between paid and unpaid; returns the new payment status."""
+        self.set_payment('unpaid' if self.payment_status == 'paid' else 'paid')
+        return self.payment_status
+
+    def link_transaction(self, transaction_uuid):
+        return self._transition(transaction_uuid=transaction_uuid)
+
+
+class OrderArchive(models.Model):
+    """
+    A completed, paid order moved out of Order by `manage.py archive_orders`.
+
+    Same columns as Order. Order ids are only unique among live orders, so
+    the archived order's id is kept in order_id rather than as the primary key.
+    """
+    archive_id = models.BigAutoField(primary_key=True)
+    order_id = models.CharField(max_length=10)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_orders', null=True, blank=True)
+    tenant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tenant_archived_orders', null=True, blank=True, editable=False)
+    # Archived orders outlive the tables they were placed at
+    table = models.ForeignKey(Table, on_delete=models.SET_NULL, related_name='archived_orders', null=True, blank=True)
+    items = models.JSONField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    total = models.DecimalField(max_digits=16, decimal_places=2)
+    special_instructions = models.TextField(blank=True, null=True)
+    customer_name = models.CharField(max_length=10000, blank=True, null=True)
+    payment_status = models.CharField(max_length=2000, choices=Order.PAYMENT_STATUS_CHOICES)
+    payment_method = models.CharField(max_length=2000, choices=Order.PAYMENT_METHOD_CHOICES, blank=True, null=True)
+    dining_option = models.CharField(max_length=20)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    extra_charges_applied = models.JSONField(default=list, blank=True)
+    transaction_uuid = models.CharField(max_length=500, blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tenant', '-created_at'], name='order_archive_tenant_idx'),
+            models.Index(fields=['order_id'], name='order_archive_order_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived order {self.order_id}"
 
 
 class MenuItem(models.Model):
@@ -101,7 +207,24 @@ class MenuItem(models.Model):
 class WaiterCall(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     table = models.ForeignKey(Table, on_delete=models.CASCADE)
+    # Owner of the table, copied at write time (see Order.tenant)
+    tenant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tenant_waiter_calls', null=True, blank=True, editable=False)
     status = models.CharField(max_length=20, default='active')
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['table', 'status'], name='waitercall_table_status_idx'),
+            models.Index(fields=['tenant', 'status'], name='waitercall_tenant_status_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['table'], condition=Q(status='active'), name='waitercall_one_active_per_table'),
+        ]
+
     def __str__(self):
         return f"Waiter call for {self.table} at {self.created_at}"
+
+    def save(self, *args, **kwargs):
+        if self.tenant_id is None and self.table_id is not None:
+            self.tenant_id = self.table.user_id
+        super().save(*args, **kwargs)
@@ -0,0 +1,142 @@
+"""
+The canonical shape of Order.items, and pricing new orders from the menu.
+
+Every write path stores items through normalize_items(), so the list and
+dashboard responses can send them exactly as stored instead of rebuilding
+each item on every read. Orders migration 0016 couldn't read keep their
+items as they were; code that reads an item's fields goes through
+readable_items(), which leaves those out. New orders go through price_items() as well: the
+client says which menu items and how many, and the name and price come from
+the restaurant's menu and its active discounts.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models
+from django.utils import timezone
+
+from our_menu.models import Discount, ExtraCharge, MenuItem
+
+CENT = Decimal('0.01')
+
+
+class OrderItemError(ValueError):
+    """An order item that can't be priced from the restaurant's menu."""
+
+
+def normalize_items(items):
+    """
+    `items` as stored on an order: a list of {'id', 'name', 'price', 'quantity'}
+    dicts with a float price and an int quantity. Entries that aren't dicts
+    are dropped; a price or quantity that isn't a number raises ValueError or
+    TypeError.
+    """
+    normalized = []
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        name = item.get('name', 'Unknown Item')
+        normalized.append({
+            'id': item.get('id', str(name)),
+            'name': name,
+            'price': float(item.get('price', 0)),
+            'quantity': int(item.get('quantity', 1)),
+        })
+    return normalized
+
+
+def readable_items(items):
+    """The entries of a stored `items` value that have the canonical shape; anything else is skipped."""
+    if not isinstance(items, list):
+        return []
+    return [
+        item for item in items
+        if isinstance(item, dict) and isinstance(item.get('name'), str)
+        and isinstance(item.get('quantity'), int) and 'id' in item
+    ]
+
+
+def active_discounts(tenant_id):
+    """The restaurant's discounts that apply today, with the ids of the items each is limited to."""
+    today = timezone.now().date()
+    return Discount.objects.filter(
+        user_id=tenant_id,
+        active=True
+    ).filter(
+        (models.Q(start_date__isnull=True) | models.Q(start_date__lte=today)),
+        (models.Q(end_date__isnull=True) | models.Q(end_date__gte=today))
+    ).prefetch_related(models.Prefetch('applicable_items', queryset=MenuItem.objects.only('id')))
+
+
+def best_discounts(discounts, item_ids):
+    """{item id: highest discount percentage} over `item_ids`, for discounts from active_discounts()."""
+    item_discounts = {}
+    for discount in discounts:
+        # Discounts without applicable items apply to all items
+        applicable = [item.id for item in discount.applicable_items.all()] or item_ids
+        for item_id in applicable:
+            if item_id not in item_discounts or discount.discount_percentage > item_discounts[item_id]:
+                item_discounts[item_id] = discount.discount_percentage
+    return item_discounts
+
+
+def discounted_price(price, percentage):
+    """A menu price after a percentage discount, rounded to the cent."""
+    return (price * (100 - Decimal(str(percentage))) / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _menu_item_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def price_items(items, tenant_id):
+    """
+    Client-submitted items priced from the restaurant's menu.
+
+    Only each item's id and quantity are taken from the client. Returns the
+    canonical items and their subtotal (a Decimal); raises OrderItemError
+    for an item that isn't on the menu, isn't available or has a bad
+    quantity.
+    """
+    requested = []
+    for item in items or []:
+        if not isinstance(item, dict):
+            raise OrderItemError('Each item must be an object')
+        menu_item_id = _menu_item_id(item.get('id'))
+        if menu_item_id is None:
+            raise OrderItemError(f"Unknown menu item: {item.get('id')!r}")
+        try:
+            quantity = int(item.get('quantity', 1))
+        except (TypeError, ValueError):
+            quantity = 0
+        if quantity <= 0:
+            raise OrderItemError(f'Item {menu_item_id} must have a positive quantity')
+        requested.append((menu_item_id, quantity))
+
+    menu = MenuItem.objects.filter(user_id=tenant_id).in_bulk({menu_item_id for menu_item_id, _ in requested})
+    for menu_item_id, _ in requested:
+        menu_item = menu.get(menu_item_id)
+        if menu_item is None:
+            raise OrderItemError(f'Unknown menu item: {menu_item_id}')
+        if not menu_item.available:
+            raise OrderItemError(f'{menu_item.name} is not available')
+    discounts = best_discounts(active_discounts(tenant_id), list(menu))
+
+    priced = []
+    subtotal = Decimal('0')
+    for menu_item_id, quantity in requested:
+        menu_item = menu[menu_item_id]
+        price = discounted_price(menu_item.price, discounts.get(menu_item_id, 0))
+        subtotal += price * quantity
+        priced.append({'id': str(menu_item_id), 'name': menu_item.name, 'price': float(price), 'quantity': quantity})
+    return priced, subtotal
+
+
+def active_extra_charges(tenant_id):
+    """The restaurant's active extra charges, in the form stored on Order.extra_charges_applied."""
+    return [
+        {'label': label, 'amount': float(amount)}
+        for label, amount in ExtraCharge.objects.filter(user_id=tenant_id, active=True).values_list('label', 'amount')
+    ]
@@ -0,0 +1,213 @@
+"""
+QR code image rendering for tables.
+
+Images are content-addressed: the file name is a hash of the encoded URL and
+the render options, stored under the table's public_id. A table is only
+rendered again when the URL it encodes changes, renames never orphan files, and
+tables with the same name in different restaurants can't collide.
+"""
+import functools
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.db import transaction
+
+from .models import Table
+
+logger = logging.getLogger(__name__)
+
+QR_CODE_DIR = 'qr_codes'
+DEFAULT_ERROR_CORRECTION = 'M'
+DEFAULT_BOX_SIZE = 10
+MAX_BOX_SIZE = 40
+IMAGE_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+ERROR_CORRECTION_LEVELS = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H,
+}
+
+# Each entry is one rendered image; SVGs are a few KB, large PNGs a few tens of KB
+MEMORY_CACHE_SIZE = 256
+
+# Below this many images a process pool costs more to start than it saves
+PARALLEL_RENDER_THRESHOLD = 8
+
+# A4 at 150 dpi, three columns by four rows of codes per page
+SHEET_PAGE_SIZE = (1240, 1754)
+SHEET_DPI = 150
+SHEET_COLUMNS = 3
+SHEET_ROWS = 4
+
+# One worker is enough: renders are small and only happen when a table's URL changes
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='qr-render')
+
+
+def qr_digest(payload, image_format='png', error_correction=DEFAULT_ERROR_CORRECTION, box_size=DEFAULT_BOX_SIZE):
+    key = f'{payload}|{image_format}|{error_correction}|{box_size}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:20]
+
+
+def qr_image_name(public_id, digest, image_format='png'):
+    return os.path.join(QR_CODE_DIR, str(public_id), f'{digest}.{image_format}')
+
+
+def qr_image_path(public_id, digest, image_format='png'):
+    return os.path.join(settings.MEDIA_ROOT, qr_image_name(public_id, digest, image_format))
+
+
+def render_qr_image(payload, image_format='png', error_correction=DEFAULT_ERROR_CORRECTION, box_size=DEFAULT_BOX_SIZE):
+    qr = qrcode.QRCode(error_correction=ERROR_CORRECTION_LEVELS[error_correction], box_size=box_size)
+    qr.add_data(payload)
+    buffer = BytesIO()
+    if image_format == 'svg':
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _render_job(job):
+    # Module level so ProcessPoolExecutor can pickle it
+    return render_qr_image(*job)
+
+
+def render_many(payloads, image_format='png', error_correction=DEFAULT_ERROR_CORRECTION, box_size=DEFAULT_BOX_SIZE):
+    """Render a batch of QR codes, in a process pool when the batch is large enough; results keep input order."""
+    jobs = [(payload, image_format, error_correction, box_size) for payload in payloads]
+    if len(jobs) < PARALLEL_RENDER_THRESHOLD:
+        return [_render_job(job) for job in jobs]
+    workers = min(os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def store_atomically(path, data):
+    """Write data to path via a temp file in the same directory, so readers never see a partial image."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def ensure_qr_image(public_id, payload, image_format='png', error_correction=DEFAULT_ERROR_CORRECTION, box_size=DEFAULT_BOX_SIZE):
+    """Render and store the image unless it already exists; returns (path, digest)."""
+    digest = qr_digest(payload, image_format, error_correction, box_size)
+    path = qr_image_path(public_id, digest, image_format)
+    if not os.path.exists(path):
+        store_atomically(path, render_qr_image(payload, image_format, error_correction, box_size))
+    return path, digest
+
+
+def store_enabled():
+    return getattr(settings, 'QR_CODE_STORE_IMAGES', True)
+
+
+@functools.lru_cache(maxsize=MEMORY_CACHE_SIZE)
+def cached_qr_image(public_id, image_format='png', box_size=DEFAULT_BOX_SIZE, error_correction=DEFAULT_ERROR_CORRECTION):
+    """
+    Render a table's QR code straight into memory; returns (data, digest).
+
+    The encoded URL is derived from public_id alone, so (public_id, format,
+    size, ecc) fully determines the image and entries never go stale.
+    """
+    payload = Table.menu_url_for(public_id)
+    data = render_qr_image(payload, image_format, error_correction, box_size)
+    return data, qr_digest(payload, image_format, error_correction, box_size)
+
+
+def _render_in_background(public_id, payload):
+    try:
+        ensure_qr_image(public_id, payload)
+    except Exception:
+        logger.exception('QR render failed for table %s', public_id)
+
+
+def schedule_render(table):
+    """Queue a render for the table after the current transaction commits, if its image is missing."""
+    payload = table.qr_code_url
+    if not payload or not store_enabled():
+        return
+    if os.path.exists(qr_image_path(table.public_id, qr_digest(payload))):
+        return
+    public_id = table.public_id
+    transaction.on_commit(lambda: _executor.submit(_render_in_background, public_id, payload))
+
+
+def delete_qr_images(public_id):
+    shutil.rmtree(os.path.join(settings.MEDIA_ROOT, QR_CODE_DIR, str(public_id)), ignore_errors=True)
+
+
+class _ChunkBuffer:
+    """Write-only file object that collects what zipfile writes so it can be streamed out."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def stream_zip(files):
+    """Yield a ZIP archive of (name, data) pairs chunk by chunk, without building it in memory first."""
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def build_sheet_pdf(entries):
+    """Lay out (label, png_bytes) pairs on printable A4 pages and return the PDF bytes."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    page_width, page_height = SHEET_PAGE_SIZE
+    cell_width = page_width // SHEET_COLUMNS
+    cell_height = page_height // SHEET_ROWS
+    label_height = 60
+    code_size = min(cell_width, cell_height - label_height) - 40
+    font = ImageFont.load_default(size=32)
+    per_page = SHEET_COLUMNS * SHEET_ROWS
+
+    pages = []
+    for start in range(0, len(entries), per_page):
+        page = Image.new('RGB', SHEET_PAGE_SIZE, 'white')
+        draw = ImageDraw.Draw(page)
+        for index, (label, png) in enumerate(entries[start:start + per_page]):
+            left = (index % SHEET_COLUMNS) * cell_width
+            top = (index // SHEET_COLUMNS) * cell_height
+            code = Image.open(BytesIO(png)).convert('RGB').resize((code_size, code_size), Image.NEAREST)
+            page.paste(code, (left + (cell_width - code_size) // 2, top + 20))
+            draw.text((left + cell_width // 2, top + 20 + code_size + label_height // 2), label, fill='black', font=font, anchor='mm')
+        pages.append(page)
+
+    buffer = BytesIO()
+    if pages:
+        pages[0].save(buffer, format='PDF', save_all=True, append_images=pages[1:], resolution=SHEET_DPI)
+    return buffer.getvalue()
@@ -0,0 +1,32 @@
+import json
+
+from django.http import HttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from restaurant_api.renderers import dumps
+
+
+def json_response(data, status=200):
+    """The response a DRF Response(data) would render to, for plain (async) Django views."""
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+class ImageRenderer(BaseRenderer):
+    """Pass image bytes through; error payloads (dicts) are sent as JSON."""
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data).encode('utf-8')
+
+
+class PNGRenderer(ImageRenderer):
+    media_type = 'image/png'
+    format = 'png'
+
+
+class SVGRenderer(ImageRenderer):
+    media_type = 'image/svg+xml'
+    format = 'svg'
@@ -1,31 +1,19 @@
+from decimal import Decimal
+
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Table, Order, WaiterCall
+from .order_items import OrderItemError, active_extra_charges, normalize_items, price_items
 from our_menu.models import MenuItem, Discount
+import logging
+
+logger = logging.getLogger(__name__)
 
 class TableSerializer(serializers.ModelSerializer):
     class Meta:
         model = Table
         fields = ['id', 'name', 'qr_code_url', 'section', 'size', 'active', 'created_at', 'updated_at', 'public_id']
 
-class OrderItemSerializer(serializers.Serializer):
-    id = serializers.CharField(required=False, allow_blank=True, default='')  # Make id optional with default
-    name = serializers.CharField(required=False, allow_blank=True, default='Unknown Item')
-    price = serializers.FloatField(required=False, default=0.0)
-    quantity = serializers.IntegerField(required=False, default=1)
-    
-    def validate(self, data):
-        # Ensure we have the required fields with fallbacks
-        if not data.get('name'):
-            data['name'] = 'Unknown Item'
-        if data.get('price') is None:
-            data['price'] = 0.0
-        if data.get('quantity') is None:
-            data['quantity'] = 1
-        # Make id optional - if not provided, we'll use a default value
-        if not data.get('id'):
-            data['id'] = str(data.get('name', 'Unknown Item'))
-        return data
-
 class OrderSerializer(serializers.ModelSerializer):
     items = serializers.JSONField(required=False, allow_null=True)  # Make items writable and allow null
     table_name = serializers.CharField(source='table.name', read_only=True)
@@ -77,62 +65,83 @@ class OrderSerializer(serializers.ModelSerializer):
             except (ValueError, TypeError):
                 raise serializers.ValidationError(f"Item {i} must have a valid quantity")
         
-        return items
+        return normalize_items(items)
 
     def validate_total(self, total):
         if total <= 0:
             raise serializers.ValidationError("Total must be greater than zero")
         return total
 
+    def validate(self, attrs):
+        # A new order is priced from the table's menu: the client's item prices, extra charges and total are ignored.
+        # A restored order (OrderViewSet.restore) keeps what was stored for it.
+        if self.instance is None and attrs.get('table') is not None and not self.context.get('restore'):
+            tenant_id = attrs['table'].user_id
+            try:
+                attrs['items'], subtotal = price_items(attrs.get('items'), tenant_id)
+            except OrderItemError as e:
+                raise serializers.ValidationError({'items': str(e)})
+            attrs['extra_charges_applied'] = active_extra_charges(tenant_id)
+            attrs['total'] = subtotal + sum(Decimal(str(charge['amount'])) for charge in attrs['extra_charges_applied'])
+        return attrs
+
     def to_representation(self, instance):
-        """Custom representation to ensure items are properly formatted"""
-        try:
-            data = super().to_representation(instance)
-            
-            # Ensure items are properly formatted when reading
-            if 'items' in data and data['items'] is not None:
-                try:
-                    processed_items = []
-                    for item in data['items']:
-                        if isinstance(item, dict):
-                            processed_item = {
-                                'id': item.get('id', str(item.get('name', 'Unknown Item'))),
-                                'name': item.get('name', 'Unknown Item'),
-                                'price': float(item.get('price', 0)),
-                                'quantity': int(item.get('quantity', 1))
-                            }
-                            processed_items.append(processed_item)
-                        else:
-                            continue
-                    data['items'] = processed_items
-                except Exception as e:
-                    print(f"Error processing items for order {instance.id}: {str(e)}")
-                    data['items'] = []
-            else:
-                data['items'] = []
-            
-            return data
-        except Exception as e:
-            print(f"Error in to_representation for order {instance.id}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            # Return a basic representation if there's an error
-            return {
-                'id': instance.id,
-                'table_name': getattr(instance.table, 'name', 'Unknown Table') if instance.table else 'Unknown Table',
-                'items': [],
-                'status': instance.status,
-                'total': str(instance.total),
-                'payment_status': instance.payment_status,
-                'payment_method': instance.payment_method,
-                'created_at': instance.created_at.isoformat() if instance.created_at else None,
-                'updated_at': instance.updated_at.isoformat() if instance.updated_at else None,
-                'dining_option': instance.dining_option,
-                'transaction_uuid': instance.transaction_uuid,
-                'special_instructions': instance.special_instructions,
-                'customer_name': instance.customer_name,
-                'extra_charges_applied': instance.extra_charges_applied or []
-            }
+        data = super().to_representation(instance)
+        # Items are normalized when they are written (see order_items.py); orders
+        # migration 0016 couldn't read are sent as stored
+        data['items'] = data['items'] or []
+        return data
+
+
+# What order_representation() reads, as values() lookups
+ORDER_READ_FIELDS = (
+    'id', 'table_id', 'table__name', 'items', 'status', 'total', 'extra_charges_applied',
+    'special_instructions', 'customer_name', 'payment_status', 'payment_method',
+    'created_at', 'updated_at', 'dining_option', 'transaction_uuid',
+)
+
+
+def _timestamp(value, tz):
+    # DRF's DateTimeField output (ISO 8601, UTC as "Z") without looking up the time zone per value
+    if value is None:
+        return None
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def order_representation(row, tz=None):
+    """
+    OrderSerializer's output for an order fetched with values(*ORDER_READ_FIELDS).
+
+    The read-only fast path for order lists: no model instances and no field
+    machinery. Pass `tz` (the current time zone) when formatting many rows.
+    """
+    if tz is None:
+        tz = timezone.get_current_timezone()
+    return {
+        'id': row['id'],
+        'table': row['table_id'],
+        'table_name': row['table__name'],
+        'items': row['items'] or [],
+        'status': row['status'],
+        # The column has two decimal places, so this is DecimalField's string without the quantize
+        'total': '{:f}'.format(row['total']),
+        'extra_charges_applied': row['extra_charges_applied'],
+        'special_instructions': row['special_instructions'],
+        'customer_name': row['customer_name'],
+        'payment_status': row['payment_status'],
+        'payment_method': row['payment_method'],
+        'created_at': _timestamp(row['created_at'], tz),
+        'updated_at': _timestamp(row['updated_at'], tz),
+        'dining_option': row['dining_option'],
+        'transaction_uuid': row['transaction_uuid'],
+    }
+
+
+def serialize_orders(queryset):
+    """OrderSerializer(queryset, many=True).data, through order_representation()."""
+    tz = timezone.get_current_timezone()
+    return [order_representation(row, tz) for row in queryset.values(*ORDER_READ_FIELDS)]
 
 class MenuItemSerializer(serializers.ModelSerializer):
     discount_percentage = serializers.SerializerMethodField()
@@ -1,22 +1,41 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Table
-import qrcode
-import os
-from io import BytesIO
-from django.conf import settings
+from our_menu.models import MenuItem
+from .models import Table, Order, orders_updated
+from . import kitchen, qr_rendering
+from .table_resolver import table_resolver
+
 
 @receiver(post_save, sender=Table)
-def generate_qr_code_image(sender, instance, created, **kwargs):
-    # Generate the QR code URL dynamically
-            qr_data = f"https://qr-menu-code.netlify.app/menu?tableId={instance.name}"
-    qr = qrcode.make(qr_data)
-    buffer = BytesIO()
-    qr.save(buffer, format='PNG')
-
-    filename = f"qr_codes/table_{instance.name}.png"
-    filepath = os.path.join(settings.MEDIA_ROOT, filename)
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-
-    with open(filepath, 'wb') as f:
-        f.write(buffer.getvalue())
+def generate_qr_code_image(sender, instance, update_fields=None, **kwargs):
+    table_resolver.invalidate(instance)
+    # Saves that don't touch the encoded URL can't change the image
+    if update_fields is not None and 'qr_code_url' not in update_fields:
+        return
+    qr_rendering.schedule_render(instance)
+
+
+@receiver(post_delete, sender=Table)
+def delete_qr_code_images(sender, instance, **kwargs):
+    table_resolver.invalidate(instance)
+    qr_rendering.delete_qr_images(instance.public_id)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def record_kitchen_change(sender, instance, **kwargs):
+    tenant_id, order_id = instance.tenant_id, instance.pk
+    transaction.on_commit(lambda: kitchen.record_changes(tenant_id, [order_id]))
+
+
+@receiver(orders_updated)
+def record_kitchen_bulk_change(sender, order_ids, tenant_id=None, **kwargs):
+    if tenant_id is not None:
+        transaction.on_commit(lambda: kitchen.record_changes(tenant_id, order_ids))
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def forget_kitchen_categories(sender, instance, **kwargs):
+    kitchen.forget_category_map(instance.user_id)
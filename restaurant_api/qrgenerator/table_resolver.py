@@ -0,0 +1,123 @@
+"""
+Process-local lookup of the table identifiers customers send us.
+
+QR scans, orders, waiter calls and payments all arrive with a table's public_id
+(older printed codes carry the table name or id instead). The result of each
+lookup is cached for a short TTL, misses included, so a scan costs a dict
+lookup instead of a query. Table post_save/post_delete signals (and
+TableViewSet.bulk_import, whose bulk_create sends none) drop the affected
+entries in this process; the TTL bounds how stale other worker
+processes can be.
+"""
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from .models import Table
+
+# admin_id is the table's owner, the same user stored as tenant on orders and calls
+ResolvedTable = namedtuple('ResolvedTable', ['table_id', 'admin_id', 'active'])
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 10000
+
+_MISSING = object()
+
+
+class TableResolver:
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, uid=None, name=None, pk=None):
+        """
+        Return the ResolvedTable for the first identifier that matches, trying
+        uid, then name, then pk, or None. A uid that isn't a UUID is treated
+        as a name, which is what older QR codes put there.
+        """
+        for key in self._candidates(uid, name, pk):
+            resolved = self._cached(key)
+            if resolved is _MISSING:
+                resolved = self._store(key, self._query(key).first())
+            if resolved:
+                return resolved
+        return None
+
+    async def aresolve(self, uid=None, name=None, pk=None):
+        """resolve() for async views: same cache, async ORM on a miss."""
+        for key in self._candidates(uid, name, pk):
+            resolved = self._cached(key)
+            if resolved is _MISSING:
+                resolved = self._store(key, await self._query(key).afirst())
+            if resolved:
+                return resolved
+        return None
+
+    def invalidate(self, *tables):
+        """Forget everything that resolved to these tables, their current names, and all cached misses."""
+        table_ids = {table.pk for table in tables}
+        names = {('name', table.name) for table in tables}
+        with self._lock:
+            stale = [
+                key for key, (_, resolved) in self._entries.items()
+                if resolved is None or resolved.table_id in table_ids or key in names
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _candidates(uid, name, pk):
+        """(field, value) keys to try, in order."""
+        if uid:
+            try:
+                public_id = uuid.UUID(str(uid))
+            except ValueError:
+                yield ('name', str(uid))
+            else:
+                yield ('public_id', public_id)
+        if name:
+            yield ('name', str(name))
+        if pk:
+            try:
+                pk = int(pk)
+            except (TypeError, ValueError):
+                return
+            yield ('pk', pk)
+
+    def _cached(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return _MISSING
+
+    @staticmethod
+    def _query(key):
+        field, value = key
+        # Names aren't unique across restaurants; take the oldest table like the old .first() lookups
+        return Table.objects.filter(**{field: value}).order_by('pk').values_list('pk', 'user_id', 'active')
+
+    def _store(self, key, row):
+        now = time.monotonic()
+        resolved = ResolvedTable(*row) if row else None
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict(now)
+            self._entries[key] = (now + self.ttl, resolved)
+        return resolved
+
+    def _evict(self, now):
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+
+
+table_resolver = TableResolver()
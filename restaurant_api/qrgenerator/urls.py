@@ -1,6 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TableViewSet, OrderViewSet, menu_redirect_view, CreateOrderFromMenuView, DiscountViewSet, WaiterCallViewSet, customer_menu_view
+from .views import (
+    TableViewSet, OrderViewSet, menu_redirect_view, CreateOrderFromMenuView, DiscountViewSet, WaiterCallViewSet,
+    customer_menu_view, KitchenFeedView, waiter_call_collection_view, waiter_call_active_view, waiter_call_stream_view,
+)
 
 router = DefaultRouter()
 router.register(r'tables', TableViewSet)
@@ -9,8 +12,13 @@ router.register(r'discounts', DiscountViewSet)
 router.register(r'waiter_call', WaiterCallViewSet, basename='waiter_call')
 
 urlpatterns = [
+    # Async customer-facing waiter-call endpoints; listed before the router so they take its routes
+    path('waiter_call/', waiter_call_collection_view, name='waiter_call-list'),
+    path('waiter_call/active/', waiter_call_active_view, name='waiter_call-active'),
+    path('waiter_call/stream/', waiter_call_stream_view, name='waiter_call-stream'),
     path('', include(router.urls)),
     path('redirect/<int:tableId>/', menu_redirect_view, name='menu-redirect'),  # Ensure consistent naming
     path('create-order/', CreateOrderFromMenuView.as_view(), name='create-order'),
     path('menu/customer/', customer_menu_view, name='customer-menu'),
+    path('kitchen/feed/', KitchenFeedView.as_view(), name='kitchen-feed'),
 ]
@@ -1,13 +1,34 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import redirect
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, permission_classes
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
-from .models import Table, Order, WaiterCall
+from .models import Table, Order, WaiterCall, orders_updated
+from .renderers import PNGRenderer, SVGRenderer, json_response
+from . import kitchen, qr_rendering, waiter_calls
+from .table_resolver import table_resolver
+from restaurant_api.db_router import replica_reads
+from restaurant_api.renderers import STREAM_CHUNK_SIZE, ORJSONRenderer, stream_json_list
 from our_menu.models import Discount, MenuItem, Category, ExtraCharge
-from .serializers import TableSerializer, OrderSerializer, DiscountSerializer, WaiterCallSerializer
+from .archive import archived_orders, merge_newest_first, order_values
+from .order_items import OrderItemError, active_discounts, best_discounts, price_items, readable_items
+from .serializers import (
+    ORDER_READ_FIELDS, TableSerializer, OrderSerializer, DiscountSerializer, WaiterCallSerializer, order_representation,
+    serialize_orders,
+)
 from our_menu.serializers import MenuItemSerializer, CategorySerializer
 from rest_framework.decorators import api_view
 from django.utils import timezone
+from django.utils.text import get_valid_filename
 from django.db.models import Q
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
@@ -17,12 +38,23 @@ from django.db.models import Sum, Count, F
 from django.utils import timezone
 import calendar
 import datetime
+import functools
+import itertools
 from collections import Counter
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import get_user_model
 from django_filters.rest_framework import DjangoFilterBackend
-from InventoryManagement.models import StockOut, IngredientMapping, InventoryItem
+from InventoryManagement import ledger
+from InventoryManagement.models import InventoryItem
 from decimal import Decimal
+from django.db import IntegrityError, transaction
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+BULK_ORDER_UPDATE_LIMIT = 500
+BULK_TABLE_IMPORT_LIMIT = 500
 
 
 class TableViewSet(viewsets.ModelViewSet):
@@ -53,40 +85,153 @@ class TableViewSet(viewsets.ModelViewSet):
         try:
             user = self.request.user
             # If employee, set user and admin to their admin, and created_by to employee
+            # Table.save sets qr_code_url, and the post_save signal queues the QR image render
             if hasattr(user, 'is_employee') and user.is_employee and user.created_by:
                 admin_user = user.created_by
-                table = serializer.save(user=admin_user, admin=admin_user)
+                serializer.save(user=admin_user, admin=admin_user)
             else:
-                table = serializer.save(user=user, admin=user)
-            qr_url = f"https://qr-menu-code.netlify.app/menu?tableId={table.name}"
-            table.qr_code_url = qr_url
-            table.save(update_fields=['qr_code_url'])
+                serializer.save(user=user, admin=user)
         except IntegrityError:
             return Response({'error': 'A table with this name already exists for this user.'}, status=400)
 
-    @action(detail=True, methods=['get'])
+    def _qr_image_response(self, request, digest, body):
+        """Wrap a QR image (or a callable producing one) with caching headers, or 304 if the client has it."""
+        etag = f'"{digest}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = body()
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=3600'
+        return response
+
+    @action(detail=True, methods=['get'], renderer_classes=[ORJSONRenderer, SVGRenderer, PNGRenderer])
     def qr_code_url(self, request, pk=None):
+        """
+        The table's menu URL as JSON, or the QR code itself with ?format=svg|png.
+
+        Images come from an in-memory LRU cache; optional ?size= (pixels per
+        module, default 10) and ?ecc=L|M|Q|H.
+        """
+        table = self.get_object()
+        if not table.qr_code_url:
+            # Table.save fills in the public_id based menu URL
+            table.save(update_fields=['qr_code_url'])
+        image_format = request.accepted_renderer.format
+        if image_format not in qr_rendering.IMAGE_FORMATS:
+            return Response({'qr_code_url': table.qr_code_url})
+
+        ecc = request.query_params.get('ecc', qr_rendering.DEFAULT_ERROR_CORRECTION).upper()
+        try:
+            box_size = int(request.query_params.get('size', qr_rendering.DEFAULT_BOX_SIZE))
+        except ValueError:
+            box_size = 0
+        if ecc not in qr_rendering.ERROR_CORRECTION_LEVELS:
+            return Response({'error': 'ecc must be one of L, M, Q, H'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= box_size <= qr_rendering.MAX_BOX_SIZE:
+            return Response({'error': f'size must be between 1 and {qr_rendering.MAX_BOX_SIZE}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        data, digest = qr_rendering.cached_qr_image(table.public_id, image_format, box_size, ecc)
+        return self._qr_image_response(request, digest, lambda: Response(data))
+
+    @action(detail=True, methods=['get'], renderer_classes=[ORJSONRenderer, PNGRenderer])
+    def qr_image(self, request, pk=None):
+        """Serve the table's QR code PNG, rendering it now if the background render hasn't run yet."""
         table = self.get_object()
         if not table.qr_code_url:
-            qr_url = f"https://qr-menu-code.netlify.app/menu?tableId={table.name}"  # Use table.name instead of table.id
-            table.qr_code_url = qr_url
             table.save(update_fields=['qr_code_url'])
-        return Response({'qr_code_url': table.qr_code_url})
+        if not qr_rendering.store_enabled():
+            data, digest = qr_rendering.cached_qr_image(table.public_id)
+            return self._qr_image_response(request, digest, lambda: HttpResponse(data, content_type='image/png'))
+        path, digest = qr_rendering.ensure_qr_image(table.public_id, table.qr_code_url)
+        return self._qr_image_response(request, digest, lambda: FileResponse(open(path, 'rb'), content_type='image/png'))
+
+    @action(detail=False, methods=['post'])
+    def bulk_import(self, request):
+        """
+        Create many tables at once and return their QR codes.
+
+        Body: {"tables": [{"name", "section", "size", "active"}, ...],
+               "output": "zip" | "pdf", "image_format": "png" | "svg",
+               "error_correction": "L" | "M" | "Q" | "H", "size": <pixels per module>}
+        "zip" streams one image per table; "pdf" is a printable A4 sheet (always PNG).
+        """
+        user = request.user
+        admin_user = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
+
+        output = request.data.get('output', 'zip')
+        image_format = request.data.get('image_format', 'png')
+        error_correction = str(request.data.get('error_correction', qr_rendering.DEFAULT_ERROR_CORRECTION)).upper()
+        try:
+            box_size = int(request.data.get('size', qr_rendering.DEFAULT_BOX_SIZE))
+        except (TypeError, ValueError):
+            box_size = 0
+        if output not in ('zip', 'pdf'):
+            return Response({'error': 'output must be "zip" or "pdf"'}, status=status.HTTP_400_BAD_REQUEST)
+        if image_format not in qr_rendering.IMAGE_FORMATS:
+            return Response({'error': 'image_format must be "png" or "svg"'}, status=status.HTTP_400_BAD_REQUEST)
+        if error_correction not in qr_rendering.ERROR_CORRECTION_LEVELS:
+            return Response({'error': 'error_correction must be one of L, M, Q, H'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= box_size <= qr_rendering.MAX_BOX_SIZE:
+            return Response({'error': f'size must be between 1 and {qr_rendering.MAX_BOX_SIZE}'}, status=status.HTTP_400_BAD_REQUEST)
+        if output == 'pdf':
+            image_format = 'png'
+
+        definitions = request.data.get('tables')
+        if not isinstance(definitions, list) or not definitions:
+            return Response({'error': 'tables must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(definitions) > BULK_TABLE_IMPORT_LIMIT:
+            return Response({'error': f'At most {BULK_TABLE_IMPORT_LIMIT} tables per request'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(data=definitions, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        names = [row['name'] for row in serializer.validated_data]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        duplicates += sorted(Table.objects.filter(user=admin_user, name__in=names).values_list('name', flat=True))
+        if duplicates:
+            return Response({'error': 'Table names already exist or are repeated', 'names': duplicates}, status=status.HTTP_400_BAD_REQUEST)
+
+        # bulk_create skips Table.save, so fill in what it would have set
+        tables = [Table(user=admin_user, admin=admin_user, **row) for row in serializer.validated_data]
+        for table in tables:
+            table.qr_code_url = Table.menu_url_for(table.public_id)
+        with transaction.atomic():
+            Table.objects.bulk_create(tables)
+        # bulk_create sends no post_save, so drop cached "not found" answers for these names here
+        table_resolver.invalidate(*tables)
+
+        images = qr_rendering.render_many(
+            [table.qr_code_url for table in tables], image_format, error_correction, box_size
+        )
+        # Keep the rendered files in the content-addressed store so qr_image can serve them later
+        for table, data in zip(tables, images):
+            if not qr_rendering.store_enabled():
+                break
+            digest = qr_rendering.qr_digest(table.qr_code_url, image_format, error_correction, box_size)
+            qr_rendering.store_atomically(qr_rendering.qr_image_path(table.public_id, digest, image_format), data)
+
+        if output == 'pdf':
+            response = HttpResponse(
+                qr_rendering.build_sheet_pdf([(table.name, data) for table, data in zip(tables, images)]),
+                content_type='application/pdf',
+            )
+            filename = 'table-qr-codes.pdf'
+        else:
+            files = [(get_valid_filename(f'{table.name}-{table.public_id}.{image_format}'), data) for table, data in zip(tables, images)]
+            response = StreamingHttpResponse(qr_rendering.stream_zip(files), content_type='application/zip')
+            filename = 'table-qr-codes.zip'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['X-Tables-Created'] = str(len(tables))
+        response.status_code = status.HTTP_201_CREATED
+        return response
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         public_id = request.query_params.get('public_id')
         name = request.query_params.get('name')
-        import uuid
-        if public_id:
-            try:
-                uuid_val = uuid.UUID(public_id)
-                queryset = queryset.filter(public_id=uuid_val)
-            except (ValueError, TypeError):
-                # Not a valid UUID, fallback to name lookup
-                queryset = queryset.filter(name=public_id)
-        elif name:
-            queryset = queryset.filter(name=name)
+        if public_id or name:
+            resolved = table_resolver.resolve(uid=public_id, name=name)
+            queryset = queryset.filter(pk=resolved.table_id) if resolved else queryset.none()
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -128,78 +273,117 @@ def menu_redirect_view(request):
 
 
 def generate_unique_order_id():
-    # Get count of orders for today
-    today = timezone.now().date()
-    count = Order.objects.filter(created_at__date=today).count()
+    # Get count of orders for today (range filter so the created_at index is used)
+    day_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    count = Order.objects.filter(created_at__gte=day_start, created_at__lt=day_start + datetime.timedelta(days=1)).count()
     # Create a shorter timestamp (last 4 digits of current timestamp)
     timestamp = str(int(time.time()))[-4:]
     # Combine timestamp and count to create a unique ID (max 10 chars)
     return f"ORD{timestamp}{count+1:03d}"
 
 
-class CreateOrderFromMenuView(APIView):
-    permission_classes = [AllowAny]
+class KitchenFeedView(APIView):
+    """
+    Active orders for the kitchen display, in a compact form.
+
+    ?since=<version> returns only what changed after that version (nothing,
+    without touching the database, if the version is current); omit it for a
+    full snapshot. ?category=<id>[,<id>...] limits items to one station.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        admin_user = user.created_by if getattr(user, 'is_employee', False) and user.created_by else user
+        try:
+            since = int(request.query_params['since']) if request.query_params.get('since') else None
+            categories = request.query_params.get('category')
+            stations = {int(c) for c in categories.split(',') if c.strip()} if categories else None
+        except ValueError:
+            return Response({'error': 'since and category must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(kitchen.build_feed(admin_user.pk, since=since, stations=stations))
+
+
+def _request_data(request):
+    """request.data for the plain Django async views: the JSON object or form fields posted, or None."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+@transaction.atomic
+def _create_order_with_stock_out(table, items, **fields):
+    """
+    Create the order and deduct its ingredients from inventory, together.
+
+    Sync on purpose: the async ORM can't run a transaction, so the async view
+    hands this whole unit of work to a thread with sync_to_async.
+    """
+    order = Order.objects.create(
+        id=generate_unique_order_id(),
+        table_id=table.table_id,
+        tenant_id=table.admin_id,
+        user_id=table.admin_id,  # Assign the admin user to the order
+        items=items,
+        **fields
+    )
+
+    ledger.record(ledger.order_stock_outs(order.id, items, created_by_id=table.admin_id))
+    return order
 
-    def post(self, request):
+
+@method_decorator(csrf_exempt, name='dispatch')
+class CreateOrderFromMenuView(View):
+    http_method_names = ['post', 'options']
+
+    async def post(self, request):
+        data = _request_data(request)
+        if data is None:
+            return json_response({'error': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            table_name = request.data.get('tableName')
-            table_uid = request.data.get('tableUid') or request.data.get('table_uid')
-            items = request.data.get('items', [])
-            special_instructions = request.data.get('specialInstructions', '')
-            customer_name = request.data.get('customerName', '')
-            dining_option = request.data.get('diningOption', 'dine-in')
+            table_name = data.get('tableName')
+            table_uid = data.get('tableUid') or data.get('table_uid')
+            items = data.get('items', [])
+            special_instructions = data.get('specialInstructions', '')
+            customer_name = data.get('customerName', '')
+            dining_option = data.get('diningOption', 'dine-in')
 
             if not table_name and not table_uid:
-                return Response({'error': 'Table identifier (name or UID) is required'}, status=status.HTTP_400_BAD_REQUEST)
+                return json_response({'error': 'Table identifier (name or UID) is required'}, status=status.HTTP_400_BAD_REQUEST)
 
             if not items:
-                return Response({'error': 'At least one item is required'}, status=status.HTTP_400_BAD_REQUEST)
+                return json_response({'error': 'At least one item is required'}, status=status.HTTP_400_BAD_REQUEST)
 
             # Get the table by public_id (UID) or name
-            from qrgenerator.models import Table
-            table = None
-            import logging
-            logger = logging.getLogger('django')
-            logger.info(f"Order creation: Received table_uid={table_uid}, table_name={table_name}")
-            import uuid
-            if table_uid:
-                try:
-                    uuid_val = uuid.UUID(str(table_uid))
-                    table = Table.objects.filter(public_id=uuid_val).first()
-                    logger.info(f"Order creation: Table lookup by UID found: {table}")
-                except (ValueError, TypeError):
-                    logger.info(f"Order creation: {table_uid} is not a valid UUID, trying as name")
-                    table = Table.objects.filter(name=table_uid).first()
-                    logger.info(f"Order creation: Table lookup by name (from UID) found: {table}")
-            if not table and table_name:
-                table = Table.objects.filter(name=table_name).first()
-                logger.info(f"Order creation: Table lookup by name found: {table}")
+            table = await table_resolver.aresolve(uid=table_uid, name=table_name)
             if not table:
-                logger.warning(f"Order creation error: Table not found for UID={table_uid}, name={table_name}")
-                return Response({'error': 'Table not found'}, status=status.HTTP_404_NOT_FOUND)
-
-            # Calculate total
-            total = sum(item['price'] * item['quantity'] for item in items)
+                logger.warning('Order creation error: Table not found for UID=%s, name=%s', table_uid, table_name)
+                return json_response({'error': 'Table not found'}, status=status.HTTP_404_NOT_FOUND)
 
-            # Fetch admin user for extra charges
-            admin_user = table.user
-            if hasattr(admin_user, 'is_employee') and admin_user.is_employee and admin_user.created_by:
-                admin_user = admin_user.created_by
+            # Name and price every item from the menu; the client's prices are ignored
+            try:
+                items, total = await sync_to_async(price_items)(items, table.admin_id)
+            except OrderItemError as e:
+                return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Fetch active extra charges for admin
-            extra_charges_qs = ExtraCharge.objects.filter(user=admin_user, active=True)
+            # Fetch active extra charges for the table's admin
             extra_charges_applied = [
-                {'label': ec.label, 'amount': float(ec.amount)} for ec in extra_charges_qs
+                {'label': ec.label, 'amount': float(ec.amount)}
+                async for ec in ExtraCharge.objects.filter(user_id=table.admin_id, active=True)
             ]
-            extra_total = sum(ec['amount'] for ec in extra_charges_applied)
+            extra_total = sum(Decimal(str(ec['amount'])) for ec in extra_charges_applied)
             total_with_extra = total + extra_total
 
-            payment_method = request.data.get('payment_method', 'cash')  # Default to cash if not provided
+            payment_method = data.get('payment_method', 'cash')  # Default to cash if not provided
 
             # Create the order, storing extra charges breakdown
-            order = Order.objects.create(
-                table=table,
-                items=items,
+            order = await sync_to_async(_create_order_with_stock_out)(
+                table,
+                items,
                 total=total_with_extra,
                 special_instructions=special_instructions,
                 customer_name=customer_name,
@@ -207,37 +391,17 @@ class CreateOrderFromMenuView(APIView):
                 payment_status='pending',
                 payment_method=payment_method,
                 dining_option=dining_option,
-                user=table.user,  # Assign the admin user to the order
                 extra_charges_applied=extra_charges_applied
             )
 
-            # --- STOCK OUT LOGIC ---
-            for item in items:
-                menu_item_id = item.get('id')
-                quantity = Decimal(item.get('quantity', 1))
-                if not menu_item_id:
-                    continue
-                # Get all ingredient mappings for this menu item
-                ingredient_mappings = IngredientMapping.objects.filter(dish_id=menu_item_id)
-                for mapping in ingredient_mappings:
-                    total_ingredient_qty = mapping.quantity * quantity
-                    StockOut.objects.create(
-                        item=mapping.ingredient,
-                        quantity=total_ingredient_qty,
-                        date=timezone.now().date(),
-                        reason='used',
-                        dish=mapping.dish,
-                        remarks=f"Auto-deducted for order {order.id}",
-                        created_by=table.user
-                    )
-            # --- END STOCK OUT LOGIC ---
-
-            return Response({
+            # OrderSerializer reads table.name; load it here rather than lazily from async code
+            order.table = await Table.objects.aget(pk=table.table_id)
+            return json_response({
                 'message': 'Order created successfully',
                 'order': OrderSerializer(order).data
             }, status=status.HTTP_201_CREATED)
         except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -256,73 +420,47 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        print(f"[OrderViewSet] user: {user} id: {getattr(user, 'id', None)} is_employee: {getattr(user, 'is_employee', None)} created_by: {getattr(user, 'created_by', None)}")
+        logger.debug('[OrderViewSet] user: %s id: %s is_employee: %s created_by: %s', user, getattr(user, 'id', None), getattr(user, 'is_employee', None), getattr(user, 'created_by_id', None))
         if not user.is_authenticated:
-            print("[OrderViewSet] Not authenticated, returning no orders.")
+            logger.debug('[OrderViewSet] Not authenticated, returning no orders.')
             return Order.objects.none()
         # Use the same admin-employee linkage logic as TableViewSet
         if hasattr(user, 'is_employee') and user.is_employee and user.created_by:
             admin_user = user.created_by
         else:
             admin_user = user
-        print(f"[OrderViewSet] admin_user: {admin_user} id: {getattr(admin_user, 'id', None)}")
-        # Get all tables for the admin (Table.user = admin_user)
-        admin_tables = Table.objects.filter(user=admin_user)
-        print(f"[OrderViewSet] admin_tables: {[t.id for t in admin_tables]}")
+        logger.debug('[OrderViewSet] admin_user: %s id: %s', admin_user, getattr(admin_user, 'id', None))
         # Show all orders for any table where table.user is this admin (team linkage, matches menu section)
-        qs = Order.objects.filter(table__user=admin_user).select_related('table').order_by('-created_at')
-        print(f"[OrderViewSet] orders count: {qs.count()}")
-        
-        # Debug: Check for duplicate order IDs
-        order_ids = list(qs.values_list('id', flat=True))
-        unique_ids = set(order_ids)
-        if len(order_ids) != len(unique_ids):
-            print(f"[OrderViewSet] WARNING: Duplicate order IDs found!")
-            print(f"[OrderViewSet] Total orders: {len(order_ids)}, Unique orders: {len(unique_ids)}")
-            # Find duplicates
-            from collections import Counter
-            duplicates = [id for id, count in Counter(order_ids).items() if count > 1]
-            print(f"[OrderViewSet] Duplicate IDs: {duplicates}")
-        
-        return qs
-
+        return Order.objects.filter(tenant=admin_user).select_related('table').order_by('-created_at')
 
     def retrieve(self, request, *args, **kwargs):
         order_id = kwargs.get('id')  # Use 'id' since lookup_field = 'id'
-        print(f"[OrderViewSet] Retrieve called with order_id: {order_id}")
-        print(f"[OrderViewSet] Request user authenticated: {request.user.is_authenticated}")
-        print(f"[OrderViewSet] Request user: {request.user}")
+        logger.debug('[OrderViewSet] Retrieve called with order_id: %s by %s', order_id, request.user)
         
         try:
             # For unauthenticated users (customers), allow access to any order
             if not request.user.is_authenticated:
-                print(f"[OrderViewSet] Unauthenticated user, searching for order with id: {order_id}")
+                logger.debug('[OrderViewSet] Unauthenticated user, searching for order with id: %s', order_id)
                 order = Order.objects.get(id=order_id)
-                print(f"[OrderViewSet] Found order: {order.id}")
+                logger.debug('[OrderViewSet] Found order: %s', order.id)
             else:
                 # For authenticated users, use the filtered queryset
-                print(f"[OrderViewSet] Authenticated user, searching in filtered queryset")
+                logger.debug('[OrderViewSet] Authenticated user, searching in filtered queryset')
                 order = self.get_queryset().get(id=order_id)
-                print(f"[OrderViewSet] Found order: {order.id}")
+                logger.debug('[OrderViewSet] Found order: %s', order.id)
         except Order.DoesNotExist:
-            print(f"[OrderViewSet] Order not found with id: {order_id}")
-            print(f"[OrderViewSet] All orders in database:")
-            for o in Order.objects.all()[:10]:  # Show first 10 orders
-                print(f"  - Order ID: {o.id}, PK: {o.pk}")
+            logger.debug('[OrderViewSet] Order not found with id: %s', order_id)
             return Response({'detail': 'Order not found.'}, status=404)
         except Exception as e:
-            print(f"[OrderViewSet] Unexpected error: {e}")
+            logger.exception('[OrderViewSet] Unexpected error: %s', e)
             return Response({'detail': 'Internal server error.'}, status=500)
         
         # Allow any user (authenticated or not) to view order details
         try:
             serializer = self.get_serializer(order)
-            print(f"[OrderViewSet] Returning order data: {serializer.data}")
             return Response(serializer.data)
         except Exception as e:
-            print(f"[OrderViewSet] Error serializing order: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('[OrderViewSet] Error serializing order: %s', str(e))
             # Return more specific error information
             return Response({
                 'detail': 'Internal server error.',
@@ -331,101 +469,154 @@ class OrderViewSet(viewsets.ModelViewSet):
             }, status=500)
 
     def create(self, request, *args, **kwargs):
-        print(f"[OrderViewSet] Received data: {request.data}")
-        
         # Check for existing order with same transaction_uuid to prevent duplicates
         transaction_uuid = request.data.get('transaction_uuid')
+        logger.debug('[OrderViewSet] Create request: table=%s transaction_uuid=%s',
+                     request.data.get('table') or request.data.get('table_id'), transaction_uuid)
         if transaction_uuid:
             existing_order = Order.objects.filter(transaction_uuid=transaction_uuid).first()
             if existing_order:
-                print(f"[OrderViewSet] Found existing order with transaction_uuid: {transaction_uuid}")
+                logger.debug('[OrderViewSet] Found existing order with transaction_uuid: %s', transaction_uuid)
                 # Return the existing order instead of creating a duplicate
                 serializer = self.get_serializer(existing_order)
                 return Response(serializer.data, status=200)
         
         # Proceed with normal creation if no duplicate found
         try:
-            print(f"[OrderViewSet] Validating order data...")
+            logger.debug('[OrderViewSet] Validating order data...')
             # Validate the data first
             serializer = self.get_serializer(data=request.data)
             if not serializer.is_valid():
-                print(f"[OrderViewSet] Validation errors: {serializer.errors}")
+                logger.warning('[OrderViewSet] Validation errors: %s', serializer.errors)
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
-            print(f"[OrderViewSet] Data validation successful, creating order...")
+            logger.debug('[OrderViewSet] Data validation successful, creating order...')
             return super().create(request, *args, **kwargs)
         except Exception as e:
-            print(f"[OrderViewSet] Error creating order: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('[OrderViewSet] Error creating order: %s', str(e))
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     def perform_create(self, serializer):
         order_id = generate_unique_order_id()
-        print(f"[OrderViewSet] Generated order ID: {order_id}")
+        logger.debug('[OrderViewSet] Generated order ID: %s', order_id)
         
         # Always assign the order to the admin user (table.user), not the employee
         table_id = self.request.data.get('table') or self.request.data.get('table_id')
-        print(f"[OrderViewSet] Table ID from request: {table_id}")
+        logger.debug('[OrderViewSet] Table ID from request: %s', table_id)
         
         table = None
         if table_id:
             try:
                 table = Table.objects.get(id=table_id)
-                print(f"[OrderViewSet] Found table: {table.name} (ID: {table.id})")
+                logger.debug('[OrderViewSet] Found table: %s (ID: %s)', table.name, table.id)
             except Table.DoesNotExist:
-                print(f"[OrderViewSet] Table not found with ID: {table_id}")
+                logger.debug('[OrderViewSet] Table not found with ID: %s', table_id)
                 pass
         
-        # Use the admin user for all orders on this table
-        if table and table.user:
-            print(f"[OrderViewSet] Creating order with table user: {table.user}")
-            order = serializer.save(id=order_id, user=table.user)
-        else:
-            print(f"[OrderViewSet] Creating order without table user")
-            order = serializer.save(id=order_id)
-        
-        print(f"[OrderViewSet] Order created successfully: {order.id}")
-        
-        # --- STOCK OUT LOGIC ---
-        
-        from decimal import Decimal
-        from django.utils import timezone
-        items = order.items if hasattr(order, 'items') else []
-        print(f"[OrderViewSet] Processing {len(items)} items for stock out")
-        
-        for item in items:
-            menu_item_id = item.get('id')
-            quantity = Decimal(item.get('quantity', 1))
-            if not menu_item_id:
-                continue
-            ingredient_mappings = IngredientMapping.objects.filter(dish_id=menu_item_id)
-            for mapping in ingredient_mappings:
-                total_ingredient_qty = mapping.quantity * quantity
-                StockOut.objects.create(
-                    item=mapping.ingredient,
-                    quantity=total_ingredient_qty,
-                    date=timezone.now().date(),
-                    reason='used',
-                    dish=mapping.dish,
-                    remarks=f"Auto-deducted for order {order.id}",
-                    created_by=order.user
-                )
-        # --- END STOCK OUT LOGIC ---
+        # The order and the stock it takes are saved together, or not at all
+        with transaction.atomic():
+            # Use the admin user for all orders on this table
+            if table and table.user:
+                logger.debug('[OrderViewSet] Creating order with table user: %s', table.user)
+                order = serializer.save(id=order_id, user=table.user)
+            else:
+                logger.debug('[OrderViewSet] Creating order without table user')
+                order = serializer.save(id=order_id)
+
+            logger.debug('[OrderViewSet] Order created successfully: %s', order.id)
+            ledger.record(ledger.order_stock_outs(order.id, order.items or [], created_by_id=order.user_id))
         
-        print(f"[OrderViewSet] Order creation completed: {order.id}")
+        logger.info('[OrderViewSet] Order creation completed: %s', order.id)
 
     def perform_update(self, serializer):
         try:
             serializer.save(user=self.request.user)
         except Exception as e:
-            print(f"Error in perform_update: {str(e)}")
+            logger.exception('Error in perform_update: %s', str(e))
             raise
 
+    def _admin_user(self):
+        user = self.request.user
+        if hasattr(user, 'is_employee') and user.is_employee and user.created_by:
+            return user.created_by
+        return user
+
+    def _bulk_order_ids(self, request):
+        order_ids = request.data.get('ids')
+        if not isinstance(order_ids, list) or not order_ids:
+            return None, Response({'error': 'ids must be a non-empty list of order IDs'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(order_ids) > BULK_ORDER_UPDATE_LIMIT:
+            return None, Response({'error': f'At most {BULK_ORDER_UPDATE_LIMIT} orders can be updated at once'}, status=status.HTTP_400_BAD_REQUEST)
+        return list({str(order_id) for order_id in order_ids}), None
+
+    def _bulk_update_orders(self, order_ids, values):
+        """Apply values to all given orders of the tenant with one UPDATE and one orders_updated event."""
+        admin_user = self._admin_user()
+        with transaction.atomic():
+            found = set(Order.objects.filter(tenant=admin_user, id__in=order_ids).values_list('id', flat=True))
+            missing = sorted(set(order_ids) - found)
+            if missing:
+                return Response({'error': 'Orders not found', 'not_found': missing}, status=status.HTTP_404_NOT_FOUND)
+            updated = Order.objects.filter(id__in=found).update(updated_at=timezone.now(), **values)
+        orders_updated.send(sender=Order, order_ids=sorted(found), fields=sorted(values), tenant_id=admin_user.pk)
+        return Response({'status': 'success', 'updated': updated})
+
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        order_ids, error = self._bulk_order_ids(request)
+        if error:
+            return error
+        new_status = request.data.get('status')
+        if not new_status:
+            return Response({'error': 'Status is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if new_status not in dict(Order.STATUS_CHOICES):
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._bulk_update_orders(order_ids, {'status': new_status})
+
+    @action(detail=False, methods=['post'])
+    def bulk_update_payment(self, request):
+        order_ids, error = self._bulk_order_ids(request)
+        if error:
+            return error
+        payment_status = request.data.get('payment_status')
+        payment_method = request.data.get('payment_method')
+        if not payment_status:
+            return Response({'error': 'Payment status is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if payment_status not in dict(Order.PAYMENT_STATUS_CHOICES):
+            return Response({'error': 'Invalid payment status'}, status=status.HTTP_400_BAD_REQUEST)
+        if payment_method and payment_method not in dict(Order.PAYMENT_METHOD_CHOICES):
+            return Response({'error': 'Invalid payment method'}, status=status.HTTP_400_BAD_REQUEST)
+        values = {'payment_status': payment_status}
+        if payment_method:
+            values['payment_method'] = payment_method
+        return self._bulk_update_orders(order_ids, values)
+
+    @action(detail=False, methods=['post'])
+    def restore(self, request):
+        """
+        Put back an order the admin just deleted (the orders page's Undo) as it was.
+
+        Unlike create, the stored items, extra charges and total are kept rather
+        than re-priced from today's menu, and no stock is taken again: deleting
+        the order didn't return any.
+        """
+        serializer = self.get_serializer(data=request.data, context={**self.get_serializer_context(), 'restore': True})
+        serializer.is_valid(raise_exception=True)
+        table = serializer.validated_data.get('table')
+        if table is None or table.user_id != self._admin_user().pk:
+            return Response({'error': 'Table not found'}, status=status.HTTP_404_NOT_FOUND)
+        # Keep the order's number unless it has been reused since
+        order_id = request.data.get('id')
+        if not isinstance(order_id, str) or not 0 < len(order_id) <= 10 or Order.objects.filter(id=order_id).exists():
+            order_id = generate_unique_order_id()
+        order = serializer.save(id=order_id, user=table.user)
+        logger.info('[OrderViewSet] Order restored: %s', order.id)
+        return Response(self.get_serializer(order).data, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['post'])
     def update_status(self, request, id=None):
         try:
-            order = Order.objects.get(id=id)
+            order = Order.objects.get(id=id, tenant=self._admin_user())
             new_status = request.data.get('status')
             
             if not new_status:
@@ -434,21 +625,20 @@ class OrderViewSet(viewsets.ModelViewSet):
             if new_status not in dict(Order.STATUS_CHOICES):
                 return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
                 
-            order.status = new_status
-            order.save()
+            order.set_status(new_status)
             
             # Here you could add notification logic
             return Response({'status': 'success'})
         except Order.DoesNotExist:
             return Response({'error': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            print(f"Error updating order status: {str(e)}")
+            logger.exception('Error updating order status: %s', str(e))
             return Response({'error': 'Internal server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=True, methods=['post'])
     def update_payment(self, request, id=None):
         try:
-            order = Order.objects.get(id=id)
+            order = Order.objects.get(id=id, tenant=self._admin_user())
             payment_status = request.data.get('payment_status')
             payment_method = request.data.get('payment_method')
             
@@ -461,16 +651,13 @@ class OrderViewSet(viewsets.ModelViewSet):
             if payment_method and payment_method not in dict(Order.PAYMENT_METHOD_CHOICES):
                 return Response({'error': 'Invalid payment method'}, status=status.HTTP_400_BAD_REQUEST)
                 
-            order.payment_status = payment_status
-            if payment_method:
-                order.payment_method = payment_method
-            order.save()
+            order.set_payment(payment_status, payment_method)
             
             return Response({'status': 'success'})
         except Order.DoesNotExist:
             return Response({'error': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            print(f"Error updating order payment: {str(e)}")
+            logger.exception('Error updating order payment: %s', str(e))
             return Response({'error': 'Internal server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['get'])
@@ -480,11 +667,11 @@ class OrderViewSet(viewsets.ModelViewSet):
             admin_user = user.created_by
         else:
             admin_user = user
-        total_orders = Order.objects.filter(user=admin_user).count()
-        pending_orders = Order.objects.filter(user=admin_user, status='pending').count()
-        in_progress_orders = Order.objects.filter(user=admin_user, status='in-progress').count()
-        completed_orders = Order.objects.filter(user=admin_user, status='completed').count()
-        unpaid_orders = Order.objects.filter(user=admin_user, payment_status='pending').count()
+        total_orders = Order.objects.filter(tenant=admin_user).count()
+        pending_orders = Order.objects.filter(tenant=admin_user, status='pending').count()
+        in_progress_orders = Order.objects.filter(tenant=admin_user, status='in-progress').count()
+        completed_orders = Order.objects.filter(tenant=admin_user, status='completed').count()
+        unpaid_orders = Order.objects.filter(tenant=admin_user, payment_status='pending').count()
         return Response({
             'total_orders': total_orders,
             'pending_orders': pending_orders,
@@ -494,6 +681,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @replica_reads()
     def dashboard_full_stats(self, request):
         try:
             from django.db.models import Sum, Count, F, Q
@@ -509,28 +697,39 @@ class OrderViewSet(viewsets.ModelViewSet):
             # Date range filter
             start_date = request.query_params.get('start_date')
             end_date = request.query_params.get('end_date')
-            orders = Order.objects.filter(user=admin_user)
+            orders = Order.objects.filter(tenant=admin_user)
             if start_date:
                 orders = orders.filter(created_at__date__gte=start_date)
             if end_date:
                 orders = orders.filter(created_at__date__lte=end_date)
+            # A date range also covers archived orders; every figure below is summed over both
+            archived = archived_orders(admin_user, start_date, end_date)
+            order_sets = [orders] if archived is None else [orders, archived]
             # Total revenue (all paid orders, not just completed)
-            total_revenue = orders.filter(payment_status='paid').aggregate(total=Sum('total'))['total'] or 0
+            total_revenue = sum(qs.filter(payment_status='paid').aggregate(total=Sum('total'))['total'] or 0 for qs in order_sets)
             # Total orders
-            total_orders = orders.count()
+            total_orders = sum(qs.count() for qs in order_sets)
             # Total customers (unique customer_name for completed orders)
-            total_customers = orders.filter(status='completed').exclude(customer_name__isnull=True).exclude(customer_name='').values('customer_name').distinct().count()
+            customers = [
+                qs.filter(status='completed').exclude(customer_name__isnull=True).exclude(customer_name='').values('customer_name').distinct().order_by()
+                for qs in order_sets
+            ]
+            total_customers = customers[0].union(*customers[1:]).count() if archived is not None else customers[0].count()
             # Active/inactive tables
             active_tables = Table.objects.filter(user=admin_user, active=True).count()
             inactive_tables = Table.objects.filter(user=admin_user, active=False).count()
             # Recent orders
             try:
-                recent_orders = OrderSerializer(orders.order_by('-created_at')[:5], many=True).data
+                recent_rows = merge_newest_first([
+                    order_values(qs.order_by('-created_at')[:5], *ORDER_READ_FIELDS) for qs in order_sets
+                ])
+                tz = timezone.get_current_timezone()
+                recent_orders = [order_representation(row, tz) for row in itertools.islice(recent_rows, 5)]
                 # Add currency to recent_orders
                 for o in recent_orders:
                     o['total'] = f"Rs {o['total']}"
             except Exception as e:
-                print(f"Error serializing recent orders: {str(e)}")
+                logger.exception('Error serializing recent orders: %s', str(e))
                 recent_orders = []
             # Revenue overview (monthly for last 12 months)
             today = timezone.now().date()
@@ -539,72 +738,84 @@ class OrderViewSet(viewsets.ModelViewSet):
             for i in range(11, -1, -1):
                 first = (today.replace(day=1) - datetime.timedelta(days=30*i)).replace(day=1)
                 last = (first + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
-                month_orders = orders.filter(created_at__date__gte=first, created_at__date__lte=last, status='completed')
-                revenue = month_orders.aggregate(total=Sum('total'))['total'] or 0
+                revenue = sum(
+                    qs.filter(created_at__date__gte=first, created_at__date__lte=last, status='completed').aggregate(total=Sum('total'))['total'] or 0
+                    for qs in order_sets
+                )
                 months.append(first.strftime('%b %Y'))
                 revenue_overview.append({'month': first.strftime('%b %Y'), 'revenue': f"Rs {revenue}"})
             # Most ordered item (aggregate from items JSON field)
             item_counter = Counter()
-            for order in orders:
-                try:
-                    for item in order.items:
-                        if isinstance(item, dict) and item.get('name'):
-                            item_counter[item.get('name')] += item.get('quantity', 1)
-                except Exception as e:
-                    print(f"Error processing items for order {order.id}: {str(e)}")
-                    continue
+            for items in itertools.chain.from_iterable(qs.values_list('items', flat=True) for qs in order_sets):
+                for item in readable_items(items):
+                    item_counter[item['name']] += item['quantity']
             most_ordered_item = None
             if item_counter:
                 name, count = item_counter.most_common(1)[0]
                 most_ordered_item = {'name': name, 'count': count}
             # Recent activities (last 10 order status changes)
-            recent_activities = orders.order_by('-updated_at').values('id', 'status', 'table', 'updated_at')[:10]
+            recent_activities = itertools.islice(merge_newest_first([
+                order_values(qs.order_by('-updated_at')[:10], 'id', 'status', 'table', 'updated_at') for qs in order_sets
+            ], 'updated_at'), 10)
             # Month revenue (for chart)
             month_revenue = revenue_overview
             # Order heatmap (by weekday/hour)
             heatmap = {}
             for weekday in range(7):
                 heatmap[calendar.day_name[weekday]] = [0]*24
-            for o in orders:
+            for dt in itertools.chain.from_iterable(qs.values_list('created_at', flat=True) for qs in order_sets):
                 try:
-                    dt = o.created_at
                     heatmap[calendar.day_name[dt.weekday()]][dt.hour] += 1
                 except Exception as e:
-                    print(f"Error processing heatmap for order {o.id}: {str(e)}")
+                    logger.exception('Error processing heatmap for order created at %s: %s', dt, str(e))
                     continue
             # Table occupancy rate (approximate)
             total_table_time = 0
             occupied_time = 0
             try:
                 for t in Table.objects.filter(user=admin_user):
-                    table_orders = orders.filter(table=t)
-                    if table_orders.exists():
-                        times = list(table_orders.order_by('created_at').values_list('created_at', flat=True))
-                        if times:
-                            total_table_time += (timezone.now() - times[0]).total_seconds()
-                            for i in range(1, len(times)):
-                                occupied_time += (times[i] - times[i-1]).total_seconds()
+                    times = sorted(itertools.chain.from_iterable(qs.filter(table=t).values_list('created_at', flat=True) for qs in order_sets))
+                    if times:
+                        total_table_time += (timezone.now() - times[0]).total_seconds()
+                        for i in range(1, len(times)):
+                            occupied_time += (times[i] - times[i-1]).total_seconds()
                 table_occupancy_rate = (occupied_time / total_table_time * 100) if total_table_time else 0
             except Exception as e:
-                print(f"Error calculating table occupancy: {str(e)}")
+                logger.exception('Error calculating table occupancy: %s', str(e))
                 table_occupancy_rate = 0
             # Average order value (based on paid orders)
-            paid_orders_count = orders.filter(payment_status='paid').count()
+            paid_orders_count = sum(qs.filter(payment_status='paid').count() for qs in order_sets)
             average_order_value = (total_revenue / paid_orders_count) if paid_orders_count else 0
             # Top customers
-            top_customers = orders.filter(status='completed').exclude(customer_name__isnull=True).exclude(customer_name='').values('customer_name').annotate(count=Count('id'), revenue=Sum('total')).order_by('-revenue')[:5]
+            customer_totals = [
+                qs.filter(status='completed').exclude(customer_name__isnull=True).exclude(customer_name='').values('customer_name').annotate(count=Count('pk'), revenue=Sum('total')).order_by('-revenue')
+                for qs in order_sets
+            ]
+            if archived is None:
+                top_customers = list(customer_totals[0][:5])
+            else:
+                merged = {}
+                for row in itertools.chain.from_iterable(customer_totals):
+                    totals = merged.setdefault(row['customer_name'], {'customer_name': row['customer_name'], 'count': 0, 'revenue': 0})
+                    totals['count'] += row['count']
+                    totals['revenue'] += row['revenue']
+                top_customers = sorted(merged.values(), key=lambda c: c['revenue'], reverse=True)[:5]
             # Add currency to top_customers revenue
             for c in top_customers:
                 c['revenue'] = f"Rs {c['revenue']}"
             # Order status breakdown
-            status_breakdown = orders.values('status').annotate(count=Count('id'))
+            status_counts = Counter()
+            for qs in order_sets:
+                for row in qs.values('status').annotate(count=Count('pk')):
+                    status_counts[row['status']] += row['count']
+            status_breakdown = [{'status': order_status, 'count': count} for order_status, count in status_counts.items()]
             # Pending actions
             try:
-                pending_actions = OrderSerializer(orders.filter(status__in=['pending', 'in-progress']).order_by('-created_at')[:5], many=True).data
+                pending_actions = serialize_orders(orders.filter(status__in=['pending', 'in-progress']).order_by('-created_at')[:5])
                 for o in pending_actions:
                     o['total'] = f"Rs {o['total']}"
             except Exception as e:
-                print(f"Error serializing pending actions: {str(e)}")
+                logger.exception('Error serializing pending actions: %s', str(e))
                 pending_actions = []
             # Feedback overview (if available)
             feedback_overview = None
@@ -631,25 +842,36 @@ class OrderViewSet(viewsets.ModelViewSet):
                 'inventory_alerts': inventory_alerts,
             })
         except Exception as e:
-            print(f"Error in dashboard_full_stats: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in dashboard_full_stats: %s', str(e))
             return Response({'error': str(e)}, status=500)
 
     def list(self, request, *args, **kwargs):
         try:
             # Use the shared get_queryset logic for both admin and employee (team linkage)
             queryset = self.get_queryset()
+            # ?start_date=/&end_date= (YYYY-MM-DD) limit the list, and reach into the order archive
+            start_date = request.query_params.get('start_date')
+            end_date = request.query_params.get('end_date')
+            if start_date:
+                queryset = queryset.filter(created_at__date__gte=start_date)
+            if end_date:
+                queryset = queryset.filter(created_at__date__lte=end_date)
+            archived = archived_orders(self._admin_user(), start_date, end_date) if request.user.is_authenticated else None
             page = self.paginate_queryset(queryset)
             if page is not None:
                 serializer = self.get_serializer(page, many=True)
                 return self.get_paginated_response(serializer.data)
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
+            rows = queryset.values(*ORDER_READ_FIELDS)
+            if archived is not None:
+                archived_rows = order_values(archived.select_related('table').order_by('-created_at'), *ORDER_READ_FIELDS)
+                rows = merge_newest_first([rows.iterator(chunk_size=STREAM_CHUNK_SIZE), archived_rows.iterator(chunk_size=STREAM_CHUNK_SIZE)])
+            # Busy restaurants have tens of thousands of orders: stream them to JSON clients instead of building the array
+            represent = functools.partial(order_representation, tz=timezone.get_current_timezone())
+            if isinstance(request.accepted_renderer, ORJSONRenderer):
+                return stream_json_list(rows, represent, request=request)
+            return Response([represent(row) for row in rows])
         except Exception as e:
-            print(f"Error in OrderViewSet.list: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception('Error in OrderViewSet.list: %s', str(e))
             return Response({'error': str(e)}, status=500)
 
     @action(detail=False, methods=['delete'])
@@ -686,80 +908,52 @@ def categorized_menu_view(request):
         return Response(categorized_data)
 
     except Exception as e:
-        print(f"Error in categorized_menu_view: {e}")
+        logger.exception('Error in categorized_menu_view: %s', e)
         return Response({"error": str(e)}, status=500)
 
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def customer_menu_view(request):
-    from our_menu.models import Discount as OurMenuDiscount
-    from django.utils import timezone
-    table_uid = request.query_params.get('tableUid')
-    table_id = request.query_params.get('tableId')
-    table = None
+@require_GET
+async def customer_menu_view(request):
+    table_uid = request.GET.get('tableUid')
+    table_id = request.GET.get('tableId')
     if table_uid:
-        try:
-            table = Table.objects.get(public_id=table_uid)
-        except Table.DoesNotExist:
-            return Response({'error': 'Table not found'}, status=404)
+        table = await table_resolver.aresolve(uid=table_uid)
     elif table_id:
-        tables = Table.objects.filter(name=table_id)
-        if tables.exists():
-            table = tables.first()
-        else:
-            try:
-                table = Table.objects.get(id=table_id)
-            except Table.DoesNotExist:
-                return Response({'error': 'Table not found'}, status=404)
+        table = await table_resolver.aresolve(name=table_id, pk=table_id)
     else:
-        return Response({'error': 'Missing tableUid or tableId'}, status=400)
-    if not table.user:
-        return Response({'error': 'Table is not assigned to any admin user.'}, status=400)
-
-    menu_items = MenuItem.objects.filter(user=table.user, available=True)
-    today = timezone.now().date()
-    # Fetch all active discounts for this admin
-    discounts = OurMenuDiscount.objects.filter(
-        user=table.user,
-        active=True
-    ).filter(
-        (models.Q(start_date__isnull=True) | models.Q(start_date__lte=today)),
-        (models.Q(end_date__isnull=True) | models.Q(end_date__gte=today))
-    )
+        return json_response({'error': 'Missing tableUid or tableId'}, status=400)
+    if not table:
+        return json_response({'error': 'Table not found'}, status=404)
+    if not table.admin_id:
+        return json_response({'error': 'Table is not assigned to any admin user.'}, status=400)
+
+    menu_items = [item async for item in MenuItem.objects.filter(user_id=table.admin_id, available=True)]
+    # Highest active discount per item; orders are priced with the same map (see order_items.py)
+    discounts = [discount async for discount in active_discounts(table.admin_id)]
+    item_discounts = best_discounts(discounts, [item.id for item in menu_items])
+
+    # The serializer takes discount_percentage (and final_price) from item_discounts, so this runs no queries
+    serialized_items = MenuItemSerializer(menu_items, many=True, context={'item_discounts': item_discounts}).data
 
-    # Prepare a mapping of item_id to highest discount
-    item_discounts = {}
-    for discount in discounts:
-        applicable_items = discount.applicable_items.all()
-        if applicable_items.exists():
-            for item in applicable_items:
-                if item.id not in item_discounts or discount.discount_percentage > item_discounts[item.id]:
-                    item_discounts[item.id] = discount.discount_percentage
-        else:
-            # Discount applies to all items
-            for item in menu_items:
-                if item.id not in item_discounts or discount.discount_percentage > item_discounts[item.id]:
-                    item_discounts[item.id] = discount.discount_percentage
-
-    # Attach discount_percentage to each menu item
-    serialized_items = []
-    for item in menu_items:
-        discount_percentage = item_discounts.get(item.id, 0)
-        item_data = MenuItemSerializer(item).data
-        item_data['discount_percentage'] = discount_percentage
-        serialized_items.append(item_data)
-    
     # Return a response with the restaurant owner's user ID included
-    restaurant_user_id = table.user.id
-    print(f"Responding with restaurant_user_id: {restaurant_user_id}")
-    
-    response_data = {
+    return json_response({
         'items': serialized_items,
-        'restaurant_user_id': restaurant_user_id
-    }
+        'restaurant_user_id': table.admin_id
+    })
+
 
-    return Response(response_data)
+def _create_waiter_call(table):
+    """Open a call for the table and schedule its 'called' event; None if the table already has one."""
+    # Only one active call per table: the partial unique index rejects a second one
+    try:
+        with transaction.atomic():
+            # Create waiter call with the table's owner as the user
+            call = WaiterCall.objects.create(table_id=table.table_id, user_id=table.admin_id, tenant_id=table.admin_id)
+    except IntegrityError:
+        return None
+    data = WaiterCallSerializer(call).data
+    transaction.on_commit(lambda: waiter_calls.publish('called', data, call.table_id, call.tenant_id))
+    return data
 
 
 class WaiterCallViewSet(viewsets.ModelViewSet):
@@ -768,8 +962,9 @@ class WaiterCallViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_permissions(self):
-        # Allow unauthenticated access to create, resolve, list, and active endpoints
-        if self.action in ['create', 'resolve', 'list', 'active']:
+        # Allow unauthenticated access to resolve, list and active endpoints; customers
+        # create calls through waiter_call_collection_view
+        if self.action in ['resolve', 'list', 'active']:
             return [AllowAny()]
         return super().get_permissions()
 
@@ -782,45 +977,28 @@ class WaiterCallViewSet(viewsets.ModelViewSet):
             admin_user = user.created_by
         else:
             admin_user = user
-        return WaiterCall.objects.filter(table__user=admin_user).select_related('table')
+        return WaiterCall.objects.filter(tenant=admin_user).select_related('table')
 
-    def create(self, request, *args, **kwargs):
-        table_name = request.data.get('table_name')
-        table_id = request.data.get('table_id')
-        table_uid = request.data.get('table_uid') or request.data.get('tableUid')
-        table = None
-        if table_name:
-            table = Table.objects.filter(name=table_name).first()
-        if not table and table_id:
-            table = Table.objects.filter(id=table_id).first()
-        if not table and table_uid:
-            table = Table.objects.filter(public_id=table_uid).first()
-        if not table:
-            return Response({'error': 'Table not found'}, status=status.HTTP_404_NOT_FOUND)
-        # Only one active call per table
-        if WaiterCall.objects.filter(table=table, status='active').exists():
-            return Response({'error': 'There is already an active call for this table.'}, status=status.HTTP_400_BAD_REQUEST)
-        # Create waiter call with the table's owner as the user
-        call = WaiterCall.objects.create(table=table, user=table.user)
-        serializer = self.get_serializer(call)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    def perform_update(self, serializer):
+        call = serializer.save()
+        transaction.on_commit(lambda: waiter_calls.clear_active_calls(call.table_id))
+
+    def perform_destroy(self, instance):
+        table_id = instance.table_id
+        instance.delete()
+        transaction.on_commit(lambda: waiter_calls.clear_active_calls(table_id))
 
     @action(detail=False, methods=['get'])
     def active(self, request):
-        table_id = request.query_params.get('table_id')
-        table_uid = request.query_params.get('table_uid') or request.query_params.get('tableUid')
+        # Customer polling for one table (?tableUid=) is answered by waiter_call_active_view
         calls = WaiterCall.objects.filter(status='active')
-        if table_id:
-            calls = calls.filter(table__id=table_id)
-        elif table_uid:
-            calls = calls.filter(table__public_id=table_uid)
-        elif request.user.is_authenticated:
+        if request.user.is_authenticated:
             # Handle both admin and employee users
             if hasattr(request.user, 'is_employee') and request.user.is_employee and request.user.created_by:
                 admin_user = request.user.created_by
             else:
                 admin_user = request.user
-            calls = calls.filter(table__user=admin_user)
+            calls = calls.filter(tenant=admin_user)
         else:
             calls = WaiterCall.objects.none()
         calls = calls.select_related('table').order_by('-created_at')
@@ -832,8 +1010,95 @@ class WaiterCallViewSet(viewsets.ModelViewSet):
         # Allow unauthenticated access to resolve waiter calls
         self.permission_classes = []
         call = self.get_object()
-        if call.status == 'resolved':
+        if not WaiterCall.objects.filter(pk=call.pk, status='active').update(status='resolved'):
             return Response({'error': 'Call already resolved.'}, status=status.HTTP_400_BAD_REQUEST)
         call.status = 'resolved'
-        call.save()
-        return Response({'status': 'resolved'})
\ No newline at end of file
+        data = self.get_serializer(call).data
+        transaction.on_commit(lambda: waiter_calls.publish('resolved', data, call.table_id, call.tenant_id))
+        return Response({'status': 'resolved'})
+
+
+# The customer-facing waiter-call routes: async, so a phone holding an event
+# stream open (or waiting on the database) doesn't tie up a worker thread.
+# Staff requests on the same URLs still go through WaiterCallViewSet.
+_waiter_call_list = WaiterCallViewSet.as_view({'get': 'list'})
+_waiter_call_active = WaiterCallViewSet.as_view({'get': 'active'})
+
+
+def _request_user(request):
+    """The user DRF's configured authenticators (session, JWT cookie...) find for a plain Django request."""
+    return Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]).user
+
+
+@csrf_exempt
+async def waiter_call_collection_view(request):
+    """POST: a customer calls a waiter. Anything else is the staff list."""
+    if request.method != 'POST':
+        return await sync_to_async(_waiter_call_list)(request)
+    data = _request_data(request)
+    if data is None:
+        return json_response({'error': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+    table = await table_resolver.aresolve(
+        uid=data.get('table_uid') or data.get('tableUid'), name=data.get('table_name'), pk=data.get('table_id'),
+    )
+    if not table:
+        return json_response({'error': 'Table not found'}, status=status.HTTP_404_NOT_FOUND)
+    call_data = await sync_to_async(_create_waiter_call)(table)
+    if call_data is None:
+        return json_response({'error': 'There is already an active call for this table.'}, status=status.HTTP_400_BAD_REQUEST)
+    return json_response(call_data, status=status.HTTP_201_CREATED)
+
+
+async def waiter_call_active_view(request):
+    """Customer phones poll this for their table; answered from the cached per-table payload."""
+    table_id = request.GET.get('table_id')
+    table_uid = request.GET.get('table_uid') or request.GET.get('tableUid')
+    if request.method != 'GET' or not (table_id or table_uid):
+        return await sync_to_async(_waiter_call_active)(request)
+    table = await table_resolver.aresolve(uid=table_uid, pk=table_id)
+    if not table:
+        return json_response([])
+    cached = await waiter_calls.aget_active_calls(table.table_id)
+    if cached is None:
+        calls = WaiterCall.objects.filter(status='active', table_id=table.table_id).select_related('table')
+        cached = WaiterCallSerializer([call async for call in calls], many=True).data
+        await waiter_calls.aset_active_calls(table.table_id, cached)
+    return json_response(cached)
+
+
+@require_GET
+async def waiter_call_stream_view(request):
+    """
+    Server-sent 'called'/'resolved' events for one table (?tableUid= or
+    ?table_id=, for customers) or for the signed-in staff member's restaurant.
+    """
+    table_id = request.GET.get('table_id')
+    table_uid = request.GET.get('table_uid') or request.GET.get('tableUid')
+    if table_id or table_uid:
+        table = await table_resolver.aresolve(uid=table_uid, pk=table_id)
+        if not table:
+            return json_response({'error': 'Table not found'}, status=status.HTTP_404_NOT_FOUND)
+        scope = waiter_calls.table_scope(table.table_id)
+    else:
+        try:
+            user = await sync_to_async(_request_user)(request)
+        except APIException as e:
+            return json_response({'detail': e.detail}, status=e.status_code)
+        if not user.is_authenticated:
+            return json_response({'error': 'table_uid or authentication required'}, status=status.HTTP_400_BAD_REQUEST)
+        admin_id = user.created_by_id if getattr(user, 'is_employee', False) and user.created_by_id else user.pk
+        scope = waiter_calls.tenant_scope(admin_id)
+
+    try:
+        last_version = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_version = await waiter_calls.acurrent_version(scope)
+    if isinstance(request, ASGIRequest):
+        stream = waiter_calls.aevent_stream(scope, last_version)
+    else:
+        # Under WSGI (runserver, gunicorn sync workers) only a sync iterator streams incrementally
+        stream = waiter_calls.event_stream(scope, last_version)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
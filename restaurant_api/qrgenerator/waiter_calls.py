@@ -0,0 +1,139 @@
+"""
+Waiter-call state that customer devices read without touching the database.
+
+Each table's active call (or the fact that it has none) is cached as the
+payload the `active` endpoint returns, and every call/resolve is published as
+a numbered event for its table and its restaurant. Event streams only poll the
+cache, so idle phones cost no queries. The events live in Django's cache,
+which all worker processes must share: production runs on Redis
+(REDIS_URL) and settings refuse to start without it.
+
+The a-prefixed functions are the same operations for async views; under ASGI
+an open aevent_stream() costs a coroutine instead of a worker thread.
+"""
+import asyncio
+import json
+import time
+
+from django.core.cache import cache
+
+ACTIVE_CALLS_TTL = 15
+EVENT_TTL = 300
+STREAM_DURATION = 25
+STREAM_POLL_INTERVAL = 1
+STREAM_KEEPALIVE = 10
+
+
+def table_scope(table_id):
+    return f'table:{table_id}'
+
+
+def tenant_scope(tenant_id):
+    return f'tenant:{tenant_id}'
+
+
+def _active_key(table_id):
+    return f'waiter_call:active:{table_id}'
+
+
+def _version_key(scope):
+    return f'waiter_call:version:{scope}'
+
+
+def _event_key(scope, version):
+    return f'waiter_call:event:{scope}:{version}'
+
+
+def get_active_calls(table_id):
+    """The cached `active` payload for a table, or None if it isn't cached."""
+    return cache.get(_active_key(table_id))
+
+
+def set_active_calls(table_id, calls):
+    cache.set(_active_key(table_id), calls, ACTIVE_CALLS_TTL)
+
+
+async def aget_active_calls(table_id):
+    return await cache.aget(_active_key(table_id))
+
+
+async def aset_active_calls(table_id, calls):
+    await cache.aset(_active_key(table_id), calls, ACTIVE_CALLS_TTL)
+
+
+def clear_active_calls(table_id):
+    cache.delete(_active_key(table_id))
+
+
+def current_version(scope):
+    return cache.get(_version_key(scope)) or 0
+
+
+async def acurrent_version(scope):
+    return await cache.aget(_version_key(scope)) or 0
+
+
+def publish(event, call_data, table_id, tenant_id):
+    """Record a 'called' or 'resolved' event and refresh the table's cached active payload."""
+    set_active_calls(table_id, [call_data] if event == 'called' else [])
+    scopes = [table_scope(table_id)]
+    if tenant_id:
+        scopes.append(tenant_scope(tenant_id))
+    for scope in scopes:
+        cache.add(_version_key(scope), 0, timeout=None)
+        version = cache.incr(_version_key(scope))
+        cache.set(_event_key(scope, version), {'event': event, 'call': call_data}, EVENT_TTL)
+
+
+def event_stream(scope, last_version, duration=STREAM_DURATION):
+    """
+    Yield server-sent events for scope published after last_version.
+
+    The stream ends after `duration` seconds; EventSource reconnects on its own
+    and sends Last-Event-ID so nothing in between is missed.
+    """
+    yield f'retry: {STREAM_POLL_INTERVAL * 1000}\n\n'
+    deadline = time.monotonic() + duration
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline:
+        version = current_version(scope)
+        if version > last_version:
+            keys = _event_keys(scope, last_version, version)
+            yield from _format_events(keys, cache.get_many(list(keys.values())))
+            last_version = version
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= STREAM_KEEPALIVE:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        time.sleep(STREAM_POLL_INTERVAL)
+
+
+async def aevent_stream(scope, last_version, duration=STREAM_DURATION):
+    """event_stream() for async views: waits with asyncio.sleep instead of blocking a thread."""
+    yield f'retry: {STREAM_POLL_INTERVAL * 1000}\n\n'
+    deadline = time.monotonic() + duration
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline:
+        version = await acurrent_version(scope)
+        if version > last_version:
+            keys = _event_keys(scope, last_version, version)
+            for chunk in _format_events(keys, await cache.aget_many(list(keys.values()))):
+                yield chunk
+            last_version = version
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= STREAM_KEEPALIVE:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+
+def _event_keys(scope, last_version, version):
+    return {v: _event_key(scope, v) for v in range(last_version + 1, version + 1)}
+
+
+def _format_events(keys, events):
+    """SSE messages for the events in `keys` ({version: cache key}) that haven't expired."""
+    for v, key in keys.items():
+        if key in events:
+            payload = events[key]
+            yield f"id: {v}\nevent: {payload['event']}\ndata: {json.dumps(payload['call'], default=str)}\n\n"
@@ -2,6 +2,12 @@
 ASGI config for restaurant_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Production runs it with uvicorn workers (see render.yaml):
+
+    gunicorn restaurant_api.asgi:application --worker-class uvicorn_worker.UvicornWorker
+
+The customer-facing endpoints are async views and run on the event loop;
+everything else is sync and Django runs it in a thread.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
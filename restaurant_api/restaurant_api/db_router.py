@@ -0,0 +1,102 @@
+"""
+Read-replica routing for analytics reads.
+
+Everything reads from and writes to the primary ('default') unless code opts
+in with replica_reads(): the dashboard, review and payment analytics views do,
+and ReplicaRoutingMiddleware does it for admin changelists. Inside it, reads
+go to the 'replica' alias when DATABASES has one (DATABASE_REPLICA_URL), until
+the request writes something. From then on the request reads from the primary
+too, so it never misses its own writes because of replication lag.
+
+The flags live in context variables, so they follow a request across
+sync_to_async under ASGI as well as staying per-thread under WSGI.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_DB_ALIAS = 'replica'
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+_pinned_to_primary = contextvars.ContextVar('pinned_to_primary', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Send reads inside the block (or the decorated function) to the replica.
+
+    Only for read-only work that can tolerate replication lag, such as stats
+    and reports.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_to_primary():
+    """Read from the primary for the rest of the request; called on every write."""
+    _pinned_to_primary.set(True)
+
+
+def reset():
+    """Forget the previous request's routing state."""
+    _replica_reads.set(False)
+    _pinned_to_primary.set(False)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not _pinned_to_primary.get() and replica_configured():
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so objects from either can be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db != REPLICA_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """Starts every request on the primary; admin changelist pages read from the replica."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        reset()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        reset()
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if request.method in ('GET', 'HEAD') and match and (match.url_name or '').endswith('_changelist'):
+            # Load the session and user from the primary first, so a fresh login isn't lost to lag
+            request.user.is_authenticated
+            _replica_reads.set(True)
+        return None
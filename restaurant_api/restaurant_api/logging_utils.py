@@ -0,0 +1,116 @@
+"""
+Structured logging for the API, configured through LOGGING in settings.
+
+RequestIDMiddleware gives every request an id (the caller's X-Request-ID, or a
+new one) that is returned in the X-Request-ID response header and attached by
+RequestIDFilter to every record logged while the request is handled.
+JSONFormatter writes one JSON object per record. SamplingFilter keeps one in
+every N DEBUG records per call site, so chatty debug logging can be switched
+on for a busy service without flooding it.
+"""
+import contextvars
+import json
+import logging
+import re
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+def get_request_id():
+    """The id of the request being handled in this thread/task, or None."""
+    return _request_id.get()
+
+
+class RequestIDMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_id = self._start(request)
+        response = self.get_response(request)
+        response[REQUEST_ID_HEADER] = request_id
+        return response
+
+    async def __acall__(self, request):
+        request_id = self._start(request)
+        response = await self.get_response(request)
+        response[REQUEST_ID_HEADER] = request_id
+        return response
+
+    def _start(self, request):
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        request.request_id = request_id
+        # Not reset on the way out: Django logs the response (django.request)
+        # after the middleware chain returns, and the next request overwrites it.
+        _request_id.set(request_id)
+        return request_id
+
+
+class RequestIDFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = _request_id.get() or '-'
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep the first and then every `rate`-th DEBUG record per (logger, message
+    template); records at INFO and above always pass.
+    """
+    MAX_TRACKED = 10000
+
+    def __init__(self, rate=1):
+        super().__init__()
+        self.rate = max(int(rate), 1)
+        self._seen = Counter()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate == 1 or record.levelno > logging.DEBUG:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            if len(self._seen) >= self.MAX_TRACKED:
+                self._seen.clear()
+            seen = self._seen[key]
+            self._seen[key] = seen + 1
+        return seen % self.rate == 0
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None) or _request_id.get(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str)
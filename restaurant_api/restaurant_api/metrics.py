@@ -0,0 +1,275 @@
+"""
+Opt-in per-endpoint request metrics, exposed in Prometheus text format.
+
+MetricsMiddleware (enabled with METRICS_ENABLED) records, per resolved URL
+name and method: request latency, DB query count and time, DRF serializer
+time and response size. Requests that run more queries than their budget are
+logged as possible N+1s, with the most repeated statement. The budget is
+METRICS_DEFAULT_QUERY_BUDGET, overridden per URL name in METRICS_QUERY_BUDGETS
+or by a `query_budget` attribute on the view class.
+
+Metrics are kept per process; each worker reports its own counters. The
+middleware runs natively under both WSGI and ASGI: the request's stats live
+in a context variable, which follows the request across sync_to_async.
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework import serializers
+from rest_framework.permissions import BasePermission
+from rest_framework.renderers import BaseRenderer
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+RESPONSE_SIZE_BUCKETS = (1000, 10000, 100000, 1000000, 10000000)
+
+_request_stats = contextvars.ContextVar('metrics_request_stats', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.response_size = Histogram(RESPONSE_SIZE_BUCKETS)
+        self.query_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.statuses = Counter()
+        self.budget_exceeded = 0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(EndpointStats)
+
+    def record(self, view, method, status, latency, queries, query_seconds, serializer_seconds, size, over_budget):
+        with self._lock:
+            stats = self._endpoints[(view, method)]
+            stats.latency.observe(latency)
+            stats.queries.observe(queries)
+            stats.query_seconds += query_seconds
+            stats.serializer_seconds += serializer_seconds
+            if size is not None:
+                stats.response_size.observe(size)
+            stats.statuses[status] += 1
+            if over_budget:
+                stats.budget_exceeded += 1
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = []
+            _histogram(lines, 'http_request_duration_seconds', 'Request latency', endpoints, 'latency')
+            _histogram(lines, 'http_request_db_queries', 'DB queries per request', endpoints, 'queries')
+            _histogram(lines, 'http_response_size_bytes', 'Response body size', endpoints, 'response_size')
+            _counter(lines, 'http_request_db_seconds_total', 'Time spent in DB queries', endpoints, lambda s: s.query_seconds)
+            _counter(lines, 'http_request_serializer_seconds_total', 'Time spent in DRF serializer .data', endpoints, lambda s: s.serializer_seconds)
+            _counter(lines, 'http_request_query_budget_exceeded_total', 'Requests over their query budget', endpoints, lambda s: s.budget_exceeded)
+            lines.append('# HELP http_requests_total Requests by response status')
+            lines.append('# TYPE http_requests_total counter')
+            for (view, method), stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_requests_total{{{_labels(view, method)},status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(view, method):
+    view = view.replace('\\', '\\\\').replace('"', '\\"')
+    return f'view="{view}",method="{method}"'
+
+
+def _histogram(lines, name, help_text, endpoints, attr):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for (view, method), stats in endpoints:
+        histogram = getattr(stats, attr)
+        if not histogram.count:
+            continue
+        labels = _labels(view, method)
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+
+def _counter(lines, name, help_text, endpoints, value):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} counter')
+    for (view, method), stats in endpoints:
+        lines.append(f'{name}{{{_labels(view, method)}}} {value(stats)}')
+
+
+registry = Registry()
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.statements = Counter()
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_seconds += time.perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+
+
+def _install_serializer_timing():
+    """Time BaseSerializer.data for the request in progress; nested .data calls count once."""
+    original = serializers.BaseSerializer.data
+    if getattr(original.fget, 'timed', False):
+        return
+
+    def data(self):
+        stats = _request_stats.get()
+        if stats is None or stats.serializer_depth:
+            return original.fget(self)
+        stats.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            stats.serializer_seconds += time.perf_counter() - start
+            stats.serializer_depth -= 1
+
+    data.timed = True
+    serializers.BaseSerializer.data = property(data)
+
+
+def query_budget_for(request, view_name):
+    budgets = getattr(settings, 'METRICS_QUERY_BUDGETS', {})
+    if view_name in budgets:
+        return budgets[view_name]
+    match = getattr(request, 'resolver_match', None)
+    view_class = getattr(getattr(match, 'func', None), 'cls', None) or getattr(getattr(match, 'func', None), 'view_class', None)
+    if getattr(view_class, 'query_budget', None) is not None:
+        return view_class.query_budget
+    return getattr(settings, 'METRICS_DEFAULT_QUERY_BUDGET', 50)
+
+
+def _count_queries(stats):
+    """Route this thread's queries through stats until the returned ExitStack is closed."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(stats))
+    return stack
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        _install_serializer_timing()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with _count_queries(stats):
+                response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        self._record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            # Connections are per thread and the request's queries (sync views, the
+            # async ORM) run on its sync_to_async thread, so the wrappers go there
+            stack = await sync_to_async(_count_queries)(stats)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _request_stats.reset(token)
+        self._record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def _record(self, request, response, stats, latency):
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name or match.route) if match else '<unresolved>'
+        size = None if response.streaming else len(response.content)
+        budget = query_budget_for(request, view_name)
+        over_budget = stats.queries > budget
+        if over_budget:
+            statement, repeats = stats.statements.most_common(1)[0]
+            logger.warning(
+                'Possible N+1 in %s %s: %d queries (budget %d); most repeated (%dx): %s',
+                request.method, view_name, stats.queries, budget, repeats, statement[:300],
+            )
+        registry.record(
+            view_name, request.method, response.status_code, latency,
+            stats.queries, stats.query_seconds, stats.serializer_seconds, size, over_budget,
+        )
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data if isinstance(data, str) else str(data)
+
+
+class IsMetricsReader(BasePermission):
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_superuser or getattr(user, 'role', None) == 'super_admin'))
+
+
+class MetricsView(APIView):
+    permission_classes = [IsMetricsReader]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
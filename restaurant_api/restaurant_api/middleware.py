@@ -0,0 +1,127 @@
+"""
+Async-capable stand-ins for Django and third-party middleware that only ship a
+sync version.
+
+Under ASGI Django runs a sync-only middleware in a worker thread, and every
+async view behind it then holds that thread until it returns. Our own
+middleware handles both modes; this module covers the rest of the stack.
+"""
+import brotli
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+re_accepts_br = _lazy_re_compile(r'\bbr\b')
+
+COMPRESSIBLE_CONTENT_TYPES = {
+    'application/json', 'application/javascript', 'image/svg+xml',
+    'text/css', 'text/csv', 'text/html', 'text/javascript', 'text/plain',
+}
+
+# Brotli's default (11) is meant for static assets; 5 compresses better than gzip at about the same CPU cost
+BROTLI_QUALITY = 5
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """WhiteNoise that passes non-static requests to async views without a thread hop."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        # Same lookup as the base class: a dict hit in production, a filesystem check with autorefresh
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware with Brotli for clients that accept it, a configurable size
+    threshold (COMPRESSION_MIN_SIZE) and a content-type allowlist.
+
+    Images are already compressed and an event stream must reach the client
+    event by event, so only text-like types are compressed. Brotli has no way
+    to pad its output against BREACH the way Django's gzip does, so it is only
+    used where no secret sits in the body: token-issuing endpoints are all
+    POSTs and HTML pages carry CSRF tokens, and those keep gzip.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in COMPRESSIBLE_CONTENT_TYPES:
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if (response.has_header('Content-Encoding') or content_type == 'text/html'
+                or request.method not in ('GET', 'HEAD')
+                or not re_accepts_br.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            response.streaming_content = _brotli_stream(response.streaming_content, response.is_async)
+            del response.headers['Content-Length']
+        else:
+            compressed_content = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Same as GZipMiddleware: a compressed body can only carry a weak ETag
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+def _brotli_stream(chunks, is_async):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    if is_async:
+        async def compressed():
+            async for chunk in chunks:
+                data = compressor.process(chunk)
+                if data:
+                    yield data
+            yield compressor.finish()
+    else:
+        def compressed():
+            for chunk in chunks:
+                data = compressor.process(chunk)
+                if data:
+                    yield data
+            yield compressor.finish()
+    return compressed()
@@ -60,6 +60,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # CORS should be first
+    'restaurant_api.middleware.CompressionMiddleware',  # Brotli/gzip; above anything that reads the body
+    'restaurant_api.logging_utils.RequestIDMiddleware',
+    'restaurant_api.db_router.ReplicaRoutingMiddleware',  # Per-request primary/replica routing state
     'Billing.middleware.SubscriptionPaymentPendingMiddleware',  # Force payment pending redirect for admins
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -70,9 +73,24 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # Custom middleware to redirect employees to their permitted sections
     'UserRole.middleware.EmployeeRedirectMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'restaurant_api.middleware.WhiteNoiseMiddleware',  # whitenoise's, made async-capable
 ]
 
+# Responses smaller than this (bytes) aren't worth compressing
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+
+# Per-endpoint latency/query metrics at /api/metrics/ (see restaurant_api/metrics.py)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False').strip().lower() == 'true'
+METRICS_DEFAULT_QUERY_BUDGET = int(os.environ.get('METRICS_DEFAULT_QUERY_BUDGET', '50'))
+# URL name -> max queries before a request is logged as a possible N+1
+METRICS_QUERY_BUDGETS = {
+    'kitchen-feed': 5,
+    'waiter_call-active': 5,
+    'customer-menu': 20,
+}
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(1, 'restaurant_api.metrics.MetricsMiddleware')
+
 ROOT_URLCONF = 'restaurant_api.urls'
 
 TEMPLATES = [
@@ -92,6 +110,9 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'restaurant_api.wsgi.application'
+# Production serves restaurant_api.asgi under uvicorn workers (see render.yaml) so the async
+# customer endpoints don't hold a thread while waiting on the database, eSewa or an event stream
+ASGI_APPLICATION = 'restaurant_api.asgi.application'
 
 
 # Database
@@ -102,11 +123,19 @@ WSGI_APPLICATION = 'restaurant_api.wsgi.application'
 import dj_database_url
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 
-# Use PostgreSQL for production (Render), SQLite for development
-if os.environ.get('DATABASE_URL'):
-    # Get the database URL
-    db_url = os.environ.get("DATABASE_URL")
-    
+# Opt-in psycopg connection pool (Django 5.1+, needs psycopg 3 with the pool extra).
+# A pool replaces persistent connections: each request borrows a connection and returns it.
+DB_POOL = os.environ.get('DB_POOL', 'False').strip().lower() == 'true'
+DB_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+    # Seconds a request waits for a free connection before failing
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+}
+
+
+def database_config(db_url):
+    """DATABASES entry for a database URL, with Render's SSL mode and connection reuse or pooling."""
     # For Render PostgreSQL, ensure SSL is properly configured
     # Render PostgreSQL requires SSL connections
     if 'onrender.com' in db_url and 'sslmode' not in db_url:
@@ -135,20 +164,24 @@ if os.environ.get('DATABASE_URL'):
             parsed.fragment
         ))
     
-    # Parse database URL
-    db_config = dj_database_url.config(
-        default=db_url,
+    # Parse database URL (parse, not config: config() would re-read DATABASE_URL and drop the sslmode above)
+    db_config = dj_database_url.parse(
+        db_url,
         conn_max_age=600,
         conn_health_checks=True,
     )
     
-    # Additional configuration for Render PostgreSQL stability
-    if db_config.get('ENGINE') == 'django.db.backends.postgresql':
-        # Ensure connection timeout is set
-        db_config.setdefault('CONN_MAX_AGE', 600)
-    
+    # Pooled connections (PostgreSQL only)
+    if db_config.get('ENGINE') == 'django.db.backends.postgresql' and DB_POOL:
+        db_config['CONN_MAX_AGE'] = 0  # Django refuses persistent connections together with a pool
+        db_config.setdefault('OPTIONS', {})['pool'] = dict(DB_POOL_OPTIONS)
+    return db_config
+
+
+# Use PostgreSQL for production (Render), SQLite for development
+if os.environ.get('DATABASE_URL'):
     DATABASES = {
-        'default': db_config
+        'default': database_config(os.environ['DATABASE_URL'])
     }
 else:
     # Development database (SQLite)
@@ -159,6 +192,15 @@ else:
         }
     }
 
+# Optional read replica for analytics (see restaurant_api/db_router.py). Any URL
+# dj_database_url understands works, e.g. a second SQLite file for local testing.
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES['replica'] = database_config(os.environ['DATABASE_REPLICA_URL'])
+    # Tests run against the primary's test database through this alias
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['restaurant_api.db_router.PrimaryReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -222,6 +264,16 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'authentaction.authentication.CookieJWTAuthentication',   # your custom class path
     ],
+    # orjson instead of the json module (see restaurant_api/renderers.py); same output
+    'DEFAULT_RENDERER_CLASSES': [
+        'restaurant_api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'restaurant_api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 
@@ -238,6 +290,69 @@ ROOT_URLCONF = 'restaurant_api.urls'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Shared cache for state that every worker process must see: the kitchen
+# feed's version counter and change log, waiter-call state and events, and
+# inventory alert unread counts (Django's Redis backend needs the redis
+# package). Per-process memory is only good for a single dev server, so a
+# production deployment (DATABASE_URL set, DEBUG off) without Redis is refused
+# instead of silently serving stale state from each worker.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif os.environ.get('DATABASE_URL') and not DEBUG:
+    from django.core.exceptions import ImproperlyConfigured
+    raise ImproperlyConfigured(
+        'REDIS_URL must be set in production: the kitchen feed, waiter calls and '
+        'inventory alert counts keep their state in the cache, which has to be '
+        'shared by all worker processes.'
+    )
+
+# Keep rendered table QR codes on disk under MEDIA_ROOT/qr_codes. When False
+# (e.g. ephemeral disks) images are only rendered into the in-memory cache.
+QR_CODE_STORE_IMAGES = os.environ.get('QR_CODE_STORE_IMAGES', 'True').strip().lower() == 'true'
+
+# Logging: the root level is LOG_LEVEL (WARNING unless set), with per-logger
+# overrides in LOG_LEVELS, e.g. "qrgenerator=DEBUG,EsewaIntegration=INFO".
+# LOG_FORMAT=json writes one JSON object per line; LOG_DEBUG_SAMPLE_RATE=N
+# keeps one in N DEBUG records per call site.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING').strip().upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').strip().lower()
+LOG_DEBUG_SAMPLE_RATE = int(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '1'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'restaurant_api.logging_utils.RequestIDFilter'},
+        'debug_sampling': {'()': 'restaurant_api.logging_utils.SamplingFilter', 'rate': LOG_DEBUG_SAMPLE_RATE},
+    },
+    'formatters': {
+        'json': {'()': 'restaurant_api.logging_utils.JSONFormatter'},
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'text',
+            'filters': ['request_id', 'debug_sampling'],
+        },
+    },
+    'root': {'handlers': ['console'], 'level': LOG_LEVEL},
+    'loggers': {
+        # Django's own loggers go through the root handler as well
+        'django': {'level': os.environ.get('DJANGO_LOG_LEVEL', LOG_LEVEL).strip().upper()},
+    },
+}
+for logger_name, _, level in (
+    override.partition('=') for override in os.environ.get('LOG_LEVELS', '').split(',') if '=' in override
+):
+    LOGGING['loggers'][logger_name.strip()] = {'level': level.strip().upper()}
+
 
 DJOSER = {
     "LOGIN_FIELD": "email",
@@ -355,6 +470,8 @@ AUTHENTICATION_BACKENDS = [
 # ESEWA_PAYMENT_URL = "https://rc-epay.esewa.com.np/api/epay/main/v2/form"  # Legacy - removed
 # ESEWA_PRODUCT_CODE = "EPAYTEST"  # Legacy - removed  
 # ESEWA_SECRET_KEY = "8gBm/:&EnhH.1/q("  # Legacy - removed
+# Seconds to wait for eSewa's transaction status API before answering from our own records
+ESEWA_STATUS_TIMEOUT = float(os.environ.get('ESEWA_STATUS_TIMEOUT', '5'))
 # Frontend URL - Use localhost for development, production URL for production
 if DEBUG:
     FRONTEND_BASE_URL = "http://localhost:3003"
@@ -6,6 +6,7 @@ from django.conf import settings
 from qrgenerator.views import menu_redirect_view
 from qrgenerator import views as qrgenerator_views # Use a specific alias if needed
 from EsewaIntegration.views import initiate_payment, verify_payment, check_transaction_status
+from restaurant_api.metrics import MetricsView
 
 # Import our custom admin site
 from UserRole.admin import restaurant_admin_site
@@ -37,6 +38,7 @@ urlpatterns = [
     path('api/inventory/', include('InventoryManagement.urls')),
     path('api/admin/', include('esewaSecretKey.urls')),
     path('api/billing/', include('Billing.urls')),  # 🧩 subscription and billing endpoints
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
 
 
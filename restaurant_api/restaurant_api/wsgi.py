@@ -10,6 +10,9 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 import os
 import sys
 from django.core.wsgi import get_wsgi_application
+import logging
+
+logger = logging.getLogger(__name__)
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'restaurant_api.settings')
 
@@ -22,7 +25,7 @@ def run_startup_commands():
         
         # Only run if we're in production and not during migrations
         if not settings.DEBUG and 'migrate' not in sys.argv and 'collectstatic' not in sys.argv:
-            print("Running startup commands...")
+            logger.info('Running startup commands...')
             
             # Create permissions
             execute_from_command_line(['manage.py', 'create_permissions'])
@@ -30,9 +33,9 @@ def run_startup_commands():
             # Assign role permissions
             execute_from_command_line(['manage.py', 'assign_role_permissions'])
             
-            print("Startup commands completed!")
+            logger.info('Startup commands completed!')
     except Exception as e:
-        print(f"Startup commands error (non-critical): {e}")
+        logger.exception('Startup commands error (non-critical): %s', e)
 
 # Run startup commands
 run_startup_commands()
@@ -313,7 +313,7 @@ export default function OrdersPage() {
                   action: (
                     <ToastAction altText="Undo" onClick={async () => {
                       try {
-                        const response = await fetchWithAuth(`${getApiUrl()}/api/orders/`, {
+                        const response = await fetchWithAuth(`${getApiUrl()}/api/orders/restore/`, {
                           method: "POST",
                           headers: { 'Content-Type': 'application/json' },
                           body: JSON.stringify(order),
@@ -157,10 +157,11 @@ export function CheckoutDialog({ isOpen, onClose, cartItems, setCartItems, table
         method: 'POST',
         headers,
         body: JSON.stringify({
-          amount: total,
-          tax_amount: 0,
-          product_service_charge: 0,
-          product_delivery_charge: 0,
+          // The server prices these items from the menu and charges that total
+          items: cartItems.map(item => ({ id: item.id.toString(), quantity: item.quantity })),
+          customerName,
+          specialInstructions,
+          diningOption,
           orderId: tempOrderId,
           tableUid: tableUid // Also pass tableUid separately for backup
         }),
@@ -4,7 +4,7 @@ import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
 import { Bell, Search, Moon, Sun, Menu, User } from "lucide-react"
 import { useTheme } from "next-themes"
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { SettingsPanel } from "@/components/settings-panel"
 import { Badge } from "@/components/ui/badge"
 import {
@@ -48,6 +48,7 @@ export function AdminHeader({ onMenuClick, title = "Dashboard" }: AdminHeaderPro
   const [changePwSuccess, setChangePwSuccess] = useState('')
   const [isNotificationsOpen, setIsNotificationsOpen] = useState(false)
   const { setShow } = useLoading()
+  const unreadCountRef = useRef<number | null>(null)
 
   const API_BASE_URL = `${getApiUrl()}/api/inventory/`
 
@@ -56,17 +57,23 @@ export function AdminHeader({ onMenuClick, title = "Dashboard" }: AdminHeaderPro
       try {
         const token = localStorage.getItem('adminAccessToken');
         if (!token) return;
+        const headers = {
+          'Authorization': `Bearer ${token}`,
+          'Content-Type': 'application/json'
+        };
 
-        const response = await fetch(`${getApiUrl()}alerts/?is_read=false`, {
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json'
-          }
-        });
+        // The cached unread count is cheap to poll; only fetch the alerts when it changes
+        const countResponse = await fetch(`${API_BASE_URL}alerts/unread-count/`, { headers });
+        if (!countResponse.ok) return;
+        const { count } = await countResponse.json();
+        if (count === unreadCountRef.current) return;
+        unreadCountRef.current = count;
+
+        const response = await fetch(`${API_BASE_URL}alerts/?is_read=false`, { headers });
 
         if (response.ok) {
           const data: InventoryAlert[] = await response.json();
-          setNotifications(data.filter(alert => alert.alert_type === 'low_stock'));
+          setNotifications(data);
         }
       } catch (error) {
         console.error("Failed to fetch notifications:", error)
@@ -97,7 +104,7 @@ export function AdminHeader({ onMenuClick, title = "Dashboard" }: AdminHeaderPro
         const token = localStorage.getItem('adminAccessToken');
         if (!token) return;
 
-        const response = await fetch(`${getApiUrl()}alerts/${id}/`, {
+        const response = await fetch(`${API_BASE_URL}alerts/${id}/`, {
             method: 'PATCH',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -121,7 +128,7 @@ export function AdminHeader({ onMenuClick, title = "Dashboard" }: AdminHeaderPro
 
         // This is a simplification. A real implementation would have a dedicated backend endpoint.
         const readPromises = notifications.map(n => 
-             fetch(`${getApiUrl()}alerts/${n.id}/`, {
+             fetch(`${API_BASE_URL}alerts/${n.id}/`, {
                 method: 'PATCH',
                 headers: { 'Authorization': `Bearer ${token}`, 'Content-Type': 'application/json' },
                 body: JSON.stringify({ is_read: true })
@@ -244,7 +251,7 @@ export function AdminHeader({ onMenuClick, title = "Dashboard" }: AdminHeaderPro
                   >
                     <div className="flex-1">
                       <p className="text-sm font-medium">
-                        {n.alert_type.replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase())} - {typeof n.item === 'object' && n.item !== null && 'name' in n.item ? (n.item as { name: string }).name : 'Unknown Item'}
+                        {n.alert_type.replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase())} - {n.item_name || 'Unknown Item'}
                       </p>
                       <p className="text-xs text-muted-foreground">{n.message}</p>
                       <p className="text-xs text-muted-foreground">
@@ -27,7 +27,11 @@ export function CallServerButton({ tableName }: { tableName: string | null }) {
 
     const checkActiveCalls = async () => {
       try {
-        const response = await fetch(getApiUrl() + "/api/waiter_call/", {
+        // The per-table endpoint is served from cache; the full list is only a fallback
+        const url = tableUid
+          ? `${getApiUrl()}/api/waiter_call/active/?tableUid=${encodeURIComponent(tableUid)}`
+          : getApiUrl() + "/api/waiter_call/"
+        const response = await fetch(url, {
           method: "GET",
           headers: { "Content-Type": "application/json" },
         })
@@ -72,6 +76,15 @@ export function CallServerButton({ tableName }: { tableName: string | null }) {
     checkActiveCalls()
   }, [tableName, tableUid])
 
+  // Staff resolving the call is pushed to us instead of being polled for
+  useEffect(() => {
+    if (!tableUid || typeof EventSource === "undefined") return
+    const source = new EventSource(`${getApiUrl()}/api/waiter_call/stream/?tableUid=${encodeURIComponent(tableUid)}`)
+    source.addEventListener("called", () => setHasActiveCall(true))
+    source.addEventListener("resolved", () => setHasActiveCall(false))
+    return () => source.close()
+  }, [tableUid])
+
   // Restore cooldown from localStorage when tableName changes
   useEffect(() => {
     if (!tableName) {